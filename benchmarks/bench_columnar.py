@@ -0,0 +1,91 @@
+"""
+Compares the memory taken by computer inventory records held as decoded
+nested dicts with the same records held in a FleetStore, and the time to
+find a record by serial number in each. Run from the repository root with:
+
+    python benchmarks/bench_columnar.py --computers 20000
+
+Memory is measured with tracemalloc, so it is the memory allocated by
+Python for the records and not the size of the process.
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from jps_api_wrapper.columnar import FleetStore  # noqa: E402
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet  # noqa: E402
+from jps_api_wrapper.pro import Pro, paginate  # noqa: E402
+
+
+def allocated(build):
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    result = build()
+    elapsed = perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--computers", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    fleet = generate_fleet(args.computers, seed=0)
+    with MockJamfServer(fleet) as server:
+        with Pro(server.url, "username", "password") as pro:
+            dict_size, _, records = allocated(
+                lambda: paginate(
+                    pro.get_computer_inventories,
+                    section=["ALL"],
+                    sort=["id:asc"],
+                    page_size=2000,
+                )["results"]
+            )
+
+    def build_store():
+        store = FleetStore()
+        store.ingest(records)
+        return store
+
+    store_size, _, store = allocated(build_store)
+    # Timed apart from the measurement, which slows allocation down
+    start = perf_counter()
+    build_store()
+    ingest = perf_counter() - start
+    if list(store) != records:
+        raise SystemExit("FleetStore returned different records")
+
+    serials = [
+        records[index]["hardware"]["serialNumber"]
+        for index in range(0, len(records), max(1, len(records) // args.lookups))
+    ]
+    start = perf_counter()
+    for serial in serials:
+        [r for r in records if r["hardware"]["serialNumber"] == serial]
+    scan = (perf_counter() - start) / len(serials)
+    start = perf_counter()
+    for serial in serials:
+        store.find("hardware.serialNumber", serial)
+    find = (perf_counter() - start) / len(serials)
+
+    print(f"{'nested dicts':<24}{dict_size / 2**20:>10.1f} MB")
+    print(f"{'FleetStore':<24}{store_size / 2**20:>10.1f} MB")
+    print(f"{'reduction':<24}{dict_size / store_size:>10.1f} x")
+    print(f"{'ingest':<24}{ingest:>10.2f} s")
+    print(f"{'find by scan':<24}{scan * 1000:>10.3f} ms")
+    print(f"{'FleetStore.find':<24}{find * 1000:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compares fetching every section of the computer inventory in one request
+per page with SectionFanOut, which splits the sections of each page across
+concurrent requests, against the local mock JPS server. Run from the
+repository root with:
+
+    python benchmarks/bench_fanout.py --computers 5000 --section-cost 0.00005
+
+The mock server sleeps section-cost seconds per record for each requested
+section, modelling the tables the JPS server joins per section.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet  # noqa: E402
+from jps_api_wrapper.pro import Pro, paginate  # noqa: E402
+from jps_api_wrapper.projection import COMPUTER_SECTIONS, SectionFanOut  # noqa: E402
+
+
+def measure(func, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func()
+        times.append(perf_counter() - start)
+    return median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--computers", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--section-cost", type=float, default=0.00005)
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fleet = generate_fleet(args.computers, seed=0)
+    costs = dict.fromkeys(COMPUTER_SECTIONS, args.section_cost)
+    with MockJamfServer(fleet, section_costs=costs) as server:
+        with Pro(server.url, "username", "password") as pro:
+            fan_out = SectionFanOut(pro, groups=args.groups)
+            monolithic, expected = measure(
+                lambda: paginate(
+                    pro.get_computer_inventories,
+                    section=["ALL"],
+                    sort=["id:asc"],
+                    page_size=args.page_size,
+                ),
+                args.repeat,
+            )
+            split, merged = measure(
+                lambda: paginate(
+                    fan_out.get_computer_inventories,
+                    section=["ALL"],
+                    page_size=args.page_size,
+                ),
+                args.repeat,
+            )
+    if merged["results"] != expected["results"]:
+        raise SystemExit("SectionFanOut returned different records")
+    print(f"{'monolithic':<24}{monolithic:>10.2f} s")
+    print(f"{f'fan out ({args.groups} groups)':<24}{split:>10.2f} s")
+    print(f"{'speedup':<24}{monolithic / split:>10.2f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compares the resident memory of paginated computer inventory results
+decoded by the standard decoder with results decoded by a client with a
+StringInterner, against the local mock JPS server. Run from the repository
+root with:
+
+    python benchmarks/bench_interning.py --computers 100000
+
+Each decode mode runs in its own process so one does not reuse the memory
+the other freed. RSS is read from /proc/self/statm after the results are
+decoded, peak RSS from getrusage.
+"""
+
+import argparse
+import gc
+import resource
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from jps_api_wrapper.interning import StringInterner  # noqa: E402
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet  # noqa: E402
+from jps_api_wrapper.pro import Pro, paginate  # noqa: E402
+
+PAGE_SIZE = resource.getpagesize()
+
+
+def rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE
+
+
+def measure(url: str, section: list, interned: bool):
+    # Runs in the child process, prints the RSS growth, peak and time
+    interner = StringInterner() if interned else None
+    with Pro(url, "username", "password", interner=interner) as pro:
+        gc.collect()
+        before = rss()
+        start = perf_counter()
+        results = paginate(
+            pro.get_computer_inventories, section=section, page_size=2000
+        )
+        elapsed = perf_counter() - start
+        gc.collect()
+        after = rss()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(len(results["results"]), after - before, peak, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--computers", type=int, default=100000)
+    parser.add_argument("--section", nargs="+", default=["ALL"])
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--interned", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.url:
+        measure(args.url, args.section, args.interned)
+        return
+
+    results = {}
+    with MockJamfServer(generate_fleet(args.computers, seed=0)) as server:
+        for name, flags in (
+            ("standard decoder", []),
+            ("StringInterner", ["--interned"]),
+        ):
+            output = subprocess.run(
+                [sys.executable, __file__, "--url", server.url, "--section"]
+                + args.section
+                + flags,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.split()
+            results[name] = [int(output[0]), int(output[1]), int(output[2])]
+            results[name].append(float(output[3]))
+    print(f"{'':<20}{'records':>10}{'RSS':>12}{'peak RSS':>12}{'time':>10}")
+    for name, (count, grown, peak, elapsed) in results.items():
+        print(
+            f"{name:<20}{count:>10}{grown / 2**20:>9.0f} MB"
+            f"{peak / 2**20:>9.0f} MB{elapsed:>9.1f} s"
+        )
+    standard, interned = results["standard decoder"], results["StringInterner"]
+    print(f"{'RSS reduction':<20}{standard[1] / interned[1]:>21.2f} x")
+
+
+if __name__ == "__main__":
+    main()
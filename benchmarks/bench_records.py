@@ -0,0 +1,121 @@
+"""
+Compares decoding pages of computer inventory records into dicts with
+decoding them into ComputerInventory records, which keep the JSON of each
+record until it is read and then pack it into tuples. Run from the
+repository root with:
+
+    python benchmarks/bench_records.py --computers 50000
+
+Pages with every section are fetched from the local mock JPS server once
+and decoded from memory. Memory is measured with tracemalloc, so it is the
+memory allocated by Python for the results and not the size of the process.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet  # noqa: E402
+from jps_api_wrapper.records import ComputerInventory, decode_page  # noqa: E402
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def timed(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def fetch_pages(url: str, page_size: int) -> list:
+    session = requests.Session()
+    token = session.post(f"{url}/api/v1/auth/token").json()["token"]
+    session.headers["Authorization"] = f"Bearer {token}"
+    pages = []
+    page = 0
+    while True:
+        response = session.get(
+            f"{url}/api/v1/computers-inventory",
+            params={"section": "ALL", "page": page, "page-size": page_size},
+        )
+        pages.append(response.text)
+        if (page + 1) * page_size >= response.json()["totalCount"]:
+            return pages
+        page += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--computers", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with MockJamfServer(generate_fleet(args.computers, seed=0)) as server:
+        pages = fetch_pages(server.url, args.page_size)
+
+    def decode_dicts():
+        return [record for page in pages for record in json.loads(page)["results"]]
+
+    def decode_records():
+        return [
+            record
+            for page in pages
+            for record in decode_page(page, ComputerInventory)["results"]
+        ]
+
+    def read(records):
+        for record in records:
+            record["general"]["name"]
+            record["hardware"]["serialNumber"]
+
+    # Memory is traced apart from the timings, which it slows down
+    tracemalloc.start()
+    dicts = decode_dicts()
+    dict_size = traced()
+    del dicts
+    tracemalloc.stop()
+    tracemalloc.start()
+    records = decode_records()
+    unread_size = traced()
+    read(records)
+    read_size = traced()
+    del records
+    tracemalloc.stop()
+
+    dict_decode = timed(decode_dicts, args.repeat)
+    record_decode = timed(decode_records, args.repeat)
+    records = decode_records()
+    first_read = timed(lambda: read(records), 1)
+    read_again = timed(lambda: read(records), args.repeat)
+
+    print(f"{'records':<28}{len(records):>10}")
+    print(f"{'dicts':<28}{dict_size / 2**20:>10.1f} MB{dict_decode:>10.2f} s")
+    print(
+        f"{'records, unread':<28}{unread_size / 2**20:>10.1f} MB"
+        f"{record_decode:>10.2f} s"
+    )
+    print(
+        f"{'records, two fields read':<28}{read_size / 2**20:>10.1f} MB"
+        f"{record_decode + first_read:>10.2f} s"
+    )
+    print(f"{'read two fields again':<28}{'':>13}{read_again:>10.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Benchmarks the hot paths of the wrapper against the local mock JPS server
+and payloads captured from it. Run from the repository root with:
+
+    python benchmarks/bench_suite.py run --output benchmarks/baseline.json
+    python benchmarks/bench_suite.py run --compare benchmarks/baseline.json
+    python benchmarks/bench_suite.py compare baseline.json results.json
+
+Each benchmark is timed several times and its median is compared, compare
+exits with status 1 when any benchmark is slower than the baseline by more
+than the threshold. Baselines are only comparable on the same machine.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from xml.etree import ElementTree
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from jps_api_wrapper.classic import Classic  # noqa: E402
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet  # noqa: E402
+from jps_api_wrapper.pro import Pro, paginate  # noqa: E402
+from jps_api_wrapper.utils import (  # noqa: E402
+    identification_type,
+    remove_empty_params,
+)
+
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """
+    Registers a benchmark. The decorated function sets up and returns the
+    callable that is timed.
+    """
+
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+@benchmark("paginate_computers")
+def paginate_computers(context):
+    return lambda: paginate(context.pro.get_computer_inventories, page_size=2000)
+
+
+@benchmark("paginate_computers_sections")
+def paginate_computers_sections(context):
+    return lambda: paginate(
+        context.pro.get_computer_inventories,
+        section=["GENERAL", "HARDWARE", "OPERATING_SYSTEM", "USER_AND_LOCATION"],
+        page_size=2000,
+    )
+
+
+@benchmark("download_file")
+def download_file(context):
+    downloads = Path(context.home) / "Downloads"
+
+    def download():
+        context.pro.get_branding_image(1)
+        for path in downloads.iterdir():
+            path.unlink()
+
+    return download
+
+
+@benchmark("multipart_upload")
+def multipart_upload(context):
+    path = Path(context.home) / "upload.png"
+    path.write_bytes(os.urandom(context.file_size))
+    return lambda: context.pro.create_enrollment_customization_image(str(path))
+
+
+@benchmark("decode_json_page")
+def decode_json_page(context):
+    url = context.server.url + "/api/v1/computers-inventory"
+    params = {"section": "ALL", "page-size": "2000"}
+    response = context.pro.session.get(url, params=params)
+    content = response.content
+
+    def decode():
+        response._content = content
+        return response.json()
+
+    return decode
+
+
+@benchmark("decode_xml_page")
+def decode_xml_page(context):
+    url = context.server.url + "/JSSResource/computers/subset/basic"
+    response = context.classic.session.get(url, headers={"Accept": "text/xml"})
+    content = response.content
+
+    def decode():
+        response._content = content
+        return ElementTree.fromstring(response.text)
+
+    return decode
+
+
+@benchmark("identification_type")
+def identification_type_calls(context):
+    identifications = {"id": None, "name": "Orchard", "serialnumber": None}
+
+    def call():
+        for _ in range(10000):
+            identification_type(identifications)
+
+    return call
+
+
+@benchmark("remove_empty_params")
+def remove_empty_params_calls(context):
+    params = {"page": 0, "page-size": 100, "sort": None, "filter": None}
+
+    def call():
+        for _ in range(10000):
+            remove_empty_params(params)
+
+    return call
+
+
+@benchmark("import_pro")
+def import_pro(context):
+    return lambda: import_time("jps_api_wrapper.pro")
+
+
+@benchmark("import_classic")
+def import_classic(context):
+    return lambda: import_time("jps_api_wrapper.classic")
+
+
+def import_time(module: str) -> float:
+    """
+    Returns the seconds a fresh interpreter takes to import module and its
+    dependencies, measured with -X importtime
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=dict(os.environ, PYTHONPATH=SRC),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1_000_000
+    raise RuntimeError(f"{module} was not imported")
+
+
+class Context:
+    """
+    Mock server, clients and temporary home directory shared by the
+    benchmarks
+    """
+
+    def __init__(self, computers: int, file_size: int):
+        self.file_size = file_size
+        self.home = tempfile.mkdtemp()
+        (Path(self.home) / "Downloads").mkdir()
+        os.environ["HOME"] = self.home
+        fleet = generate_fleet(computers, seed=0)
+        self.server = MockJamfServer(fleet, download_size=file_size).start()
+        self.pro = Pro(self.server.url, "username", "password")
+        self.classic = Classic(self.server.url, "username", "password")
+
+    def close(self):
+        self.server.stop()
+
+
+def run(args) -> dict:
+    context = Context(args.computers, args.file_size)
+    results = {}
+    try:
+        for name, setup in BENCHMARKS.items():
+            if args.filter and args.filter not in name:
+                continue
+            func = setup(context)
+            func()
+            times = []
+            for _ in range(args.repeat):
+                start = perf_counter()
+                measured = func()
+                elapsed = perf_counter() - start
+                # Import benchmarks report the time measured by the child
+                # interpreter rather than the time to start it
+                times.append(measured if name.startswith("import_") else elapsed)
+            results[name] = {"median": median(times), "min": min(times)}
+            print(f"{name:<30}{median(times) * 1000:>12.2f} ms")
+    finally:
+        context.close()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "computers": args.computers,
+            "file_size": args.file_size,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """
+    Prints the change of each benchmark against the baseline
+
+    :returns: Whether any benchmark regressed by more than threshold
+    """
+    regressed = False
+    print(f"{'benchmark':<30}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            print(f"{name:<30}{'-':>14}{result['median'] * 1000:>14.2f}{'new':>10}")
+            continue
+        before = baseline["results"][name]["median"]
+        change = result["median"] / before - 1 if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{name:<30}{before * 1000:>14.2f}{result['median'] * 1000:>14.2f}"
+            f"{change:>+10.1%}{flag}"
+        )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--computers", type=int, default=20000)
+    run_parser.add_argument("--file-size", type=int, default=32 * 1024 * 1024)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--filter", help="Only run benchmarks containing this")
+    run_parser.add_argument("--output", help="Write the results to this file")
+    run_parser.add_argument("--compare", help="Compare with this baseline file")
+    run_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser = subparsers.add_parser("compare", help="Compare two results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        baseline = json.loads(Path(args.baseline).read_text())
+        current = json.loads(Path(args.current).read_text())
+        sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+    results = run(args)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        sys.exit(1 if compare(baseline, results, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
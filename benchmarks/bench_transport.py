@@ -0,0 +1,93 @@
+"""
+Compares the requests per second of each transport against a local mock JPS
+server. Run from the repository root with:
+
+    python benchmarks/bench_transport.py --requests 2000 --threads 8
+
+The mock server only speaks HTTP/1.1, so HttpxTransport is measured without
+HTTP/2 and the gain from multiplexing over one connection is out of scope
+here. Measure it against a real HTTP/2 server such as Jamf Cloud.
+"""
+
+import argparse
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from time import perf_counter
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from jps_api_wrapper.mock_server import ThreadingHTTPServer  # noqa: E402
+from jps_api_wrapper.pro import Pro  # noqa: E402
+from jps_api_wrapper.transport import (  # noqa: E402
+    HttpxTransport,
+    RequestsTransport,
+    Urllib3Transport,
+    httpx,
+)
+
+BODY = json.dumps(
+    {"totalCount": 1, "results": [{"id": "1", "name": "Benchmark"}]}
+).encode()
+
+
+class MockJamfHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class BenchmarkPro(Pro):
+    def __init__(self, base_url: str, transport):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.transport = transport
+        transport.bind(self.session)
+
+
+def run(base_url: str, transport, total: int, threads: int) -> float:
+    pro = BenchmarkPro(base_url, transport)
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in executor.map(lambda _: pro._get("/api/v1/buildings"), range(total)):
+            pass
+    elapsed = perf_counter() - start
+    transport.close()
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockJamfHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    transports = {"requests": RequestsTransport, "urllib3": Urllib3Transport}
+    if httpx:
+        transports["httpx"] = lambda: HttpxTransport(http2=False)
+    for name, transport in transports.items():
+        rate = run(base_url, transport(), args.requests, args.threads)
+        print(f"{name:<10}{rate:>10.0f} requests/second")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
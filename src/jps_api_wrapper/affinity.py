@@ -0,0 +1,126 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from itertools import count
+from time import monotonic
+
+import requests
+
+BALANCER_COOKIE = "APBALANCEID"
+STICKY = "sticky"
+SPREAD = "spread"
+
+
+class NodeAffinity:
+    """
+    Controls which web node of a Jamf Cloud instance requests land on using
+    the load balancer cookie (APBALANCEID).
+
+    In sticky mode every request is pinned to the node that answered the
+    first request, so reads see the writes made before them and benefit from
+    that node's caches. In spread mode the first discovery_requests GET
+    requests are sent without the cookie so the load balancer assigns them to
+    nodes, after which GET requests rotate across the nodes that were found.
+    Other methods always go to the first node, and GET requests stay there for
+    write_settle seconds after a write.
+
+    When a request sent with a node's cookie comes back with a different
+    node the old node has been drained or replaced, so it is dropped and the
+    new node takes its place.
+
+    :param mode: sticky or spread
+    :param discovery_requests:
+        Number of GET requests used to find nodes in spread mode
+    :param write_settle:
+        Seconds after a write during which GET requests are pinned to the
+        first node in spread mode
+    :param cookie_name: Name of the load balancer cookie
+
+    :raises ValueError: mode is not sticky or spread
+    """
+
+    def __init__(
+        self,
+        mode: str = STICKY,
+        discovery_requests: int = 10,
+        write_settle: float = 5.0,
+        cookie_name: str = BALANCER_COOKIE,
+    ):
+        if mode not in (STICKY, SPREAD):
+            raise ValueError("mode needs to be either sticky or spread")
+        self.mode = mode
+        self.discovery_requests = discovery_requests
+        self.write_settle = write_settle
+        self.cookie_name = cookie_name
+        self.nodes = []
+        self._discovered = 0
+        self._last_write = float("-inf")
+        self._rotation = count()
+        self._lock = threading.Lock()
+
+    def attach(self, session: requests.Session):
+        """
+        Stops the session from storing the load balancer cookie itself so the
+        cookie sent with each request is the one chosen here
+
+        :param session: Session the client sends requests with
+        """
+        session.cookies.set_policy(_IgnoreCookiePolicy(self.cookie_name))
+
+    def cookies(self, method: str) -> dict:
+        """
+        Returns the load balancer cookie to send with a request, None if the
+        load balancer should choose the node
+
+        :param method: HTTP method of the request e.g. GET
+        """
+        with self._lock:
+            if not self.nodes:
+                return None
+            if self.mode == SPREAD and method == "GET":
+                if self._discovered < self.discovery_requests:
+                    return None
+                if monotonic() - self._last_write >= self.write_settle:
+                    node = self.nodes[next(self._rotation) % len(self.nodes)]
+                    return {self.cookie_name: node}
+            elif method != "GET":
+                self._last_write = monotonic()
+            return {self.cookie_name: self.nodes[0]}
+
+    def capture(self, response: requests.Response, method: str, sent: dict = None):
+        """
+        Records the node the load balancer assigned a response to
+
+        :param response: Response to a request sent by the client
+        :param method: HTTP method of the request e.g. GET
+        :param sent: Cookies returned by cookies for the request
+        """
+        node = response.cookies.get(self.cookie_name)
+        sent_node = sent.get(self.cookie_name) if sent else None
+        with self._lock:
+            if self.mode == SPREAD and method == "GET":
+                self._discovered += 1
+            if not node:
+                return
+            if sent_node and node != sent_node:
+                # The node the cookie pointed at is gone, the new node takes
+                # its place so a drained primary is replaced as the primary
+                if sent_node in self.nodes:
+                    index = self.nodes.index(sent_node)
+                    if node in self.nodes:
+                        del self.nodes[index]
+                    else:
+                        self.nodes[index] = node
+                return
+            if node not in self.nodes and (self.mode == SPREAD or not self.nodes):
+                self.nodes.append(node)
+
+
+class _IgnoreCookiePolicy(DefaultCookiePolicy):
+    def __init__(self, cookie_name: str):
+        super().__init__()
+        self.cookie_name = cookie_name
+
+    def set_ok(self, cookie, request):
+        if cookie.name == self.cookie_name:
+            return False
+        return super().set_ok(cookie, request)
@@ -0,0 +1,144 @@
+import threading
+from collections import OrderedDict
+from typing import List
+from urllib.parse import urlencode
+
+from requests.structures import CaseInsensitiveDict
+
+from jps_api_wrapper.transport import TransportResponse
+from jps_api_wrapper.utils import match_prefix
+
+# Large, rarely changing resources that are revalidated by default
+DEFAULT_PREFIXES = (
+    "/JSSResource/policies",
+    "/JSSResource/osxconfigurationprofiles",
+    "/api/v1/scripts",
+    "/api/v1/packages",
+)
+
+
+class _Entry:
+    """
+    Body of a cached response and the validators to revalidate it with
+    """
+
+    def __init__(self, response):
+        self.content = response.content
+        self.headers = CaseInsensitiveDict(response.headers)
+        self.url = response.url
+
+    def validators(self) -> dict:
+        """
+        Returns the conditional headers to revalidate the response with
+        """
+        headers = {}
+        if "ETag" in self.headers:
+            headers["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+
+class ConditionalCache:
+    """
+    Caches GET responses of endpoints under the given prefixes that carry an
+    ETag or Last-Modified header. Later requests for the same URL are sent
+    with If-None-Match or If-Modified-Since and a 304 Not Modified response
+    is answered with the cached body, so unchanged resources are not
+    downloaded again. Responses without validators are not cached, servers
+    that do not support conditional requests keep sending full bodies.
+
+    :param prefixes:
+        Endpoint prefixes whose responses are cached, e.g. /api/v1/scripts
+    :param max_entries:
+        Number of responses kept, the least recently used are dropped first
+    """
+
+    def __init__(self, prefixes: List[str] = DEFAULT_PREFIXES, max_entries: int = 256):
+        self.prefixes = dict.fromkeys(prefixes, True)
+        self.max_entries = max_entries
+        self.requests = 0
+        self.hits = 0
+        self.bytes_saved = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, path: str, params: dict = None, headers: dict = None) -> tuple:
+        """
+        Returns the cache key of a GET request, None if its endpoint is not
+        cached
+
+        :param path: Endpoint of the request
+        :param params: Query parameters of the request
+        :param headers: Headers of the request
+        """
+        if not match_prefix(self.prefixes, path):
+            return None
+        query = urlencode(params or {}, doseq=True)
+        return path, query, (headers or {}).get("Accept")
+
+    def lookup(self, key: tuple) -> _Entry:
+        """
+        Returns the cached response of a request, None if nothing is cached
+        for it
+
+        :param key: Cache key of the request
+        """
+        with self._lock:
+            self.requests += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: tuple, response):
+        """
+        Caches a successful response if it has an ETag or Last-Modified
+        header
+
+        :param key: Cache key of the request
+        :param response: Response to cache
+        """
+        if response.status_code != 200:
+            return
+        if "ETag" not in response.headers and "Last-Modified" not in response.headers:
+            return
+        entry = _Entry(response)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def hit(self, entry: _Entry) -> TransportResponse:
+        """
+        Returns the cached response for a request answered with 304 Not
+        Modified
+
+        :param entry: Cached response returned by lookup
+        """
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(entry.content)
+        return TransportResponse(200, entry.headers, entry.content, entry.url)
+
+    def stats(self) -> dict:
+        """
+        Returns the number of cacheable requests, the requests answered from
+        the cache, the bytes that were not downloaded again and the number
+        of cached responses
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "bytes_saved": self.bytes_saved,
+                "entries": len(self._entries),
+            }
+
+    def clear(self):
+        """
+        Drops the cached responses
+        """
+        with self._lock:
+            self._entries.clear()
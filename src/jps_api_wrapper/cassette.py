@@ -0,0 +1,273 @@
+import base64
+import gzip
+import hashlib
+import json as jsonlib
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Pattern
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from jps_api_wrapper.transport import RequestsTransport, Transport, TransportResponse
+
+CASSETTE_VERSION = 1
+# Keys whose string values are replaced in recorded JSON and XML bodies
+SECRET_KEYS = re.compile(
+    r"password|passcode|secret|token|private_?key|credential", re.IGNORECASE
+)
+SCRUBBED = "********"
+# Response headers that are not recorded
+DROPPED_HEADERS = {"set-cookie", "authorization", "www-authenticate"}
+
+
+class RecordingTransport(Transport):
+    """
+    Sends requests with another transport and records each request, its
+    response and how long it took to a cassette file when the transport is
+    closed, so the traffic can be replayed offline with ReplayTransport.
+
+    Secrets are not recorded: request headers, cookies and hosts are left
+    out, and string values of JSON keys and XML elements matching
+    SECRET_KEYS, e.g. passwords and client secrets, are replaced in response
+    bodies. Identical response bodies are stored once and the file is
+    gzipped.
+
+    Example: transport=RecordingTransport("job.jsonl.gz")
+
+    :param path: Path of the cassette file to write
+    :param transport: Transport to send the requests with, RequestsTransport
+        if not given
+    :param secret_keys: Pattern of the JSON keys and XML elements to scrub
+    """
+
+    def __init__(
+        self,
+        path: str,
+        transport: Transport = None,
+        secret_keys: Pattern = SECRET_KEYS,
+    ):
+        self.path = path
+        self.transport = transport or RequestsTransport()
+        self.secret_keys = secret_keys
+        self.interactions = []
+        self.bodies = {}
+        self._lock = threading.Lock()
+
+    def bind(self, session: requests.Session):
+        super().bind(session)
+        self.transport.bind(session)
+
+    def request(self, method: str, url: str, **kwargs):
+        key = request_key(method, url, **kwargs)
+        start = time.perf_counter()
+        try:
+            response = self.transport.request(method, url, **kwargs)
+        except requests.RequestException as error:
+            kind = "timeout" if isinstance(error, requests.Timeout) else "connection"
+            self._add(dict(key, latency=time.perf_counter() - start, error=kind))
+            raise
+        latency = time.perf_counter() - start
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in DROPPED_HEADERS
+        }
+        body = self._scrub(response.content, headers.get("Content-Type", ""))
+        digest = hashlib.sha1(body).hexdigest()
+        with self._lock:
+            self.bodies.setdefault(digest, body)
+        self._add(
+            dict(
+                key,
+                latency=latency,
+                status=response.status_code,
+                headers=headers,
+                body=digest,
+            )
+        )
+        return response
+
+    def save(self):
+        """
+        Writes the recorded interactions to the cassette file
+        """
+        with self._lock:
+            interactions = list(self.interactions)
+            bodies = dict(self.bodies)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            header = {
+                "version": CASSETTE_VERSION,
+                "recorded": datetime.now(timezone.utc).isoformat(),
+            }
+            f.write(jsonlib.dumps(header) + "\n")
+            for digest, body in bodies.items():
+                try:
+                    line = {"body": digest, "text": body.decode("utf-8")}
+                except UnicodeDecodeError:
+                    line = {"body": digest, "base64": base64.b64encode(body).decode()}
+                f.write(jsonlib.dumps(line) + "\n")
+            for interaction in interactions:
+                f.write(jsonlib.dumps(interaction) + "\n")
+
+    def close(self):
+        self.save()
+        self.transport.close()
+
+    def _add(self, interaction: dict):
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def _scrub(self, body: bytes, content_type: str) -> bytes:
+        if "json" in content_type:
+            try:
+                data = jsonlib.loads(body)
+            except ValueError:
+                return body
+            return jsonlib.dumps(self._scrub_json(data)).encode()
+        if "xml" in content_type:
+            pattern = re.compile(
+                rb"<(?P<tag>[\w.-]*(?:"
+                + self.secret_keys.pattern.encode()
+                + rb")[\w.-]*)>[^<]*</(?P=tag)>",
+                self.secret_keys.flags & re.IGNORECASE,
+            )
+            return pattern.sub(
+                lambda match: b"<%s>%s</%s>"
+                % (match["tag"], SCRUBBED.encode(), match["tag"]),
+                body,
+            )
+        return body
+
+    def _scrub_json(self, data):
+        if isinstance(data, dict):
+            return {
+                key: (
+                    SCRUBBED
+                    if isinstance(value, str) and self.secret_keys.search(key)
+                    else self._scrub_json(value)
+                )
+                for key, value in data.items()
+            }
+        if isinstance(data, list):
+            return [self._scrub_json(item) for item in data]
+        return data
+
+
+class ReplayTransport(Transport):
+    """
+    Answers requests from a cassette written by RecordingTransport without
+    contacting a server, so a job can be reproduced and profiled offline.
+    Clients with a ReplayTransport do not request a token.
+
+    Requests are matched by method, path, query string and body. Repeated
+    requests get the recorded responses in the order they were recorded,
+    starting over once they run out, so replays are deterministic.
+
+    :param path: Path of the cassette file
+    :param latency_scale:
+        Multiplier of the recorded latencies, e.g. 0.5 replays twice as
+        fast and 0 without any delay
+
+    :raises CassetteMiss: A request was not recorded in the cassette
+    """
+
+    offline = True
+
+    def __init__(self, path: str, latency_scale: float = 1.0):
+        self.latency_scale = latency_scale
+        self.interactions = defaultdict(list)
+        self._positions = defaultdict(int)
+        self._lock = threading.Lock()
+        bodies = {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = jsonlib.loads(f.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"{path} is not a version {CASSETTE_VERSION} cassette")
+            for line in f:
+                entry = jsonlib.loads(line)
+                if "method" not in entry:
+                    if "text" in entry:
+                        bodies[entry["body"]] = entry["text"].encode("utf-8")
+                    else:
+                        bodies[entry["body"]] = base64.b64decode(entry["base64"])
+                    continue
+                if "body" in entry:
+                    entry["body"] = bodies[entry["body"]]
+                key = (entry["method"], entry["url"], entry["request"])
+                self.interactions[key].append(entry)
+
+    def request(self, method: str, url: str, **kwargs) -> TransportResponse:
+        key = request_key(method, url, **kwargs)
+        recorded = self.interactions.get((key["method"], key["url"], key["request"]))
+        if not recorded:
+            raise CassetteMiss(f"{method} {key['url']} was not recorded.")
+        with self._lock:
+            position = self._positions[key["method"], key["url"], key["request"]]
+            self._positions[key["method"], key["url"], key["request"]] += 1
+        interaction = recorded[position % len(recorded)]
+        if self.latency_scale:
+            time.sleep(interaction["latency"] * self.latency_scale)
+        if "error" in interaction:
+            if interaction["error"] == "timeout":
+                raise requests.Timeout(f"Recorded timeout for {key['url']}")
+            raise requests.ConnectionError(f"Recorded error for {key['url']}")
+        return TransportResponse(
+            interaction["status"],
+            CaseInsensitiveDict(interaction["headers"]),
+            interaction["body"],
+            url,
+            (),
+            len(_request_body(**kwargs)),
+        )
+
+
+def request_key(
+    method: str,
+    url: str,
+    params: dict = None,
+    data=None,
+    json=None,
+    files: dict = None,
+    **kwargs,
+) -> dict:
+    """
+    Returns what identifies a request in a cassette: its method, its path
+    and query string without the host, and a digest of its body
+
+    :param method: HTTP method e.g. GET
+    :param url: Full URL of the request
+    :param kwargs: Keyword arguments of Transport.request
+    """
+    split = urlsplit(url)
+    target = split.path
+    query = split.query
+    if params:
+        query = "&".join(filter(None, [query, urlencode(params, doseq=True)]))
+    if query:
+        target = f"{target}?{query}"
+    body = _request_body(data=data, json=json)
+    if files:
+        body += repr(sorted(files)).encode()
+    digest = hashlib.sha1(body).hexdigest() if body else None
+    return {"method": method, "url": target, "request": digest}
+
+
+def _request_body(data=None, json=None, **kwargs) -> bytes:
+    if json is not None:
+        return jsonlib.dumps(json, sort_keys=True).encode()
+    if isinstance(data, str):
+        return data.encode()
+    if isinstance(data, bytes):
+        return data
+    return b""
+
+
+class CassetteMiss(Exception):
+    """
+    The request was not recorded in the cassette being replayed.
+    """
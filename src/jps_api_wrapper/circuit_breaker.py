@@ -0,0 +1,93 @@
+import threading
+from time import monotonic
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Stops requests from being sent to a JPS server that keeps failing so
+    callers fail fast instead of waiting on timeouts. The breaker opens after
+    failure_threshold consecutive failures, rejects requests while open, and
+    after recovery_timeout seconds goes half-open and runs a health probe.
+    The breaker closes again if the probe passes and reopens if it fails.
+
+    :param failure_threshold:
+        Number of consecutive failed requests that opens the breaker
+    :param recovery_timeout:
+        Seconds the breaker stays open before probing the server again
+
+    :raises ValueError: failure_threshold is less than 1
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self, probe: Callable[[], bool]):
+        """
+        Checks whether a request may be sent, probing the server first if the
+        breaker has been open for longer than recovery_timeout
+
+        :param probe:
+            Callable that returns True if the server is healthy again
+
+        :raises CircuitOpen: The server is considered unhealthy
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if (
+                self.state == HALF_OPEN
+                or monotonic() - self._opened_at < self.recovery_timeout
+            ):
+                raise CircuitOpen(
+                    "The JPS server is failing, requests are blocked until it "
+                    "passes a health check."
+                )
+            self.state = HALF_OPEN
+        healthy = probe()
+        with self._lock:
+            if healthy:
+                self.state = CLOSED
+                self.failures = 0
+                return
+            self._open()
+        raise CircuitOpen(
+            "The JPS server is failing its health check, requests are blocked "
+            f"for another {self.recovery_timeout} seconds."
+        )
+
+    def record(self, success: bool):
+        """
+        Records the outcome of a request sent while the breaker was closed
+
+        :param success: Whether the server handled the request
+        """
+        with self._lock:
+            if success:
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = monotonic()
+
+
+class CircuitOpen(Exception):
+    """
+    The JPS server is failing, requests are blocked until it passes a health
+    check.
+    """
@@ -0,0 +1,125 @@
+import random
+import threading
+from time import monotonic
+from typing import List
+
+LEAST_OUTSTANDING = "least_outstanding"
+LATENCY = "latency"
+# Weight of the newest sample in a node's moving average latency
+LATENCY_SMOOTHING = 0.2
+
+
+class NodePool:
+    """
+    Spreads read traffic across the Tomcat nodes of a clustered on-prem JPS
+    server. GET requests go to a healthy node chosen by the strategy, every
+    other method goes to the primary node (the first URL) so writes are never
+    split across nodes. A node that fails failure_threshold requests in a row
+    is ejected for ejection_time seconds and then tried again.
+
+    :param urls:
+        Base URLs of the nodes, the first one is the primary
+        e.g. ["https://jss1.example.com:8443", "https://jss2.example.com:8443"]
+    :param strategy:
+        least_outstanding sends each read to the node with the fewest
+        requests in flight, latency picks nodes at random weighted by how
+        fast they have been answering
+    :param failure_threshold:
+        Number of consecutive failed requests that ejects a node
+    :param ejection_time: Seconds an ejected node is left out of rotation
+
+    :raises ValueError:
+        No urls were given or strategy is not least_outstanding or latency
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        strategy: str = LEAST_OUTSTANDING,
+        failure_threshold: int = 3,
+        ejection_time: float = 30.0,
+    ):
+        if not urls:
+            raise ValueError("At least one node URL is required.")
+        if strategy not in (LEAST_OUTSTANDING, LATENCY):
+            raise ValueError("strategy needs to be either least_outstanding or latency")
+        self.urls = list(urls)
+        self.primary = self.urls[0]
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.outstanding = {url: 0 for url in self.urls}
+        self.latency = {url: None for url in self.urls}
+        self.failures = {url: 0 for url in self.urls}
+        self._ejected_until = {url: 0.0 for url in self.urls}
+        self._lock = threading.Lock()
+
+    def healthy(self) -> List[str]:
+        """
+        Returns the nodes that are not currently ejected
+        """
+        now = monotonic()
+        return [url for url in self.urls if self._ejected_until[url] <= now]
+
+    def acquire(self, method: str) -> str:
+        """
+        Chooses the node a request is sent to and counts it as in flight
+
+        :param method: HTTP method of the request e.g. GET
+
+        :returns: Base URL of the chosen node
+        """
+        with self._lock:
+            if method != "GET":
+                node = self.primary
+            else:
+                nodes = self.healthy() or [min(self.urls, key=self._ejected_until.get)]
+                if self.strategy == LATENCY:
+                    node = self._by_latency(nodes)
+                else:
+                    node = min(nodes, key=self.outstanding.get)
+            self.outstanding[node] += 1
+            return node
+
+    def release(self, node: str, latency: float, success: bool):
+        """
+        Records the outcome of a request sent to a node
+
+        :param node: Base URL of the node returned by acquire
+        :param latency: Seconds the request took
+        :param success: Whether the node handled the request
+        """
+        with self._lock:
+            self.outstanding[node] -= 1
+            if not success:
+                self.failures[node] += 1
+                if self.failures[node] >= self.failure_threshold:
+                    self._ejected_until[node] = monotonic() + self.ejection_time
+                    self.failures[node] = 0
+                return
+            self.failures[node] = 0
+            average = self.latency[node]
+            self.latency[node] = (
+                latency
+                if average is None
+                else average + (latency - average) * LATENCY_SMOOTHING
+            )
+
+    def cancel(self, node: str):
+        """
+        Stops counting a request as in flight without recording an outcome,
+        used when the caller gave up on the request rather than the node
+        failing it
+
+        :param node: Base URL of the node returned by acquire
+        """
+        with self._lock:
+            self.outstanding[node] -= 1
+
+    def _by_latency(self, nodes: List[str]) -> str:
+        # Nodes without samples are weighted like the fastest node so they
+        # get traffic and a latency of their own.
+        known = [self.latency[url] for url in nodes if self.latency[url]]
+        fastest = min(known) if known else 1.0
+        weights = [1 / (self.latency[url] or fastest) for url in nodes]
+        return random.choices(nodes, weights=weights)[0]
@@ -0,0 +1,465 @@
+import json
+from array import array
+from typing import Callable, Iterable, Iterator, List, Union
+
+from jps_api_wrapper.utils import iter_pages
+
+# Fields indexed by default, found in constant time by FleetStore.find
+COMPUTER_INDEXES = ("id", "udid", "general.name", "hardware.serialNumber")
+MOBILE_DEVICE_INDEXES = (
+    "mobileDeviceId",
+    "general.udid",
+    "general.displayName",
+    "hardware.serialNumber",
+)
+# Rows after which columns that are not indexed and whose values are mostly
+# distinct, such as dates and IP addresses, stop being dictionary encoded
+PLAIN_SAMPLE_ROWS = 1000
+PLAIN_DISTINCT_RATIO = 0.5
+# Typecodes of the codes of a dictionary encoded column and the largest code
+# each holds, the codes widen as distinct values are added
+CODE_TYPECODES = (("B", 0xFF), ("H", 0xFFFF), ("I", 0xFFFFFFFF), ("Q", None))
+
+
+class _Marker:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+# Values stored for rows without a field, for empty objects and for lists of
+# objects, whose items are rows of a child table
+_MISSING = _Marker("MISSING")
+_EMPTY = _Marker("EMPTY")
+_ITEMS = _Marker("ITEMS")
+
+
+class _Json(str):
+    # Lists of lists or of mixed values, stored as JSON
+    __slots__ = ()
+
+
+class FleetStore:
+    """
+    Holds inventory records in columns rather than as nested dicts, so a
+    large fleet takes a fraction of the memory. Every field is a column:
+    fields with few distinct values, such as OS versions, models and
+    sections, are dictionary encoded as an array of small integer codes
+    into the distinct values, and fields whose values are mostly distinct
+    are kept as a plain list. Lists of objects, e.g. applications, are kept
+    as rows of child tables encoded the same way.
+
+    The id and the indexed fields have hash indexes, so find and get take
+    constant time. Records are materialized as dicts only when they are
+    read. Ingesting a record with an id that is already stored replaces it.
+
+    Example:
+
+    store = FleetStore()
+    store.load(pro.get_computer_inventories, section=["ALL"])
+    store.find("hardware.serialNumber", "C02ABC123DEF")
+
+    :param id_key: Key of the identifier of the records
+    :param indexes: Dotted paths of the fields to index
+    """
+
+    def __init__(self, id_key: str = "id", indexes: Iterable[str] = COMPUTER_INDEXES):
+        self.id_key = id_key
+        paths = {tuple(field.split(".")) for field in indexes} | {(id_key,)}
+        self._indexes = {path: _Index() for path in paths}
+        self._table = _Table(keep_dictionary=paths)
+
+    @classmethod
+    def for_mobile_devices(cls, indexes: Iterable[str] = MOBILE_DEVICE_INDEXES):
+        """
+        Returns a FleetStore for the records of get_mobile_devices_detail
+
+        :param indexes: Dotted paths of the fields to index
+        """
+        return cls("mobileDeviceId", indexes)
+
+    def __len__(self):
+        return self._table.rows
+
+    def __iter__(self) -> Iterator[dict]:
+        for row in range(self._table.rows):
+            yield self._table.record(row)
+
+    def ingest(self, records: Union[dict, Iterable[dict]]) -> int:
+        """
+        Adds records, replacing records with the same id
+
+        :param records: A page returned by the Pro API or a list of records
+
+        :returns: Number of records ingested
+        """
+        if isinstance(records, dict):
+            records = records["results"]
+        count = 0
+        for record in records:
+            rows = self.rows(self.id_key, record[self.id_key])
+            if rows:
+                self._replace(rows[0], record)
+            else:
+                self._append(record)
+            count += 1
+        return count
+
+    def load(
+        self,
+        endpoint_method: Callable,
+        page_size: int = 2000,
+        concurrency: int = 8,
+        **kwargs,
+    ) -> int:
+        """
+        Ingests every page of a paginated endpoint as it arrives, so the
+        decoded pages are never all held at once
+
+        :param endpoint_method:
+            Authenticated endpoint method e.g. pro.get_computer_inventories
+        :param page_size: Records per request
+        :param concurrency: Pages requested at once
+        :param kwargs: Keyword arguments to pass to the endpoint method
+
+        :returns: Number of records ingested
+        """
+        count = 0
+        for results in iter_pages(endpoint_method, page_size, concurrency, **kwargs):
+            count += self.ingest(results)
+        return count
+
+    def get(self, id: str) -> dict:
+        """
+        Returns a record, None if there is no record with the id
+
+        :param id: Record id
+        """
+        rows = self.rows(self.id_key, id)
+        return self._table.record(rows[0]) if rows else None
+
+    def find(self, field: str, value) -> List[dict]:
+        """
+        Returns the records whose field equals a value, using the hash index
+        of the field or scanning its column if it is not indexed
+
+        :param field: Dotted path of the field e.g. hardware.serialNumber
+        :param value: Value of the field
+        """
+        return [self._table.record(row) for row in self.rows(field, value)]
+
+    def rows(self, field: str, value) -> List[int]:
+        """
+        Returns the rows of the records whose field equals a value
+
+        :param field: Dotted path of the field e.g. hardware.serialNumber
+        :param value: Value of the field, numbers also match their string
+        """
+        path = tuple(field.split("."))
+        column = self._table.columns.get(path)
+        if column is None:
+            return []
+        index = self._indexes.get(path)
+        if index is None:
+            return [
+                row for row in range(self._table.rows) if _equal(column.get(row), value)
+            ]
+        code = column.code(value)
+        if code is None and not isinstance(value, str):
+            code = column.code(str(value))
+        return index.rows(code) if code else []
+
+    def column(self, field: str) -> list:
+        """
+        Returns the values of a field for every row, None where a record
+        does not have it
+
+        :param field: Dotted path of the field e.g. operatingSystem.version
+        """
+        path = tuple(field.split("."))
+        if path not in self._table.columns:
+            return [None] * self._table.rows
+        return [self._table.value(path, row) for row in range(self._table.rows)]
+
+    def _append(self, record: dict):
+        row = self._table.append(record)
+        for path, index in self._indexes.items():
+            column = self._table.columns.get(path)
+            if column is not None:
+                index.add(column.codes[row], row)
+
+    def _replace(self, row: int, record: dict):
+        columns = self._table.columns
+        old = {
+            path: columns[path].codes[row] for path in self._indexes if path in columns
+        }
+        self._table.replace(row, record)
+        for path, index in self._indexes.items():
+            column = columns.get(path)
+            if column is not None:
+                index.remove(old.get(path, 0), row)
+                index.add(column.codes[row], row)
+
+
+class _Index:
+    """
+    Rows of each code of a dictionary encoded column, the first row of a
+    code in an array and any others in a dict
+    """
+
+    def __init__(self):
+        self.first = array("i")
+        self.more = {}
+
+    def add(self, code: int, row: int):
+        if not code:
+            return
+        if code >= len(self.first):
+            self.first.extend([-1] * (code + 1 - len(self.first)))
+        if self.first[code] == -1:
+            self.first[code] = row
+        else:
+            self.more.setdefault(code, []).append(row)
+
+    def remove(self, code: int, row: int):
+        if not code:
+            return
+        if self.first[code] == row:
+            more = self.more.get(code)
+            self.first[code] = more.pop(0) if more else -1
+            if more == []:
+                del self.more[code]
+        elif row in self.more.get(code, ()):
+            self.more[code].remove(row)
+            if not self.more[code]:
+                del self.more[code]
+
+    def rows(self, code: int) -> List[int]:
+        if code >= len(self.first) or self.first[code] == -1:
+            return []
+        return sorted([self.first[code]] + self.more.get(code, []))
+
+
+class _DictionaryColumn:
+    """
+    Codes of the values of each row into a list of the distinct values,
+    code 0 for rows without the field
+    """
+
+    def __init__(self, rows: int):
+        self.codes = array("B", bytes(rows))
+        self.values = [_MISSING]
+        self.lookup = {}
+
+    def append(self, value):
+        # Encoding may widen the codes into a new array
+        code = self._encode(value)
+        self.codes.append(code)
+
+    def set(self, row: int, value):
+        code = self._encode(value)
+        self.codes[row] = code
+
+    def get(self, row: int):
+        return self.values[self.codes[row]]
+
+    def code(self, value) -> int:
+        # True, 1 and 1.0 are equal dict keys, so values other than strings
+        # are keyed with their type
+        return self.lookup.get(value if type(value) is str else (type(value), value))
+
+    def distinct(self) -> int:
+        return len(self.values) - 1
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _encode(self, value) -> int:
+        if value is _MISSING:
+            return 0
+        key = value if type(value) is str else (type(value), value)
+        code = self.lookup.get(key)
+        if code is None:
+            code = len(self.values)
+            self.lookup[key] = code
+            self.values.append(value)
+            self._widen(code)
+        return code
+
+    def _widen(self, code: int):
+        for typecode, largest in CODE_TYPECODES:
+            if largest is None or code <= largest:
+                if typecode != self.codes.typecode:
+                    self.codes = array(typecode, self.codes)
+                return
+
+
+class _PlainColumn:
+    """
+    Values of each row in a list, for fields whose values are mostly
+    distinct
+    """
+
+    def __init__(self, values: list):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        self.values.append(value)
+
+    def set(self, row: int, value):
+        self.values[row] = value
+
+    def get(self, row: int):
+        return self.values[row]
+
+
+class _Table:
+    """
+    Rows of records in columns keyed by the path of each field, with a child
+    table for each path holding lists of objects
+    """
+
+    def __init__(self, keep_dictionary: set = frozenset()):
+        self.rows = 0
+        self.columns = {}
+        self.children = {}
+        self.starts = {}
+        self.ends = {}
+        self.keep_dictionary = keep_dictionary
+
+    def append(self, record: dict) -> int:
+        row = self.rows
+        written = self._write(row, record, append=True)
+        # Records usually have every field, the columns of any missing ones
+        # are the ones still a row short
+        if len(written) < len(self.columns):
+            for column in self.columns.values():
+                if len(column) == row:
+                    column.append(_MISSING)
+        # Empty lists are stored as values rather than child rows
+        for path, starts in self.starts.items():
+            if len(starts) == row:
+                starts.append(0)
+                self.ends[path].append(0)
+        self.rows += 1
+        if self.rows == PLAIN_SAMPLE_ROWS:
+            self._compact()
+        return row
+
+    def replace(self, row: int, record: dict):
+        # List items of the replaced record stay in the child tables
+        seen = self._write(row, record, append=False)
+        for path, column in self.columns.items():
+            if path not in seen:
+                column.set(row, _MISSING)
+
+    def record(self, row: int) -> dict:
+        record = {}
+        for path, column in self.columns.items():
+            if column.get(row) is _MISSING:
+                continue
+            value = self.value(path, row)
+            target = record
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+        return record
+
+    def value(self, path: tuple, row: int):
+        value = self.columns[path].get(row)
+        if value is not _ITEMS:
+            return _decode(value)
+        child = self.children[path]
+        start = self.starts[path][row]
+        end = self.ends[path][row]
+        return [child.record(item) for item in range(start, end)]
+
+    def _write(self, row: int, record: dict, append: bool) -> set:
+        columns = self.columns
+        written = set()
+        for path, value in _flatten(record, ()):
+            if type(value) is list:
+                self._write_items(row, path, value, append)
+                value = _ITEMS
+            column = columns.get(path)
+            if column is None:
+                column = columns[path] = _DictionaryColumn(self.rows)
+            if append:
+                column.append(value)
+            else:
+                column.set(row, value)
+            written.add(path)
+        return written
+
+    def _write_items(self, row: int, path: tuple, items: list, append: bool):
+        child = self.children.get(path)
+        if child is None:
+            child = self.children[path] = _Table()
+            self.starts[path] = array("I", bytes(4 * self.rows))
+            self.ends[path] = array("I", bytes(4 * self.rows))
+        start = child.rows
+        for item in items:
+            child.append(item)
+        if append:
+            self.starts[path].append(start)
+            self.ends[path].append(child.rows)
+        else:
+            self.starts[path][row] = start
+            self.ends[path][row] = child.rows
+
+    def _compact(self):
+        # Columns with mostly distinct values gain nothing from the
+        # dictionary, which costs more than the values themselves
+        for path, column in self.columns.items():
+            if path in self.keep_dictionary or not isinstance(
+                column, _DictionaryColumn
+            ):
+                continue
+            if column.distinct() > PLAIN_DISTINCT_RATIO * self.rows:
+                values = [column.get(row) for row in range(self.rows)]
+                self.columns[path] = _PlainColumn(values)
+
+
+def _flatten(record: dict, prefix: tuple):
+    # Yields the path and value of each field, lists of objects as lists
+    # and other values as they are stored
+    for key, value in record.items():
+        path = prefix + (key,)
+        if isinstance(value, dict):
+            if value:
+                yield from _flatten(value, path)
+            else:
+                yield path, _EMPTY
+        elif isinstance(value, list):
+            if value and all(isinstance(item, dict) for item in value):
+                yield path, value
+            elif all(not isinstance(item, (dict, list)) for item in value):
+                yield path, tuple(value)
+            else:
+                yield path, _Json(json.dumps(value, separators=(",", ":")))
+        else:
+            yield path, value
+
+
+def _decode(value):
+    if value is _MISSING:
+        return None
+    if value is _EMPTY:
+        return {}
+    if type(value) is tuple:
+        return list(value)
+    if type(value) is _Json:
+        return json.loads(value)
+    return value
+
+
+def _equal(stored, value) -> bool:
+    stored = _decode(stored)
+    return stored == value or (
+        stored is not None and not isinstance(value, str) and stored == str(value)
+    )
@@ -0,0 +1,262 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from time import monotonic, perf_counter
+from typing import Callable, Iterable
+
+from jps_api_wrapper.profiling import carry_call
+
+# Default highest number of concurrent requests per JPS node
+DEFAULT_MAX_LIMIT = 16
+# Latency samples needed before the p95 is trusted as a baseline
+MIN_SAMPLES = 10
+# Fraction of the gap to a higher p95 that the baseline moves each request
+BASELINE_DRIFT = 0.01
+
+
+class AdaptiveLimiter:
+    """
+    Limits the number of requests in flight to a JPS server using additive
+    increase, multiplicative decrease (AIMD). The limit grows by one after a
+    full limit's worth of requests complete while latency stays flat and is
+    cut multiplicatively when the server reports overload (502, 503, 504,
+    429), a request times out, or the p95 latency climbs past the tolerated
+    ratio of the baseline.
+
+    :param initial_limit: Number of concurrent requests allowed to start with
+    :param min_limit: Lowest the limit will be cut to
+    :param max_limit: Highest the limit will be raised to
+    :param backoff:
+        Multiplier applied to the limit on overload, e.g. 0.5 halves it
+    :param latency_tolerance:
+        Ratio of the current p95 latency to the baseline p95 latency that is
+        treated as overload, e.g. 2.0 cuts the limit when latency doubles
+    :param window: Number of recent latency samples used to compute the p95
+
+    :raises ValueError:
+        The limits are not positive or initial_limit is not between min_limit
+        and max_limit
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        window: int = 50,
+    ):
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "Limits must be positive and initial_limit must be between "
+                "min_limit and max_limit."
+            )
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1.")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.limit = initial_limit
+        self.in_flight = 0
+        self.baseline = None
+        self._samples = deque(maxlen=window)
+        self._successes = 0
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Blocks until a request slot is available and takes it
+
+        :param timeout: Optional seconds to wait for a slot
+
+        :returns: Whether a slot was taken before the timeout
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self.in_flight < self.limit, timeout
+            ):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: float, overloaded: bool = False):
+        """
+        Returns a request slot and adjusts the limit based on the outcome of
+        the request
+
+        :param latency: Seconds the request took
+        :param overloaded:
+            Whether the request failed in a way that indicates the server is
+            overloaded (5xx gateway errors, throttling or a timeout)
+        """
+        with self._condition:
+            self.in_flight -= 1
+            # Requests that started before the last cut were sent at the old
+            # limit, so they should not cut the limit a second time.
+            started_before_cut = perf_counter() - latency < self._last_decrease
+            if overloaded:
+                if not started_before_cut:
+                    self._decrease()
+            else:
+                self._samples.append(latency)
+                p95 = self.p95()
+                if len(self._samples) >= MIN_SAMPLES:
+                    self._update_baseline(p95)
+                if (
+                    self.baseline is not None
+                    and p95 > self.baseline * self.latency_tolerance
+                ):
+                    if not started_before_cut:
+                        self._decrease()
+                else:
+                    self._successes += 1
+                    if self._successes >= self.limit:
+                        self.limit = min(self.max_limit, self.limit + 1)
+                        self._successes = 0
+            self._condition.notify_all()
+
+    def cancel(self):
+        """
+        Returns a request slot without recording an outcome, used when the
+        caller gave up on the request rather than the server failing it
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def p95(self) -> float:
+        """
+        Returns the 95th percentile of the recent latency samples, 0.0 if no
+        samples have been recorded
+        """
+        if not self._samples:
+            return 0.0
+        samples = sorted(self._samples)
+        return samples[int(0.95 * (len(samples) - 1))]
+
+    def _update_baseline(self, p95: float):
+        # The baseline follows drops in latency immediately but only drifts
+        # up slowly, so a sustained rise still reads as overload while the
+        # baseline can adapt to a server that is slower at this time of day.
+        if self.baseline is None or p95 < self.baseline:
+            self.baseline = p95
+        else:
+            self.baseline += (p95 - self.baseline) * BASELINE_DRIFT
+
+    def _decrease(self):
+        self.limit = max(self.min_limit, int(self.limit * self.backoff))
+        self._successes = 0
+        self._samples.clear()
+        self._last_decrease = perf_counter()
+
+
+class Deadline:
+    """
+    Total time budget for an operation made of multiple requests. While a
+    deadline is active, with a with statement or as the deadline of
+    concurrent_map, every request the client sends has its timeouts capped to
+    the time remaining and no request is sent once it has expired.
+
+    :param seconds: Seconds from now until the deadline expires
+    """
+
+    def __init__(self, seconds: float):
+        self.expires = monotonic() + seconds
+
+    def remaining(self) -> float:
+        """
+        Returns the seconds left until the deadline expires, negative once it
+        has expired
+        """
+        return self.expires - monotonic()
+
+    def expired(self) -> bool:
+        """
+        Returns whether the deadline has expired
+        """
+        return self.remaining() <= 0
+
+    def __enter__(self):
+        _deadlines().append(self)
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        _deadlines().pop()
+
+
+_local = threading.local()
+
+
+def _deadlines() -> list:
+    if not hasattr(_local, "deadlines"):
+        _local.deadlines = []
+    return _local.deadlines
+
+
+def current_deadline() -> Deadline:
+    """
+    Returns the deadline active in the current thread, None if there is none
+    """
+    deadlines = _deadlines()
+    return deadlines[-1] if deadlines else None
+
+
+def concurrent_map(
+    func: Callable,
+    items: Iterable,
+    limiter: AdaptiveLimiter = None,
+    deadline: Deadline = None,
+) -> list:
+    """
+    Calls func with each item on a thread pool and returns the results in the
+    same order as items. The pool is sized to the limiter's max_limit, the
+    limiter itself gates how many requests are actually in flight.
+
+    :param func: Callable that takes a single item
+    :param items: Items to pass to func
+    :param limiter: Limiter of the client func sends requests with
+    :param deadline:
+        Optional deadline for all of the calls, calls that have not started
+        when it expires are cancelled
+
+    :returns: List of func results in the order of items
+
+    :raises DeadlineExceeded: The deadline expired before all calls finished
+    """
+    items = list(items)
+    if not items:
+        return []
+    deadline = deadline or current_deadline()
+    max_workers = limiter.max_limit if limiter else 1
+
+    @carry_call
+    def call(item):
+        if not deadline:
+            return func(item)
+        with deadline:
+            return func(item)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(call, item) for item in items]
+        try:
+            return [
+                future.result(timeout=deadline.remaining() if deadline else None)
+                for future in futures
+            ]
+        except FutureTimeoutError:
+            raise DeadlineExceeded(
+                f"The deadline expired before {len(items)} calls finished."
+            )
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+class DeadlineExceeded(Exception):
+    """
+    The deadline for the operation expired before it finished.
+    """
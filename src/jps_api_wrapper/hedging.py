@@ -0,0 +1,131 @@
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import perf_counter
+from typing import Callable
+
+import requests
+
+
+class HedgePolicy:
+    """
+    Sends a duplicate of a GET request when the original has not returned
+    after the given latency percentile of its endpoint, and uses whichever
+    response arrives first. This cuts tail latency when a few requests land on
+    a slow node of a clustered JPS server. Latency is tracked per endpoint
+    template so ids do not split the samples.
+
+    :param percentile:
+        Latency percentile of the endpoint after which the duplicate is sent,
+        e.g. 0.95 hedges the slowest 5% of requests
+    :param max_extra_load:
+        Highest fraction of additional requests hedging may add, e.g. 0.05
+        allows at most one hedge for every 20 requests
+    :param min_samples:
+        Number of latency samples an endpoint needs before it is hedged
+    :param window: Number of recent latency samples kept per endpoint
+    :param max_workers: Size of the thread pool the requests are sent from
+
+    :raises ValueError:
+        percentile or max_extra_load are not between 0 and 1
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_extra_load: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 32,
+    ):
+        if not 0 < percentile < 1 or not 0 <= max_extra_load <= 1:
+            raise ValueError("percentile and max_extra_load must be between 0 and 1.")
+        self.percentile = percentile
+        self.max_extra_load = max_extra_load
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.requests = 0
+        self.hedges = 0
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def hedge_delay(self, endpoint: str) -> float:
+        """
+        Returns the seconds to wait on a request to the endpoint before
+        hedging it, None if there are not enough samples yet
+
+        :param endpoint: Endpoint template
+        """
+        with self._lock:
+            samples = sorted(self._latencies[endpoint])
+        if len(samples) < self.min_samples:
+            return None
+        return samples[int(self.percentile * (len(samples) - 1))]
+
+    def record(self, endpoint: str, latency: float):
+        """
+        Records the latency of a request to the endpoint
+
+        :param endpoint: Endpoint template
+        :param latency: Seconds the request took
+        """
+        with self._lock:
+            self._latencies[endpoint].append(latency)
+
+    def send(self, endpoint: str, send: Callable[[], requests.Response]):
+        """
+        Calls send, calling it a second time if the first call has not
+        returned within the hedge delay of the endpoint and the load budget
+        allows it
+
+        :param endpoint: Endpoint template used to track latency
+        :param send: Callable that sends the request and returns the response
+
+        :returns:
+            requests.Response of the first call to return without a 5xx
+            status, or the last call to fail if neither succeeds
+        """
+        with self._lock:
+            self.requests += 1
+            if not self._executor:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        delay = self.hedge_delay(endpoint)
+
+        def timed_send():
+            start = perf_counter()
+            response = send()
+            self.record(endpoint, perf_counter() - start)
+            return response
+
+        if delay is None:
+            return timed_send()
+        attempts = [self._executor.submit(timed_send)]
+        done, _ = wait(attempts, timeout=delay)
+        if not done and self._take_hedge():
+            attempts.append(self._executor.submit(timed_send))
+        pending = set(attempts)
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [attempt for attempt in done if _succeeded(attempt)]
+            if succeeded or not pending:
+                winner = succeeded[0] if succeeded else done.pop()
+                for loser in pending.union(succeeded[1:]):
+                    loser.add_done_callback(_close_response)
+                return winner.result()
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.requests * self.max_extra_load:
+                return False
+            self.hedges += 1
+            return True
+
+
+def _succeeded(attempt) -> bool:
+    return not attempt.exception() and attempt.result().status_code < 500
+
+
+def _close_response(attempt):
+    if not attempt.exception():
+        attempt.result().close()
@@ -0,0 +1,251 @@
+import threading
+import warnings
+from time import perf_counter
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+BEFORE_REQUEST = "before_request"
+AFTER_RESPONSE = "after_response"
+ON_RETRY = "on_retry"
+ON_ERROR = "on_error"
+ON_PARSE = "on_parse"
+EVENTS = (BEFORE_REQUEST, AFTER_RESPONSE, ON_RETRY, ON_ERROR, ON_PARSE)
+
+
+class RequestEvent:
+    """
+    Describes a step in the life of a request, passed to the callbacks of a
+    RequestHooks
+
+    timings holds seconds for the parts of the request that are known when
+    the event fires:
+
+    - total - From sending the request until its body was read
+    - connect - Resolving the host and opening the TCP connection
+    - tls - TLS handshake, 0.0 for http URLs
+    - ttfb - From sending the request until the response headers were
+      parsed, including connect and tls
+    - body_read - Reading the response body after the headers
+    - decode - Decoding the JSON response body, on_parse only
+
+    connect and tls are None when the request reused an open connection.
+    connect, tls and ttfb are only measured by the default requests
+    transport, other transports leave them None.
+
+    :param name: Event name e.g. after_response
+    :param method: HTTP method e.g. GET
+    :param url: Full URL of the request
+    :param endpoint: Endpoint template e.g. /api/v1/buildings/{id}
+    :param attempt: 0 for the first attempt, 1 for a hedged duplicate
+    :param response: Response of the request if there is one
+    :param error: Exception raised while sending the request if any
+    :param timings: Dict of timing names and seconds
+    """
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        endpoint: str = None,
+        attempt: int = 0,
+        response=None,
+        error: Exception = None,
+        timings: dict = None,
+    ):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        self.attempt = attempt
+        self.response = response
+        self.error = error
+        self.timings = timings or {}
+
+    def __repr__(self):
+        return f"RequestEvent({self.name!r}, {self.method!r}, {self.url!r})"
+
+
+class RequestHooks:
+    """
+    Calls registered callbacks at each step of a client's requests, e.g. to
+    open and close tracing spans or to find whether time goes to the
+    network, the JPS server or decoding responses. Callbacks receive a
+    RequestEvent and are called in the thread that sends the request. A
+    callback that raises is reported with a RuntimeWarning and does not
+    affect the request.
+
+    - before_request - Before each attempt is sent
+    - after_response - After a response was received and its body read
+    - on_retry - Before a hedged duplicate of a request is sent, the client
+      does not otherwise send a request twice
+    - on_error - When an attempt raised instead of returning a response
+    - on_parse - After a JSON response body was decoded
+
+    Example: hooks.register("after_response", lambda e: print(e.timings))
+    """
+
+    def __init__(self):
+        self._callbacks = {event: () for event in EVENTS}
+        self._lock = threading.Lock()
+
+    def attach(self, session: requests.Session):
+        """
+        Mounts adapters on the session that time connecting and the TLS
+        handshake of new connections
+
+        :param session: Session the client sends requests with
+        """
+        session.mount("https://", _TimingAdapter())
+        session.mount("http://", _TimingAdapter())
+
+    def register(self, event: str, callback: Callable[[RequestEvent], None]):
+        """
+        Registers a callback for an event
+
+        :param event: Name of the event e.g. after_response
+        :param callback: Callable that takes a RequestEvent
+
+        :raises ValueError: event is not a known event name
+        """
+        self._check(event)
+        with self._lock:
+            self._callbacks[event] = self._callbacks[event] + (callback,)
+
+    def unregister(self, event: str, callback: Callable[[RequestEvent], None]):
+        """
+        Removes a registered callback
+
+        :param event: Name of the event e.g. after_response
+        :param callback: Callback that was registered
+
+        :raises ValueError: event is not a known event name
+        """
+        self._check(event)
+        with self._lock:
+            self._callbacks[event] = tuple(
+                registered
+                for registered in self._callbacks[event]
+                if registered != callback
+            )
+
+    def wants(self, event: str) -> bool:
+        """
+        Returns whether any callbacks are registered for an event, so callers
+        can skip building the RequestEvent when none are
+
+        :param event: Name of the event e.g. after_response
+        """
+        return bool(self._callbacks[event])
+
+    def emit(self, event: RequestEvent):
+        """
+        Calls the callbacks registered for an event
+
+        :param event: RequestEvent to pass to the callbacks
+        """
+        for callback in self._callbacks[event.name]:
+            try:
+                callback(event)
+            except Exception as error:
+                warnings.warn(
+                    f"A {event.name} callback raised {error!r}", RuntimeWarning
+                )
+
+    def _check(self, event: str):
+        if event not in self._callbacks:
+            raise ValueError(f"event needs to be one of {', '.join(EVENTS)}")
+
+
+def start_connection_timing():
+    """
+    Clears the connect and tls timings of the current thread, called before
+    a request is sent
+    """
+    _connection_timings.connect = None
+    _connection_timings.tls = None
+
+
+def connection_timings() -> dict:
+    """
+    Returns the connect and tls seconds of the connection opened by the last
+    request of the current thread, None if it reused an open connection
+    """
+    return {
+        "connect": getattr(_connection_timings, "connect", None),
+        "tls": getattr(_connection_timings, "tls", None),
+    }
+
+
+def response_timings(response: requests.Response, total: float) -> dict:
+    """
+    Splits the time taken by a request into connection setup, time to first
+    byte and reading the body
+
+    :param response: Response of the request
+    :param total: Seconds from sending the request until its body was read
+
+    :returns:
+        Dict with total, connect, tls, ttfb and body_read seconds, see
+        RequestEvent
+    """
+    timings = dict(connection_timings(), total=total, ttfb=None, body_read=None)
+    elapsed = getattr(response, "elapsed", None)
+    if elapsed is not None:
+        timings["ttfb"] = min(elapsed.total_seconds(), total)
+        timings["body_read"] = total - timings["ttfb"]
+    return timings
+
+
+_connection_timings = threading.local()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        start = perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _connection_timings.connect = perf_counter() - start
+
+    def connect(self):
+        super().connect()
+        _connection_timings.tls = 0.0
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    # HTTPSConnection.connect opens the socket with _new_conn and then does
+    # the TLS handshake, so the handshake is the rest of connect
+    def _new_conn(self):
+        start = perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _connection_timings.connect = perf_counter() - start
+
+    def connect(self):
+        start = perf_counter()
+        super().connect()
+        connect = _connection_timings.connect or 0.0
+        _connection_timings.tls = max(perf_counter() - start - connect, 0.0)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
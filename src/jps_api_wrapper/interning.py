@@ -0,0 +1,84 @@
+import json
+from typing import Union
+
+# Distinct values a key may have before new values of it are no longer
+# interned, so serial numbers, UDIDs and dates do not fill the tables
+DEFAULT_MAX_DISTINCT = 1000
+# Longest string value that is interned
+DEFAULT_MAX_LENGTH = 256
+
+
+class StringInterner:
+    """
+    Decodes JSON responses keeping one copy of each dict key and of each
+    value of keys with few distinct values, such as OS versions, models,
+    building and site names and section keys. Fleet wide results repeat
+    these strings for every record, the standard decoder makes a new copy
+    each time they are decoded.
+
+    Values are interned per key until the key has max_distinct values, after
+    which only values already in its table are shared. The tables live as
+    long as the interner, so strings are shared across every page a client
+    decodes. Decoding takes longer than with the standard decoder, which
+    builds its dicts without calling back into Python. Responses decoded as
+    typed records of the records module are not interned.
+
+    Example: Pro(JPS_URL, USERNAME, PASSWORD, interner=StringInterner())
+
+    :param max_distinct:
+        Distinct values a key may have before new values are not interned
+    :param max_length: Longest string value that is interned
+    """
+
+    def __init__(
+        self,
+        max_distinct: int = DEFAULT_MAX_DISTINCT,
+        max_length: int = DEFAULT_MAX_LENGTH,
+    ):
+        self.max_distinct = max_distinct
+        self.max_length = max_length
+        self.keys = {}
+        self.values = {}
+
+    def loads(self, text: Union[str, bytes]) -> Union[dict, list]:
+        """
+        Decodes JSON, interning its keys and low cardinality values
+
+        :param text: JSON document
+
+        :raises JSONDecodeError: The text is not valid JSON
+        """
+        return json.loads(text, object_pairs_hook=self._object)
+
+    def intern(self, key: str, value: str) -> str:
+        """
+        Returns the shared copy of a value of a key, the value itself when
+        it is not interned
+
+        :param key: Key the value belongs to e.g. osVersion
+        :param value: String value
+        """
+        if len(value) > self.max_length:
+            return value
+        table = self.values.get(key)
+        if table is None:
+            table = self.values.setdefault(key, {})
+        if len(table) < self.max_distinct:
+            return table.setdefault(value, value)
+        return table.get(value, value)
+
+    def _object(self, pairs: list) -> dict:
+        keys = self.keys
+        intern = self.intern
+        data = {}
+        for key, value in pairs:
+            key = keys.setdefault(key, key)
+            if type(value) is str:
+                value = intern(key, value)
+            elif type(value) is list and value and type(value[0]) is str:
+                # Lists of strings e.g. extension attribute values
+                value = [
+                    intern(key, item) if type(item) is str else item for item in value
+                ]
+            data[key] = value
+        return data
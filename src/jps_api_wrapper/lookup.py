@@ -0,0 +1,201 @@
+from typing import Dict, Iterator, List
+
+from jps_api_wrapper.concurrency import concurrent_map
+from jps_api_wrapper.pro import Pro
+from jps_api_wrapper.projection import COMPUTER_SECTIONS
+from jps_api_wrapper.rsql import MAX_FILTER_LENGTH, Comparison, field_getter, split
+
+# Kinds of identifier and the filter field, record path and section of each
+COMPUTER_IDENTIFIERS = {
+    "serial": ("hardware.serialNumber", "hardware.serialNumber", "HARDWARE"),
+    "udid": ("udid", "udid", None),
+    "id": ("id", "id", None),
+    "name": ("general.name", "general.name", "GENERAL"),
+    "mac": ("hardware.macAddress", "hardware.macAddress", "HARDWARE"),
+}
+MOBILE_DEVICE_IDENTIFIERS = {
+    "serial": ("serialNumber", "hardware.serialNumber", "HARDWARE"),
+    "udid": ("udid", "general.udid", "GENERAL"),
+    "id": ("mobileDeviceId", "mobileDeviceId", None),
+    "name": ("displayName", "general.displayName", "GENERAL"),
+    "mac": ("wifiMacAddress", "hardware.wifiMacAddress", "HARDWARE"),
+}
+# Most identifiers in one filter, the largest page size the JPS server allows
+MAX_CHUNK_SIZE = 2000
+
+
+def lookup_computers(
+    client: Pro,
+    identifiers: List[str],
+    by: str = "serial",
+    section: List[str] = None,
+    max_filter_length: int = None,
+) -> Dict[str, List[dict]]:
+    """
+    Returns the computer inventory records of many computers, packing the
+    identifiers into =in= filters on get_computer_inventories. Each request
+    carries as many identifiers as fit in max_filter_length and the requests
+    are sent concurrently, so thousands of serial numbers take a handful of
+    requests rather than one each.
+
+    Example: lookup_computers(pro, ["C02ABC123", "C02DEF456"], by="serial")
+
+    :param client: Pro client
+    :param identifiers: Identifiers to look up, duplicates are sent once
+    :param by: Kind of identifier: serial, udid, id, name or mac
+    :param section:
+        Sections to return, the section holding the identifier is added if
+        missing, default is GENERAL
+
+    :param max_filter_length:
+        Longest URL encoded filter of a request, default is the
+        max_filter_length of the client
+
+    :returns:
+        Dictionary of each identifier and the records that match it, an
+        empty list when none do. Identifiers are matched case insensitively.
+
+    :raises FilterTooLong: One identifier is longer than max_filter_length
+    :raises UnknownIdentifier: by is not a kind of identifier
+    """
+    if by not in COMPUTER_IDENTIFIERS:
+        raise UnknownIdentifier(
+            f"{by} is not one of {', '.join(COMPUTER_IDENTIFIERS)}."
+        )
+    field, path, needed = COMPUTER_IDENTIFIERS[by]
+    if section and "ALL" in section:
+        section = list(COMPUTER_SECTIONS)
+    return _lookup(
+        client.get_computer_inventories,
+        identifiers,
+        field,
+        path,
+        _with_section(section, needed),
+        "id:asc",
+        max_filter_length,
+    )
+
+
+def lookup_mobile_devices(
+    client: Pro,
+    identifiers: List[str],
+    by: str = "serial",
+    section: List[str] = None,
+    max_filter_length: int = None,
+) -> Dict[str, List[dict]]:
+    """
+    Returns the detailed records of many mobile devices, packing the
+    identifiers into =in= filters on get_mobile_devices_detail, see
+    lookup_computers
+
+    Example: lookup_mobile_devices(pro, ["DMPABC123"], section=["GENERAL"])
+
+    :param client: Pro client
+    :param identifiers: Identifiers to look up, duplicates are sent once
+    :param by: Kind of identifier: serial, udid, id, name or mac
+    :param section:
+        Sections to return, the section holding the identifier is added if
+        missing, default is GENERAL
+
+    :param max_filter_length:
+        Longest URL encoded filter of a request, default is the
+        max_filter_length of the client
+
+    :returns:
+        Dictionary of each identifier and the records that match it, an
+        empty list when none do. Identifiers are matched case insensitively.
+
+    :raises FilterTooLong: One identifier is longer than max_filter_length
+    :raises UnknownIdentifier: by is not a kind of identifier
+    """
+    if by not in MOBILE_DEVICE_IDENTIFIERS:
+        raise UnknownIdentifier(
+            f"{by} is not one of {', '.join(MOBILE_DEVICE_IDENTIFIERS)}."
+        )
+    field, path, needed = MOBILE_DEVICE_IDENTIFIERS[by]
+    return _lookup(
+        client.get_mobile_devices_detail,
+        identifiers,
+        field,
+        path,
+        _with_section(section, needed),
+        "mobileDeviceId:asc",
+        max_filter_length,
+    )
+
+
+def _lookup(
+    endpoint_method,
+    identifiers: List[str],
+    field: str,
+    path: str,
+    section: List[str],
+    sort: str,
+    max_filter_length: int,
+) -> Dict[str, List[dict]]:
+    identifiers = [str(identifier) for identifier in identifiers]
+    # The first spelling of each identifier is sent, matching is case
+    # insensitive like the server's
+    sent = {}
+    for identifier in identifiers:
+        if identifier:
+            sent.setdefault(identifier.casefold(), identifier)
+    found = {key: [] for key in sent}
+
+    def get_chunk(chunk):
+        filter = str(Comparison(field, "=in=", chunk))
+        results = []
+        page = 0
+        while True:
+            response = endpoint_method(
+                section=section,
+                page=page,
+                page_size=len(chunk),
+                sort=[sort],
+                filter=filter,
+            )
+            results.extend(response["results"])
+            # Names and MAC addresses can match more than one record each
+            if len(results) >= response["totalCount"] or not response["results"]:
+                return results
+            page += 1
+
+    client = getattr(endpoint_method, "__self__", None)
+    limiter = getattr(client, "limiter", None)
+    if max_filter_length is None:
+        max_filter_length = getattr(client, "max_filter_length", MAX_FILTER_LENGTH)
+    chunks = list(_chunks(list(sent.values()), field, max_filter_length))
+    for results in concurrent_map(get_chunk, chunks, limiter):
+        for record in results:
+            value = field_getter(record)(path)
+            matches = found.get(str(value).casefold()) if value is not None else None
+            if matches is not None:
+                matches.append(record)
+    return {
+        identifier: list(found.get(identifier.casefold(), []))
+        for identifier in identifiers
+    }
+
+
+def _with_section(section: List[str], needed: str) -> List[str]:
+    section = list(section or ["GENERAL"])
+    if needed and needed not in section:
+        section.append(needed)
+    return section
+
+
+def _chunks(values: List[str], field: str, max_length: int) -> Iterator[list]:
+    # Packs values into lists whose =in= filter stays under max_length once
+    # URL encoded and that fit in one page
+    if not values:
+        return
+    for part in split(Comparison(field, "=in=", values), max_length):
+        for start in range(0, len(part.values), MAX_CHUNK_SIZE):
+            end = start + MAX_CHUNK_SIZE
+            yield part.values[start:end]
+
+
+class UnknownIdentifier(Exception):
+    """
+    The kind of identifier is not one records can be looked up by.
+    """
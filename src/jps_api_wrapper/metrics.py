@@ -0,0 +1,240 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _EndpointStats:
+    """
+    Counters of the requests sent to one endpoint template with one method
+
+    :param buckets: Upper bounds in seconds of the latency histogram buckets
+    """
+
+    def __init__(self, buckets: List[float]):
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.cache_hits = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(buckets) + 1)
+        self.status_codes = defaultdict(int)
+
+    def as_dict(self, buckets: List[float]) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedges": self.hedges,
+            "cache_hits": self.cache_hits,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "latency_sum": self.latency_sum,
+            "latency_buckets": dict(
+                zip(list(buckets) + [float("inf")], self.latency_buckets)
+            ),
+            "status_codes": dict(self.status_codes),
+        }
+
+
+class RequestMetrics:
+    """
+    Records the request count, latency histogram, bytes sent and received,
+    status codes, hedged duplicates and cache hits of a client per method and
+    endpoint template, e.g. GET /api/v1/computers-inventory-detail/{id}. Give
+    one to a client with the metrics parameter, clients without one skip the
+    bookkeeping entirely.
+
+    The client does not retry failed requests, the only repeated attempts
+    are the duplicates sent by a HedgePolicy. Cache hits are recorded by
+    caching layers with record_cache_hit and stay 0 without one.
+
+    :param buckets: Upper bounds in seconds of the latency histogram buckets
+    """
+
+    def __init__(self, buckets: List[float] = DEFAULT_BUCKETS):
+        self.buckets = sorted(buckets)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        method: str,
+        endpoint: str,
+        status_code: int,
+        latency: float,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+    ):
+        """
+        Records a request sent to the JPS server
+
+        :param method: HTTP method e.g. GET
+        :param endpoint: Endpoint template
+        :param status_code:
+            Status code of the response, None if no response was received
+        :param latency: Seconds the request took
+        :param bytes_out: Size of the request body as sent
+        :param bytes_in: Size of the response body
+        """
+        bucket = bisect_left(self.buckets, latency)
+        with self._lock:
+            stats = self._stats(method, endpoint)
+            stats.requests += 1
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+            stats.latency_sum += latency
+            stats.latency_buckets[bucket] += 1
+            if status_code is None:
+                stats.errors += 1
+            else:
+                stats.status_codes[status_code] += 1
+
+    def record_hedge(self, method: str, endpoint: str):
+        """
+        Records a hedged duplicate of a request
+
+        :param method: HTTP method e.g. GET
+        :param endpoint: Endpoint template
+        """
+        with self._lock:
+            self._stats(method, endpoint).hedges += 1
+
+    def record_cache_hit(self, method: str, endpoint: str):
+        """
+        Records a request that was answered from a cache
+
+        :param method: HTTP method e.g. GET
+        :param endpoint: Endpoint template
+        """
+        with self._lock:
+            self._stats(method, endpoint).cache_hits += 1
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Returns a snapshot of the recorded metrics
+
+        :returns:
+            Dict of "METHOD endpoint" keys and dicts with the requests,
+            errors, hedges, cache_hits, bytes_out, bytes_in, latency_sum,
+            latency_buckets (per bucket, not cumulative) and status_codes of
+            the endpoint
+        """
+        with self._lock:
+            return {
+                f"{method} {endpoint}": stats.as_dict(self.buckets)
+                for (method, endpoint), stats in self._endpoints.items()
+            }
+
+    def reset(self):
+        """
+        Clears the recorded metrics
+        """
+        with self._lock:
+            self._endpoints = {}
+
+    def to_prometheus(self, namespace: str = "jps_api") -> str:
+        """
+        Returns the recorded metrics in the Prometheus text exposition format
+
+        :param namespace: Prefix of the metric names
+
+        :returns: Metrics text ready to be served on a /metrics endpoint
+        """
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = []
+
+            def family(name, kind, description, samples):
+                lines.append(f"# HELP {namespace}_{name} {description}")
+                lines.append(f"# TYPE {namespace}_{name} {kind}")
+                for suffix, labels, value in samples:
+                    lines.append(f"{namespace}_{name}{suffix}{_labels(labels)} {value}")
+
+            family(
+                "requests_total",
+                "counter",
+                "Requests sent to the JPS server by status code.",
+                [
+                    ("", {"method": m, "endpoint": e, "status": str(code)}, count)
+                    for (m, e), stats in endpoints
+                    for code, count in sorted(stats.status_codes.items())
+                ],
+            )
+            histogram = []
+            for (m, e), stats in endpoints:
+                labels = {"method": m, "endpoint": e}
+                cumulative = 0
+                for bound, count in zip(self.buckets, stats.latency_buckets):
+                    cumulative += count
+                    histogram.append(
+                        ("_bucket", dict(labels, le=_number(bound)), cumulative)
+                    )
+                histogram.append(("_bucket", dict(labels, le="+Inf"), stats.requests))
+                histogram.append(("_sum", labels, _number(stats.latency_sum)))
+                histogram.append(("_count", labels, stats.requests))
+            family(
+                "request_duration_seconds",
+                "histogram",
+                "Seconds taken by requests to the JPS server.",
+                histogram,
+            )
+            for name, attribute, description in (
+                ("request_errors_total", "errors", "Requests without a response."),
+                ("hedges_total", "hedges", "Hedged duplicates of requests."),
+                ("cache_hits_total", "cache_hits", "Requests answered from cache."),
+                ("request_bytes_total", "bytes_out", "Bytes of request bodies."),
+                ("response_bytes_total", "bytes_in", "Bytes of response bodies."),
+            ):
+                family(
+                    name,
+                    "counter",
+                    description,
+                    [
+                        ("", {"method": m, "endpoint": e}, getattr(stats, attribute))
+                        for (m, e), stats in endpoints
+                    ],
+                )
+        return "\n".join(lines) + "\n"
+
+    def _stats(self, method: str, endpoint: str) -> _EndpointStats:
+        key = (method, endpoint)
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = _EndpointStats(self.buckets)
+        return stats
+
+
+def request_size(response) -> int:
+    """
+    Returns the size in bytes of the body that was sent for a response,
+    read from the request the transport already encoded so the body is not
+    serialized a second time
+
+    :param response: Response returned by the client's transport
+    """
+    size = getattr(response, "request_size", None)
+    if size is not None:
+        return size
+    request = getattr(response, "request", None)
+    if request is None:
+        return 0
+    length = request.headers.get("Content-Length")
+    return int(length) if length else 0
+
+
+def _labels(labels: dict) -> str:
+    escaped = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
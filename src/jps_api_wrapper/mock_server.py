@@ -0,0 +1,1043 @@
+"""
+Local stand-in for the Classic and Pro APIs of a JPS server, serving a
+synthetic fleet so performance features can be measured without a network.
+Start one from Python with MockJamfServer or from a shell with:
+
+    python -m jps_api_wrapper.mock_server --computers 100000 --port 8080
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Dict, List, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+from uuid import UUID, uuid4
+from xml.sax.saxutils import escape
+
+from jps_api_wrapper.projection import COMPUTER_SECTIONS
+from jps_api_wrapper.rsql import Comparison, InvalidFilter, parse
+from jps_api_wrapper.utils import match_prefix, normalize_endpoint
+
+# Pro API sections of a mobile device detail record and their keys
+MOBILE_DEVICE_SECTIONS = {
+    "GENERAL": "general",
+    "HARDWARE": "hardware",
+    "USER_AND_LOCATION": "userAndLocation",
+    "PURCHASING": "purchasing",
+    "SECURITY": "security",
+    "APPLICATIONS": "applications",
+    "EBOOKS": "ebooks",
+    "NETWORK": "network",
+    "SERVICE_SUBSCRIPTIONS": "serviceSubscriptions",
+    "CERTIFICATES": "certificates",
+    "PROFILES": "profiles",
+    "USER_PROFILES": "userProfiles",
+    "PROVISIONING_PROFILES": "provisioningProfiles",
+    "SHARED_USERS": "sharedUsers",
+    "EXTENSION_ATTRIBUTES": "extensionAttributes",
+}
+# Sections that hold a list of items rather than an object
+LIST_SECTIONS = {
+    "applications",
+    "attachments",
+    "certificates",
+    "configurationProfiles",
+    "ebooks",
+    "extensionAttributes",
+    "fonts",
+    "groupMemberships",
+    "ibeacons",
+    "licensedSoftware",
+    "localUserAccounts",
+    "plugins",
+    "printers",
+    "profiles",
+    "provisioningProfiles",
+    "serviceSubscriptions",
+    "services",
+    "sharedUsers",
+    "softwareUpdates",
+    "userProfiles",
+}
+# Fields of a generated computer, in the order of the values of a row. The
+# names are the RSQL fields of /api/v1/computers-inventory and the paths
+# where they are found in its records.
+COMPUTER_FIELDS = (
+    "id",
+    "udid",
+    "general.name",
+    "general.assetTag",
+    "general.lastIpAddress",
+    "general.platform",
+    "general.supervised",
+    "general.managementId",
+    "general.remoteManagement.managed",
+    "general.lastContactTime",
+    "general.lastEnrolledDate",
+    "general.reportDate",
+    "general.enrolledViaAutomatedDeviceEnrollment",
+    "hardware.make",
+    "hardware.model",
+    "hardware.modelIdentifier",
+    "hardware.serialNumber",
+    "hardware.macAddress",
+    "hardware.appleSilicon",
+    "operatingSystem.name",
+    "operatingSystem.version",
+    "operatingSystem.build",
+    "operatingSystem.fileVault2Status",
+    "userAndLocation.username",
+    "userAndLocation.realname",
+    "userAndLocation.email",
+    "userAndLocation.buildingId",
+    "userAndLocation.departmentId",
+    "purchasing.purchased",
+    "purchasing.warrantyDate",
+    "security.firewallEnabled",
+    "security.activationLockEnabled",
+)
+COMPUTER_PATHS = tuple(tuple(field.split(".")) for field in COMPUTER_FIELDS)
+COMPUTER = {field: index for index, field in enumerate(COMPUTER_FIELDS)}
+# Fields of a generated mobile device, in the order of the values of a row,
+# with the RSQL names of /api/v2/mobile-devices/detail and the paths where
+# they are found in its records
+MOBILE_DEVICE_FIELDS = (
+    ("mobileDeviceId", ("mobileDeviceId",)),
+    ("displayName", ("general", "displayName")),
+    ("udid", ("general", "udid")),
+    ("managementId", ("general", "managementId")),
+    ("assetTag", ("general", "assetTag")),
+    ("ipAddress", ("general", "ipAddress")),
+    ("osVersion", ("general", "osVersion")),
+    ("osBuild", ("general", "osBuild")),
+    ("supervised", ("general", "supervised")),
+    ("managed", ("general", "managed")),
+    ("lastEnrolledDate", ("general", "lastEnrolledDate")),
+    ("lastInventoryUpdateDate", ("general", "lastInventoryUpdateDate")),
+    ("serialNumber", ("hardware", "serialNumber")),
+    ("wifiMacAddress", ("hardware", "wifiMacAddress")),
+    ("model", ("hardware", "model")),
+    ("modelIdentifier", ("hardware", "modelIdentifier")),
+    ("capacityMb", ("hardware", "capacityMb")),
+    ("batteryLevel", ("hardware", "batteryLevel")),
+    ("username", ("userAndLocation", "username")),
+    ("fullName", ("userAndLocation", "realName")),
+    ("emailAddress", ("userAndLocation", "emailAddress")),
+    ("building", ("userAndLocation", "buildingId")),
+    ("department", ("userAndLocation", "departmentId")),
+    ("activationLockEnabled", ("security", "activationLockEnabled")),
+    ("passcodePresent", ("security", "passcodePresent")),
+)
+MOBILE_DEVICE = {name: index for index, (name, _) in enumerate(MOBILE_DEVICE_FIELDS)}
+# Fields of /api/v2/mobile-devices records and the detail fields they hold
+MOBILE_DEVICE_LIST_FIELDS = {
+    "id": "mobileDeviceId",
+    "name": "displayName",
+    "serialNumber": "serialNumber",
+    "wifiMacAddress": "wifiMacAddress",
+    "udid": "udid",
+    "model": "model",
+    "modelIdentifier": "modelIdentifier",
+    "username": "username",
+    "managementId": "managementId",
+}
+MAX_PAGE_SIZE = 2000
+TOKEN_LIFETIME = timedelta(minutes=20)
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+MAC_MODELS = (
+    ("MacBook Pro (14-inch, 2023)", "Mac14,9", True),
+    ("MacBook Pro (16-inch, 2023)", "Mac14,10", True),
+    ("MacBook Air (M2, 2022)", "Mac14,2", True),
+    ("MacBook Air (M1, 2020)", "MacBookAir10,1", True),
+    ("iMac (24-inch, M1, 2021)", "iMac21,1", True),
+    ("Mac mini (M2, 2023)", "Mac14,3", True),
+    ("MacBook Pro (13-inch, 2020)", "MacBookPro16,2", False),
+    ("MacBook Air (Retina, 13-inch, 2020)", "MacBookAir9,1", False),
+)
+MACOS_VERSIONS = (
+    ("14.4.1", "23E224"),
+    ("14.5", "23F79"),
+    ("14.6.1", "23G93"),
+    ("15.0", "24A335"),
+    ("13.6.7", "22G720"),
+    ("12.7.5", "21H1222"),
+)
+FILEVAULT_STATUSES = ("ALL_ENCRYPTED", "ALL_ENCRYPTED", "NOT_ENCRYPTED", "ENCRYPTING")
+IPAD_MODELS = (
+    ("iPad (9th generation)", "iPad12,1", 65536),
+    ("iPad (10th generation)", "iPad13,18", 65536),
+    ("iPad Air (5th generation)", "iPad13,16", 131072),
+    ("iPad Pro (11-inch) (4th generation)", "iPad14,3", 262144),
+)
+IPADOS_VERSIONS = (("17.4.1", "21E237"), ("17.5", "21F79"), ("16.7.8", "20H343"))
+FIRST_NAMES = (
+    "Alex",
+    "Blake",
+    "Casey",
+    "Dana",
+    "Emery",
+    "Frankie",
+    "Harper",
+    "Jordan",
+    "Kai",
+    "Logan",
+    "Morgan",
+    "Quinn",
+    "Riley",
+    "Sam",
+    "Taylor",
+)
+LAST_NAMES = (
+    "Anderson",
+    "Brown",
+    "Garcia",
+    "Johnson",
+    "Lee",
+    "Martinez",
+    "Nguyen",
+    "Patel",
+    "Smith",
+    "Williams",
+)
+APPLICATIONS = (
+    ("Safari", "com.apple.Safari", "17.4"),
+    ("Google Chrome", "com.google.Chrome", "124.0.6367.91"),
+    ("Firefox", "org.mozilla.firefox", "125.0.3"),
+    ("Microsoft Word", "com.microsoft.Word", "16.84"),
+    ("Microsoft Excel", "com.microsoft.Excel", "16.84"),
+    ("Microsoft PowerPoint", "com.microsoft.Powerpoint", "16.84"),
+    ("Microsoft Outlook", "com.microsoft.Outlook", "16.84"),
+    ("Microsoft Teams", "com.microsoft.teams2", "24102.2223.2870.9480"),
+    ("Slack", "com.tinyspeck.slackmacgap", "4.38.121"),
+    ("Zoom", "us.zoom.xos", "6.0.2"),
+    ("Self Service", "com.jamfsoftware.selfservice.mac", "11.5.0"),
+    ("Keynote", "com.apple.iWork.Keynote", "14.0"),
+    ("Pages", "com.apple.iWork.Pages", "14.0"),
+    ("Numbers", "com.apple.iWork.Numbers", "14.0"),
+    ("Xcode", "com.apple.dt.Xcode", "15.3"),
+    ("Visual Studio Code", "com.microsoft.VSCode", "1.89.0"),
+    ("Adobe Acrobat Reader", "com.adobe.Reader", "24.002.20687"),
+    ("1Password", "com.1password.1password", "8.10.30"),
+    ("VLC", "org.videolan.vlc", "3.0.20"),
+    ("Docker", "com.docker.docker", "4.29.0"),
+)
+
+
+class Fleet:
+    """
+    Synthetic computers and mobile devices served by MockJamfServer, see
+    generate_fleet. Each device is a tuple of the values of COMPUTER_FIELDS
+    or MOBILE_DEVICE_FIELDS, which keeps 100k devices in memory cheaply.
+
+    :param computers: Rows of computer field values
+    :param mobile_devices: Rows of mobile device field values
+    """
+
+    def __init__(self, computers: List[tuple] = (), mobile_devices: List[tuple] = ()):
+        self.computers = list(computers)
+        self.mobile_devices = list(mobile_devices)
+
+    def __repr__(self):
+        return (
+            f"Fleet(computers={len(self.computers)}, "
+            f"mobile_devices={len(self.mobile_devices)})"
+        )
+
+
+def generate_fleet(
+    computers: int = 100000,
+    mobile_devices: int = 0,
+    seed: int = 0,
+    now: datetime = None,
+) -> Fleet:
+    """
+    Generates a fleet of devices with realistic names, serial numbers,
+    models, OS versions, users and report dates. The same seed and now
+    always generate the same fleet.
+
+    :param computers: Number of computers
+    :param mobile_devices: Number of mobile devices
+    :param seed: Seed of the random generator
+    :param now:
+        Time the devices last reported before, defaults to the current time
+
+    :returns: Fleet
+    """
+    rng = _Random(seed)
+    now = now or datetime.now(timezone.utc)
+    return Fleet(
+        [_computer(rng, id, now) for id in range(1, computers + 1)],
+        [_mobile_device(rng, id, now) for id in range(1, mobile_devices + 1)],
+    )
+
+
+class _Random(random.Random):
+    # randint and choice without the rejection sampling of random.Random,
+    # which makes generating a large fleet several times faster
+    def randint(self, a: int, b: int) -> int:
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+
+def _computer(rng: random.Random, id: int, now: datetime) -> tuple:
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    username = f"{first[0].lower()}{last.lower()}{id}"
+    model, identifier, apple_silicon = rng.choice(MAC_MODELS)
+    version, build = rng.choice(MACOS_VERSIONS)
+    serial = _serial(rng, "C02")
+    enrolled = now - timedelta(days=rng.randint(30, 1500))
+    report = now - timedelta(seconds=rng.randint(60, 30 * 86400))
+    contact = min(report + timedelta(seconds=rng.randint(0, 86400)), now)
+    purchased = enrolled - timedelta(days=rng.randint(1, 30))
+    return (
+        id,
+        str(UUID(int=rng.getrandbits(128), version=4)).upper(),
+        f"{username}-{identifier.split(',')[0]}",
+        f"A{id:07d}",
+        f"10.{rng.randint(0, 31)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+        "Mac",
+        True,
+        str(UUID(int=rng.getrandbits(128), version=4)),
+        True,
+        contact.strftime(DATE_FORMAT),
+        enrolled.strftime(DATE_FORMAT),
+        report.strftime(DATE_FORMAT),
+        rng.random() < 0.8,
+        "Apple",
+        model,
+        identifier,
+        serial,
+        _mac(rng),
+        apple_silicon,
+        "macOS",
+        version,
+        build,
+        rng.choice(FILEVAULT_STATUSES),
+        username,
+        f"{first} {last}",
+        f"{username}@example.com",
+        str(rng.randint(1, 10)),
+        str(rng.randint(1, 20)),
+        purchased.strftime("%Y-%m-%d"),
+        (purchased + timedelta(days=3 * 365)).strftime("%Y-%m-%d"),
+        rng.random() < 0.9,
+        rng.random() < 0.5,
+    )
+
+
+def _mobile_device(rng: random.Random, id: int, now: datetime) -> tuple:
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    username = f"{first[0].lower()}{last.lower()}{id}"
+    model, identifier, capacity = rng.choice(IPAD_MODELS)
+    version, build = rng.choice(IPADOS_VERSIONS)
+    enrolled = now - timedelta(days=rng.randint(30, 1500))
+    inventory = now - timedelta(seconds=rng.randint(60, 7 * 86400))
+    return (
+        id,
+        f"iPad-{username}",
+        f"{rng.getrandbits(160):040x}",
+        str(UUID(int=rng.getrandbits(128), version=4)),
+        f"M{id:07d}",
+        f"10.{rng.randint(32, 63)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+        version,
+        build,
+        True,
+        True,
+        enrolled.strftime(DATE_FORMAT),
+        inventory.strftime(DATE_FORMAT),
+        _serial(rng, "DM"),
+        _mac(rng),
+        model,
+        identifier,
+        capacity,
+        rng.randint(5, 100),
+        username,
+        f"{first} {last}",
+        f"{username}@example.com",
+        str(rng.randint(1, 10)),
+        str(rng.randint(1, 20)),
+        rng.random() < 0.95,
+        rng.random() < 0.97,
+    )
+
+
+def _serial(rng: random.Random, prefix: str) -> str:
+    characters = "0123456789ABCDEFGHJKLMNPQRSTUVWXYZ"
+    return prefix + "".join(rng.choices(characters, k=12 - len(prefix)))
+
+
+def _mac(rng: random.Random) -> str:
+    value = rng.getrandbits(48)
+    return ":".join(f"{(value >> shift) & 0xFF:02x}" for shift in range(40, -8, -8))
+
+
+class _Collection:
+    """
+    Answers paged, sorted and filtered queries over rows of a Fleet, caching
+    the ordered matches of recent queries so paging through them stays cheap
+    """
+
+    def __init__(self, rows: list, fields: Dict[str, int], default_sort: str):
+        self.rows = rows
+        self.fields = fields
+        self.default_sort = default_sort
+        self._ids = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._ids = None
+            self._cache.clear()
+
+    def get(self, id: str):
+        if self._ids is None or len(self._ids) != len(self.rows):
+            self._ids = {str(row[0]): row for row in self.rows}
+        return self._ids.get(id)
+
+    def query(self, params: dict) -> Tuple[int, list]:
+        page = int(_first(params, "page", "0"))
+        page_size = min(int(_first(params, "page-size", "100")), MAX_PAGE_SIZE)
+        sort = ",".join(params.get("sort", [])) or self.default_sort
+        query = _first(params, "filter", "")
+        key = (sort, query)
+        with self._lock:
+            rows = self._cache.get(key)
+            if rows is not None:
+                self._cache.move_to_end(key)
+        if rows is None:
+            rows = self._select(sort, query)
+            with self._lock:
+                self._cache[key] = rows
+                while len(self._cache) > 16:
+                    self._cache.popitem(last=False)
+        start = page * page_size
+        end = start + page_size
+        return len(rows), rows[start:end]
+
+    def _select(self, sort: str, query: str) -> list:
+        rows = self.rows
+        if query:
+            node = parse(query)
+            for field in node.fields():
+                self._index(field)
+            fields = self.fields
+            rows = [
+                row for row in rows if node.evaluate(lambda name: row[fields[name]])
+            ]
+        else:
+            rows = list(rows)
+        for criterion in reversed(sort.split(",")):
+            field, _, direction = criterion.partition(":")
+            index = self._index(field)
+            rows.sort(
+                key=lambda row: (row[index] is None, row[index]),
+                reverse=direction.lower() == "desc",
+            )
+        return rows
+
+    def _index(self, field: str) -> int:
+        if field not in self.fields:
+            raise InvalidFilter(f"{field} is not a field of this collection.")
+        return self.fields[field]
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """
+    HTTP server handling each request in a thread, http.server's own only
+    exists from Python 3.7
+    """
+
+    daemon_threads = True
+
+
+class MockJamfServer:
+    """
+    Serves the Classic and Pro APIs for a synthetic Fleet on a local port,
+    with configurable latency, errors and throttling per endpoint prefix.
+    Use it in a with statement or call start and stop.
+
+    Endpoints:
+
+    - POST /api/v1/auth/token, /api/oauth/token, /api/v1/auth/keep-alive and
+      /api/v1/auth/invalidate-token, any credentials are accepted and other
+      requests need a token they returned
+    - GET /api/startup-status and /api/v1/health-check
+    - GET /api/v1/computers-inventory with section, page, page-size, sort
+      and filter, /api/v1/computers-inventory/{id} and
+      /api/v1/computers-inventory-detail/{id}
+    - GET /api/v2/mobile-devices with page, page-size and sort,
+      /api/v2/mobile-devices/{id}, /api/v2/mobile-devices/detail with
+      section, page, page-size, sort and filter and
+      /api/v2/mobile-devices/{id}/detail
+    - GET /JSSResource/computers, /JSSResource/computers/subset/basic,
+      /JSSResource/computers/match/{match} and
+      /JSSResource/computers/{id|name|udid|serialnumber|macaddress}/{value}
+      in JSON or XML
+    - GET /JSSResource/mobiledevices and /JSSResource/mobiledevices/id/{id}
+    - GET /api/v1/branding-images/download/{id} which returns download_size
+      bytes and POST /api/v2/enrollment-customizations/images which accepts
+      a multipart upload, for measuring file transfers
+
+    :param fleet: Fleet to serve, 1000 generated computers if not given
+    :param latency:
+        Optional dict of endpoint prefixes and the seconds requests to them
+        take, either a number or a (min, max) range
+        e.g. {"/api/v1/computers-inventory": (0.2, 0.5)}
+    :param error_rates:
+        Optional dict of endpoint prefixes and the fraction of requests to
+        them answered with error_status e.g. {"/": 0.01}
+    :param throttle:
+        Optional dict of endpoint prefixes and how many of their requests
+        may be handled at once, further requests get a 429 response
+    :param section_costs:
+        Optional dict of computer inventory sections and the seconds each
+        record adds to a computers-inventory request that includes them,
+        modelling the tables the JPS server joins per section
+        e.g. {"APPLICATIONS": 0.001, "GENERAL": 0.0002}
+    :param error_status: Status code of injected errors
+    :param download_size: Size in bytes of downloaded branding images
+    :param seed: Seed of the random generator for latency and errors
+    :param host: Interface to listen on
+    :param port: Port to listen on, a free port is picked if 0
+    """
+
+    def __init__(
+        self,
+        fleet: Fleet = None,
+        latency: Dict[str, Union[float, Tuple[float, float]]] = None,
+        error_rates: Dict[str, float] = None,
+        throttle: Dict[str, int] = None,
+        section_costs: Dict[str, float] = None,
+        error_status: int = 500,
+        download_size: int = 1024 * 1024,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.fleet = fleet if fleet is not None else generate_fleet(1000)
+        self.latency = latency or {}
+        self.error_rates = error_rates or {}
+        self.throttle = throttle or {}
+        self.section_costs = {
+            COMPUTER_SECTIONS[name]: cost
+            for name, cost in (section_costs or {}).items()
+        }
+        self.error_status = error_status
+        self.download_size = download_size
+        self.requests = Counter()
+        self.computers = _Collection(self.fleet.computers, COMPUTER, "general.name:asc")
+        mobile_fields = dict(MOBILE_DEVICE, deviceId=MOBILE_DEVICE["mobileDeviceId"])
+        self.mobile_devices = _Collection(
+            self.fleet.mobile_devices, mobile_fields, "displayName:asc"
+        )
+        self.mobile_device_list = _Collection(
+            self.fleet.mobile_devices,
+            {
+                name: mobile_fields[field]
+                for name, field in MOBILE_DEVICE_LIST_FIELDS.items()
+            },
+            "id:asc",
+        )
+        self._tokens = set()
+        self._in_flight = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.jamf = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the server e.g. http://127.0.0.1:8080
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Starts serving requests on a background thread
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving requests and closes the listening socket
+        """
+        if self._thread:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def fleet_changed(self):
+        """
+        Drops the cached results of queries, call after changing the rows of
+        the fleet so the server answers with the changed devices
+        """
+        for collection in (
+            self.computers,
+            self.mobile_devices,
+            self.mobile_device_list,
+        ):
+            collection.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.stop()
+
+    def handle(
+        self, method: str, target: str, headers, body: bytes = b""
+    ) -> Tuple[int, dict, bytes]:
+        """
+        Answers a request, called by the request handler for each request
+
+        :param method: HTTP method e.g. GET
+        :param target: Path and query string of the request
+        :param headers: Request headers
+        :param body: Request body
+
+        :returns: Status code, headers and body of the response
+        """
+        split = urlsplit(target)
+        path = unquote(split.path)
+        params = parse_qs(split.query)
+        with self._lock:
+            self.requests[f"{method} {normalize_endpoint(path)}"] += 1
+        prefixes = [key for key in self.throttle if path.startswith(key)]
+        prefix = max(prefixes, key=len) if prefixes else None
+        if prefix is not None:
+            with self._lock:
+                if self._in_flight[prefix] >= self.throttle[prefix]:
+                    return _error(429, "Too many requests")
+                self._in_flight[prefix] += 1
+        try:
+            delay = match_prefix(self.latency, path)
+            if isinstance(delay, tuple):
+                delay = self._random.uniform(*delay)
+            if delay:
+                time.sleep(delay)
+            rate = match_prefix(self.error_rates, path)
+            if rate and self._random.random() < rate:
+                return _error(self.error_status, "Injected error")
+            return self._route(method, path, params, headers, body)
+        finally:
+            if prefix is not None:
+                with self._lock:
+                    self._in_flight[prefix] -= 1
+
+    def _route(self, method: str, path: str, params: dict, headers, body: bytes):
+        if method == "POST" and path in ("/api/v1/auth/token", "/api/oauth/token"):
+            return self._token(path == "/api/oauth/token")
+        token = headers.get("Authorization", "").partition("Bearer ")[2]
+        if path in ("/api/startup-status", "/api/v1/health-check"):
+            if path == "/api/startup-status":
+                return _json({"step": "SERVER_INIT_COMPLETE", "percentage": 100})
+            return _json([])
+        if token not in self._tokens:
+            return _error(401, "Unauthorized")
+        if method == "POST" and path == "/api/v1/auth/keep-alive":
+            self._tokens.discard(token)
+            return self._token(False)
+        if method == "POST" and path == "/api/v1/auth/invalidate-token":
+            self._tokens.discard(token)
+            return 204, {}, b""
+        if method == "POST" and path == "/api/v2/enrollment-customizations/images":
+            if b"Content-Disposition: form-data" not in body:
+                return _error(400, "Expected a multipart file upload")
+            return _json({"url": f"{self.url}/images/{uuid4().hex}.png"}, 201)
+        if method != "GET":
+            return _error(405, "Method not allowed")
+        segments = path.rstrip("/").split("/")[1:]
+        try:
+            if segments[:3] == ["api", "v1", "computers-inventory"]:
+                return self._computers_inventory(segments[3:], params)
+            if segments[:3] == ["api", "v1", "computers-inventory-detail"]:
+                if len(segments) == 4:
+                    params = {"section": list(COMPUTER_SECTIONS)}
+                    return self._computers_inventory(segments[3:], params)
+            if segments[:3] == ["api", "v2", "mobile-devices"]:
+                return self._mobile_devices(segments[3:], params)
+            if segments[:4] == ["api", "v1", "branding-images", "download"]:
+                return self._download(segments[4:])
+            if segments[:2] == ["JSSResource", "computers"]:
+                return self._classic_computers(segments[2:], headers)
+            if segments[:2] == ["JSSResource", "mobiledevices"]:
+                return self._classic_mobile_devices(segments[2:], headers)
+        except (InvalidFilter, ValueError) as error:
+            return _error(400, str(error))
+        return _error(404, "Not found")
+
+    def _token(self, oauth: bool):
+        token = uuid4().hex
+        self._tokens.add(token)
+        if oauth:
+            return _json(
+                {
+                    "access_token": token,
+                    "expires_in": int(TOKEN_LIFETIME.total_seconds()),
+                    "token_type": "Bearer",
+                }
+            )
+        expires = datetime.now(timezone.utc) + TOKEN_LIFETIME
+        return _json({"token": token, "expires": expires.strftime(DATE_FORMAT)})
+
+    def _download(self, segments: list):
+        if len(segments) != 1:
+            return _error(404, "Branding image not found")
+        headers = {
+            "Content-Type": "image/png",
+            "Content-Disposition": f'attachment; filename="branding-{segments[0]}.png"',
+        }
+        return 200, headers, bytes(self.download_size)
+
+    def _computers_inventory(self, segments: list, params: dict):
+        sections = _sections(params, COMPUTER_SECTIONS)
+        if not segments:
+            total, rows = self.computers.query(params)
+            cost = sum(self.section_costs.get(name, 0) for name in sections)
+            if cost:
+                time.sleep(cost * len(rows))
+            return _json(
+                {
+                    "totalCount": total,
+                    "results": [_inventory(row, sections) for row in rows],
+                }
+            )
+        row = self.computers.get(segments[0])
+        if row is None or len(segments) > 1:
+            return _error(404, "Computer not found")
+        return _json(_inventory(row, sections))
+
+    def _mobile_devices(self, segments: list, params: dict):
+        if segments == ["detail"]:
+            sections = _sections(params, MOBILE_DEVICE_SECTIONS)
+            total, rows = self.mobile_devices.query(params)
+            return _json(
+                {
+                    "totalCount": total,
+                    "results": [_mobile_detail(row, sections) for row in rows],
+                }
+            )
+        if not segments:
+            total, rows = self.mobile_device_list.query(params)
+            return _json(
+                {"totalCount": total, "results": [_mobile_item(row) for row in rows]}
+            )
+        row = self.mobile_devices.get(segments[0])
+        if row is None or len(segments) > 2 or segments[1:] not in ([], ["detail"]):
+            return _error(404, "Mobile device not found")
+        if segments[1:] == ["detail"]:
+            return _json(_mobile_detail(row, set(MOBILE_DEVICE_SECTIONS.values())))
+        return _json(_mobile_item(row))
+
+    def _classic_computers(self, segments: list, headers):
+        rows = self.fleet.computers
+        if not segments:
+            return _classic(
+                headers,
+                "computers",
+                [{"id": row[0], "name": row[COMPUTER["general.name"]]} for row in rows],
+            )
+        if segments == ["subset", "basic"]:
+            return _classic(headers, "computers", [_classic_basic(r) for r in rows])
+        if len(segments) == 2 and segments[0] == "match":
+            pattern = Comparison("general.name", "==", [segments[1]])
+            index = COMPUTER["general.name"]
+            matched = [
+                _classic_basic(row)
+                for row in rows
+                if pattern.evaluate(lambda name: row[index])
+            ]
+            return _classic(headers, "computers", matched)
+        lookups = {
+            "id": "id",
+            "udid": "udid",
+            "name": "general.name",
+            "serialnumber": "hardware.serialNumber",
+            "macaddress": "hardware.macAddress",
+        }
+        if len(segments) >= 2 and segments[0] in lookups:
+            index = COMPUTER[lookups[segments[0]]]
+            value = segments[1].casefold()
+            for row in rows:
+                if str(row[index]).casefold() == value:
+                    return _classic(headers, "computer", _classic_computer(row))
+        return _error(404, "The server has not found anything matching the request")
+
+    def _classic_mobile_devices(self, segments: list, headers):
+        rows = self.fleet.mobile_devices
+        if not segments:
+            return _classic(
+                headers, "mobile_devices", [_classic_mobile(row) for row in rows]
+            )
+        if len(segments) >= 2 and segments[0] == "id":
+            row = self.mobile_devices.get(segments[1])
+            if row is not None:
+                return _classic(headers, "mobile_device", _classic_mobile(row))
+        return _error(404, "The server has not found anything matching the request")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        status, headers, body = self.server.jamf.handle(
+            self.command, self.path, self.headers, self.rfile.read(length)
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+def _first(params: dict, name: str, default: str) -> str:
+    values = params.get(name)
+    return values[0] if values else default
+
+
+def _sections(params: dict, sections: Dict[str, str]) -> set:
+    requested = params.get("section") or ["GENERAL"]
+    names = set()
+    for section in ",".join(requested).split(","):
+        if section == "ALL":
+            return set(sections.values())
+        if section not in sections:
+            raise ValueError(f"{section} is not a valid section.")
+        names.add(sections[section])
+    return names
+
+
+def _inventory(row: tuple, sections: set) -> dict:
+    record = {"id": str(row[0]), "udid": row[1]}
+    for name in COMPUTER_SECTIONS.values():
+        if name not in sections:
+            record[name] = None
+        else:
+            record[name] = [] if name in LIST_SECTIONS else {}
+    for value, path in zip(row[2:], COMPUTER_PATHS[2:]):
+        section = record[path[0]]
+        if section is None:
+            continue
+        for key in path[1:-1]:
+            section = section.setdefault(key, {})
+        section[path[-1]] = value
+    if "applications" in sections:
+        record["applications"] = _applications(row[0])
+    return record
+
+
+def _applications(id: int) -> list:
+    rng = random.Random(id)
+    return [
+        {
+            "name": f"{name}.app",
+            "path": f"/Applications/{name}.app",
+            "version": version,
+            "macAppStore": False,
+            "sizeMegabytes": rng.randint(5, 2000),
+            "bundleId": bundle,
+            "updateAvailable": rng.random() < 0.1,
+            "externalVersionId": "0",
+        }
+        for name, bundle, version in rng.sample(APPLICATIONS, rng.randint(8, 20))
+    ]
+
+
+def _mobile_detail(row: tuple, sections: set) -> dict:
+    record = {"mobileDeviceId": str(row[0]), "deviceType": "iOS"}
+    for name in MOBILE_DEVICE_SECTIONS.values():
+        if name in sections:
+            record[name] = [] if name in LIST_SECTIONS else {}
+    for value, (_, path) in zip(row[1:], MOBILE_DEVICE_FIELDS[1:]):
+        if path[0] in record:
+            record[path[0]][path[1]] = value
+    return record
+
+
+def _mobile_item(row: tuple) -> dict:
+    return {
+        "id": str(row[MOBILE_DEVICE["mobileDeviceId"]]),
+        "name": row[MOBILE_DEVICE["displayName"]],
+        "serialNumber": row[MOBILE_DEVICE["serialNumber"]],
+        "wifiMacAddress": row[MOBILE_DEVICE["wifiMacAddress"]],
+        "udid": row[MOBILE_DEVICE["udid"]],
+        "phoneNumber": "",
+        "model": row[MOBILE_DEVICE["model"]],
+        "modelIdentifier": row[MOBILE_DEVICE["modelIdentifier"]],
+        "username": row[MOBILE_DEVICE["username"]],
+        "type": "ios",
+        "managementId": row[MOBILE_DEVICE["managementId"]],
+        "softwareUpdateDeviceId": row[MOBILE_DEVICE["modelIdentifier"]],
+    }
+
+
+def _classic_basic(row: tuple) -> dict:
+    return {
+        "id": row[COMPUTER["id"]],
+        "name": row[COMPUTER["general.name"]],
+        "managed": row[COMPUTER["general.remoteManagement.managed"]],
+        "username": row[COMPUTER["userAndLocation.username"]],
+        "model": row[COMPUTER["hardware.model"]],
+        "department": row[COMPUTER["userAndLocation.departmentId"]],
+        "building": row[COMPUTER["userAndLocation.buildingId"]],
+        "mac_address": row[COMPUTER["hardware.macAddress"]].upper(),
+        "udid": row[COMPUTER["udid"]],
+        "serial_number": row[COMPUTER["hardware.serialNumber"]],
+        "report_date_utc": row[COMPUTER["general.reportDate"]],
+        "report_date_epoch": _epoch(row[COMPUTER["general.reportDate"]]),
+    }
+
+
+def _classic_computer(row: tuple) -> dict:
+    return {
+        "general": {
+            "id": row[COMPUTER["id"]],
+            "name": row[COMPUTER["general.name"]],
+            "mac_address": row[COMPUTER["hardware.macAddress"]].upper(),
+            "serial_number": row[COMPUTER["hardware.serialNumber"]],
+            "udid": row[COMPUTER["udid"]],
+            "asset_tag": row[COMPUTER["general.assetTag"]],
+            "ip_address": row[COMPUTER["general.lastIpAddress"]],
+            "platform": row[COMPUTER["general.platform"]],
+            "report_date_utc": row[COMPUTER["general.reportDate"]],
+            "report_date_epoch": _epoch(row[COMPUTER["general.reportDate"]]),
+            "last_contact_time_utc": row[COMPUTER["general.lastContactTime"]],
+            "last_contact_time_epoch": _epoch(row[COMPUTER["general.lastContactTime"]]),
+            "remote_management": {
+                "managed": row[COMPUTER["general.remoteManagement.managed"]]
+            },
+        },
+        "location": {
+            "username": row[COMPUTER["userAndLocation.username"]],
+            "realname": row[COMPUTER["userAndLocation.realname"]],
+            "email_address": row[COMPUTER["userAndLocation.email"]],
+            "building": row[COMPUTER["userAndLocation.buildingId"]],
+            "department": row[COMPUTER["userAndLocation.departmentId"]],
+        },
+        "hardware": {
+            "make": row[COMPUTER["hardware.make"]],
+            "model": row[COMPUTER["hardware.model"]],
+            "model_identifier": row[COMPUTER["hardware.modelIdentifier"]],
+            "os_name": row[COMPUTER["operatingSystem.name"]],
+            "os_version": row[COMPUTER["operatingSystem.version"]],
+            "os_build": row[COMPUTER["operatingSystem.build"]],
+            "filevault2_status": row[COMPUTER["operatingSystem.fileVault2Status"]],
+        },
+    }
+
+
+def _classic_mobile(row: tuple) -> dict:
+    return {
+        "id": row[MOBILE_DEVICE["mobileDeviceId"]],
+        "name": row[MOBILE_DEVICE["displayName"]],
+        "device_name": row[MOBILE_DEVICE["displayName"]],
+        "udid": row[MOBILE_DEVICE["udid"]],
+        "serial_number": row[MOBILE_DEVICE["serialNumber"]],
+        "phone_number": "",
+        "wifi_mac_address": row[MOBILE_DEVICE["wifiMacAddress"]].upper(),
+        "managed": row[MOBILE_DEVICE["managed"]],
+        "supervised": row[MOBILE_DEVICE["supervised"]],
+        "model": row[MOBILE_DEVICE["model"]],
+        "model_identifier": row[MOBILE_DEVICE["modelIdentifier"]],
+        "model_display": row[MOBILE_DEVICE["model"]],
+        "username": row[MOBILE_DEVICE["username"]],
+    }
+
+
+def _epoch(date: str) -> int:
+    parsed = datetime.strptime(date, DATE_FORMAT).replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def _json(data, status: int = 200) -> Tuple[int, dict, bytes]:
+    return status, {"Content-Type": "application/json"}, json.dumps(data).encode()
+
+
+def _error(status: int, description: str) -> Tuple[int, dict, bytes]:
+    body = {
+        "httpStatus": status,
+        "errors": [{"code": str(status), "description": description}],
+    }
+    return status, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+def _classic(headers, name: str, data) -> Tuple[int, dict, bytes]:
+    if "xml" in headers.get("Accept", ""):
+        if isinstance(data, list):
+            data = {"size": len(data), "": data}
+        body = '<?xml version="1.0" encoding="UTF-8"?>' + _xml(name, data)
+        return 200, {"Content-Type": "text/xml;charset=UTF-8"}, body.encode()
+    return _json({name: data})
+
+
+def _xml(tag: str, value) -> str:
+    if isinstance(value, dict):
+        children = []
+        for key, child in value.items():
+            if key == "" and isinstance(child, list):
+                singular = tag[:-1]
+                children.extend(_xml(singular, item) for item in child)
+            else:
+                children.append(_xml(key, child))
+        return f"<{tag}>{''.join(children)}</{tag}>"
+    if isinstance(value, bool):
+        value = str(value).lower()
+    return f"<{tag}>{escape(str(value))}</{tag}>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--computers", type=int, default=100000)
+    parser.add_argument("--mobile-devices", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    fleet = generate_fleet(args.computers, args.mobile_devices, args.seed)
+    server = MockJamfServer(
+        fleet,
+        latency={"/": args.latency},
+        error_rates={"/": args.error_rate},
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Serving {fleet} on {server.url}")
+    with server:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ from mimetypes import guess_type
 from os.path import basename
 from typing import List, Union
 
-from jps_api_wrapper.request_builder import RequestBuilder
+from jps_api_wrapper.request_builder import EXPORT_TIMEOUT, RequestBuilder
 from jps_api_wrapper.utils import (
     check_conflicting_params,
     enforce_type,
@@ -18,8 +18,8 @@ __all__ = ["Pro", "paginate"]
 
 
 class Pro(RequestBuilder):
-    def __init__(self, base_url, username, password, client=False):
-        super().__init__(base_url, username, password, client)  # pragma: no cover
+    def __init__(self, base_url, username, password, client=False, **kwargs):
+        super().__init__(base_url, username, password, client, **kwargs)
 
     """
     activation-code
@@ -811,7 +811,13 @@ class Pro(RequestBuilder):
             }
         )
 
-        return self._post(endpoint, params=params, headers=headers, data_type=None)
+        return self._post(
+            endpoint,
+            params=params,
+            headers=headers,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def get_building_history_export(
         self,
@@ -877,7 +883,13 @@ class Pro(RequestBuilder):
             }
         )
 
-        return self._post(endpoint, params=params, headers=headers, data_type=None)
+        return self._post(
+            endpoint,
+            params=params,
+            headers=headers,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def create_building(self, data: dict) -> dict:
         """
@@ -1592,7 +1604,13 @@ class Pro(RequestBuilder):
         headers = {"accept": "text/csv", "content-type": "application/json"}
         endpoint = "/api/v1/cloud-idp/export"
 
-        return self._post(endpoint, params=params, headers=headers, data_type=None)
+        return self._post(
+            endpoint,
+            params=params,
+            headers=headers,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def create_cloud_idp_history_note(self, data: dict, id: Union[int, str]) -> dict:
         """
@@ -3708,7 +3726,13 @@ class Pro(RequestBuilder):
         headers = {"Content-type": "application/json", "Accept": "text/csv"}
         endpoint = "/api/v2/enrollment/history/export"
 
-        return self._post(endpoint, params=params, headers=headers, data_type=None)
+        return self._post(
+            endpoint,
+            params=params,
+            headers=headers,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def get_enrollment_adue_session_token_settings(self):
         """
@@ -4820,7 +4844,7 @@ class Pro(RequestBuilder):
         """
         endpoint = "/api/v2/inventory-preload/csv"
 
-        return self._get(endpoint, data_type=None)
+        return self._get(endpoint, data_type=None, timeout=EXPORT_TIMEOUT)
 
     # TODO export_fields and export_labels are not actually working correctly
     def get_inventory_preloads_export(
@@ -4883,7 +4907,13 @@ class Pro(RequestBuilder):
         headers = {"Content-type": "application/json", "Accept": "text/csv"}
         endpoint = "/api/v2/inventory-preload/export"
 
-        return self._post(endpoint, params=params, headers=headers, data_type=None)
+        return self._post(
+            endpoint,
+            params=params,
+            headers=headers,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def create_inventory_preload(self, data: dict) -> dict:
         """
@@ -4957,7 +4987,7 @@ class Pro(RequestBuilder):
         file = {"file": (filename, open(filepath, "rb"), content_type)}
         endpoint = "/api/v2/inventory-preload/csv"
 
-        return self._post(endpoint, file=file)
+        return self._post(endpoint, file=file, timeout=EXPORT_TIMEOUT)
 
     def update_inventory_preload(self, data: dict, id: Union[int, str]) -> dict:
         """
@@ -5953,7 +5983,9 @@ class Pro(RequestBuilder):
         headers = {"Content-type": "application/json", "Accept": "text/csv"}
         endpoint = "/api/v2/jamf-remote-assist/session/export"
 
-        return self._post(endpoint, data=data, headers=headers, data_type=None)
+        return self._post(
+            endpoint, data=data, headers=headers, data_type=None, timeout=EXPORT_TIMEOUT
+        )
 
     """
     ldap
@@ -7827,7 +7859,13 @@ class Pro(RequestBuilder):
         headers = {"Content-type": "application/json", "Accept": "text/csv"}
         endpoint = "/api/v1/onboarding/history/export"
 
-        return self._post(endpoint, params=params, headers=headers, data_type=None)
+        return self._post(
+            endpoint,
+            params=params,
+            headers=headers,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def create_onboarding_history_note(self, data: dict) -> dict:
         """
@@ -8031,7 +8069,13 @@ class Pro(RequestBuilder):
         headers = {"Content-type": "application/json", "Accept": "text/csv"}
         endpoint = "/api/v1/packages/export"
 
-        return self._post(endpoint, params=params, headers=headers, data_type=None)
+        return self._post(
+            endpoint,
+            params=params,
+            headers=headers,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def get_package_history_notes_export(
         self,
@@ -8101,7 +8145,13 @@ class Pro(RequestBuilder):
         headers = {"Content-type": "application/json", "Accept": "text/csv"}
         endpoint = f"/api/v1/packages/{id}/history/export"
 
-        return self._post(endpoint, params=params, headers=headers, data_type=None)
+        return self._post(
+            endpoint,
+            params=params,
+            headers=headers,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def create_package(self, data: dict) -> dict:
         """
@@ -8762,7 +8812,13 @@ class Pro(RequestBuilder):
         headers = {"Content-type": "application/json", "Accept": "text/csv"}
         endpoint = f"/api/v2/patch-software-title-configurations/{id}/export-report"
 
-        return self._get(endpoint, params=params, headers=headers, data_type=None)
+        return self._get(
+            endpoint,
+            params=params,
+            headers=headers,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def get_patch_software_title_configuration_extension_attributes(
         self, id: Union[int, str]
@@ -9155,7 +9211,13 @@ class Pro(RequestBuilder):
         headers = {"Content-type": "application/json", "Accept": "text/csv"}
         endpoint = "/api/v1/reenrollment/history/export"
 
-        return self._post(endpoint, headers=headers, params=params, data_type=None)
+        return self._post(
+            endpoint,
+            headers=headers,
+            params=params,
+            data_type=None,
+            timeout=EXPORT_TIMEOUT,
+        )
 
     def create_reenrollment_history_note(self, data: dict) -> dict:
         """
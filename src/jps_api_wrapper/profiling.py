@@ -0,0 +1,350 @@
+import atexit
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from inspect import isfunction
+from time import perf_counter
+from typing import Dict
+
+try:
+    from time import thread_time
+except ImportError:  # Python 3.6, CPU time of the process instead of the thread
+    from time import process_time as thread_time
+
+# Phases of a request that RequestBuilder times
+WAIT = "wait"
+SEND = "send"
+DECODE = "decode"
+PHASES = (WAIT, SEND, DECODE)
+
+
+class _Call:
+    """
+    Time spent in one call of a client method, shared with the threads that
+    send its requests
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cpu = 0.0
+        self.phases = defaultdict(lambda: [0.0, 0.0])
+        self._lock = threading.Lock()
+
+    def add_cpu(self, cpu: float):
+        with self._lock:
+            self.cpu += cpu
+
+    def add_phase(self, phase: str, wall: float, cpu: float):
+        with self._lock:
+            totals = self.phases[phase]
+            totals[0] += wall
+            totals[1] += cpu
+
+
+class _MethodStats:
+    """
+    Totals of the calls of one client method
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.allocated = 0
+        self.peak = 0
+        self.phases = {phase: [0.0, 0.0] for phase in PHASES}
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "allocated": self.allocated,
+            "peak": self.peak,
+            "phases": {
+                phase: {"wall": wall, "cpu": cpu}
+                for phase, (wall, cpu) in self.phases.items()
+            },
+        }
+
+
+class ClientProfiler:
+    """
+    Attributes the wall time, CPU time and memory of a client to each of its
+    public methods, e.g. Pro.get_computer_inventories, and splits the time
+    of each method into the phases of its requests:
+
+    - wait - Waiting for a slot of the concurrency limiter
+    - send - Sending the request and reading the response body
+    - decode - Decoding JSON response bodies
+
+    The rest of a method's CPU time is spent building requests and handling
+    the decoded data in Python. CPU time includes the threads that send the
+    requests of a method concurrently, so it can be higher than its wall
+    time, and so can the summed phases. Only the outermost client method is
+    recorded when methods call each other.
+
+    Memory is measured with tracemalloc, which is started if it is not
+    already tracing and slows down Python noticeably. allocated is the
+    traced memory still held when a method returned and peak the highest
+    traced memory above its start, both are process wide so they are only
+    accurate for one method call at a time. Before Python 3.9 peak can
+    include memory used before the method was called.
+
+    Give one to a client with the profiler parameter, clients without one
+    skip the bookkeeping entirely.
+
+    :param trace_memory: Whether to measure memory with tracemalloc
+    :param report_at_exit:
+        Whether to write the report when the Python interpreter exits
+    :param file:
+        Path of the file the report is written to, stderr if not given
+    """
+
+    def __init__(
+        self, trace_memory: bool = True, report_at_exit: bool = True, file: str = None
+    ):
+        self.trace_memory = trace_memory
+        self.file = file
+        self._methods = defaultdict(_MethodStats)
+        self._lock = threading.Lock()
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        if report_at_exit:
+            atexit.register(self.dump)
+
+    def attach(self, client):
+        """
+        Wraps the public methods of a client so their calls are profiled,
+        the client's class is left untouched
+
+        :param client: Classic or Pro client
+        """
+        cls = type(client)
+        for name in dir(cls):
+            if name.startswith("_") or not isfunction(getattr(cls, name)):
+                continue
+            method = getattr(client, name)
+            setattr(client, name, self._wrap(f"{cls.__name__}.{name}", method))
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Times a phase of a request for the client method that sent it, does
+        nothing outside of a profiled method
+
+        :param name: Name of the phase e.g. send
+        """
+        call = current_call()
+        if call is None:
+            yield
+            return
+        start = perf_counter()
+        start_cpu = thread_time()
+        try:
+            yield
+        finally:
+            call.add_phase(name, perf_counter() - start, thread_time() - start_cpu)
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Returns a snapshot of the recorded profile
+
+        :returns:
+            Dict of method names and dicts with the calls, wall and cpu
+            seconds, allocated and peak bytes and the wall and cpu seconds of
+            each phase of the method
+        """
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._methods.items()}
+
+    def reset(self):
+        """
+        Clears the recorded profile
+        """
+        with self._lock:
+            self._methods = defaultdict(_MethodStats)
+
+    def report(self) -> str:
+        """
+        Returns the recorded profile as a table sorted by wall time, with the
+        share of each method's wall time that was spent on CPU
+
+        :returns: Report text
+        """
+        header = (
+            "method",
+            "calls",
+            "wall s",
+            "cpu s",
+            "cpu %",
+            "wait s",
+            "send s",
+            "decode s",
+            "alloc KiB",
+            "peak KiB",
+        )
+        rows = []
+        for name, stats in sorted(
+            self.stats().items(), key=lambda item: item[1]["wall"], reverse=True
+        ):
+            wall = stats["wall"]
+            rows.append(
+                (
+                    name,
+                    str(stats["calls"]),
+                    f"{wall:.3f}",
+                    f"{stats['cpu']:.3f}",
+                    f"{stats['cpu'] / wall * 100:.0f}" if wall else "-",
+                    *(f"{stats['phases'][phase]['wall']:.3f}" for phase in PHASES),
+                    f"{stats['allocated'] / 1024:.1f}",
+                    f"{stats['peak'] / 1024:.1f}",
+                )
+            )
+        widths = [max(len(row[i]) for row in [header] + rows) for i in range(10)]
+        lines = [
+            "  ".join(
+                cell.ljust(width) if i == 0 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            )
+            for row in [header] + rows
+        ]
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """
+        Writes the report to the profiler's file, or stderr if it has none,
+        when any method was profiled
+        """
+        if not self._methods:
+            return
+        if self.file:
+            with open(self.file, "w") as f:
+                f.write(self.report())
+        else:
+            sys.stderr.write(self.report())
+
+    def close(self):
+        """
+        Stops tracemalloc if the profiler started it, the recorded profile is
+        kept
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _wrap(self, name: str, method):
+        @wraps(method)
+        def profiled(*args, **kwargs):
+            if current_call() is not None:
+                return method(*args, **kwargs)
+            call = _Call(name)
+            tracing = self.trace_memory and tracemalloc.is_tracing()
+            if tracing:
+                if hasattr(tracemalloc, "reset_peak"):
+                    tracemalloc.reset_peak()
+                memory_start = tracemalloc.get_traced_memory()[0]
+            _calls().append(call)
+            start = perf_counter()
+            start_cpu = thread_time()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                wall = perf_counter() - start
+                call.add_cpu(thread_time() - start_cpu)
+                _calls().pop()
+                allocated = peak = 0
+                if tracing:
+                    current, peak = tracemalloc.get_traced_memory()
+                    allocated = current - memory_start
+                    peak = max(peak - memory_start, 0)
+                self._record(call, wall, allocated, peak)
+
+        return profiled
+
+    def _record(self, call: _Call, wall: float, allocated: int, peak: int):
+        with self._lock:
+            stats = self._methods[call.name]
+            stats.calls += 1
+            stats.wall += wall
+            stats.cpu += call.cpu
+            stats.allocated += allocated
+            stats.peak = max(stats.peak, peak)
+            for phase, (phase_wall, phase_cpu) in call.phases.items():
+                totals = stats.phases.setdefault(phase, [0.0, 0.0])
+                totals[0] += phase_wall
+                totals[1] += phase_cpu
+
+
+_local = threading.local()
+
+
+def _calls() -> list:
+    if not hasattr(_local, "calls"):
+        _local.calls = []
+    return _local.calls
+
+
+def current_call() -> _Call:
+    """
+    Returns the profiled client method call active in the current thread,
+    None if there is none
+    """
+    calls = _calls()
+    return calls[-1] if calls else None
+
+
+@contextmanager
+def join_call(call: _Call):
+    """
+    Makes a profiled call active in the current thread, so requests sent
+    from a worker thread are attributed to the method that started them and
+    the thread's CPU time is added to it
+
+    :param call: Call returned by current_call in the starting thread
+    """
+    if call is None or current_call() is call:
+        yield
+        return
+    _calls().append(call)
+    start_cpu = thread_time()
+    try:
+        yield
+    finally:
+        call.add_cpu(thread_time() - start_cpu)
+        _calls().pop()
+
+
+def carry_call(func):
+    """
+    Returns a callable that runs func under the profiled call active in the
+    current thread, for handing work to a thread pool
+
+    :param func: Callable to run in another thread
+    """
+    call = current_call()
+    if call is None:
+        return func
+
+    @wraps(func)
+    def joined(*args, **kwargs):
+        with join_call(call):
+            return func(*args, **kwargs)
+
+    return joined
+
+
+class _NoPhase:
+    # Stands in for ClientProfiler.phase on clients without a profiler
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        return False
+
+
+NO_PHASE = _NoPhase()
@@ -0,0 +1,326 @@
+from typing import List, Union
+
+from jps_api_wrapper.concurrency import AdaptiveLimiter, concurrent_map
+from jps_api_wrapper.pro import Pro
+from jps_api_wrapper.rsql import And, Node, field_getter, parse
+from jps_api_wrapper.utils import paginate
+
+# Sections of a computer inventory record and the keys they are found under
+COMPUTER_SECTIONS = {
+    "GENERAL": "general",
+    "DISK_ENCRYPTION": "diskEncryption",
+    "PURCHASING": "purchasing",
+    "APPLICATIONS": "applications",
+    "STORAGE": "storage",
+    "USER_AND_LOCATION": "userAndLocation",
+    "CONFIGURATION_PROFILES": "configurationProfiles",
+    "PRINTERS": "printers",
+    "SERVICES": "services",
+    "HARDWARE": "hardware",
+    "LOCAL_USER_ACCOUNTS": "localUserAccounts",
+    "CERTIFICATES": "certificates",
+    "ATTACHMENTS": "attachments",
+    "PLUGINS": "plugins",
+    "PACKAGE_RECEIPTS": "packageReceipts",
+    "FONTS": "fonts",
+    "SECURITY": "security",
+    "OPERATING_SYSTEM": "operatingSystem",
+    "LICENSED_SOFTWARE": "licensedSoftware",
+    "IBEACONS": "ibeacons",
+    "SOFTWARE_UPDATES": "softwareUpdates",
+    "EXTENSION_ATTRIBUTES": "extensionAttributes",
+    "CONTENT_CACHING": "contentCaching",
+    "GROUP_MEMBERSHIPS": "groupMemberships",
+}
+SECTION_OF_KEY = {key: section for section, key in COMPUTER_SECTIONS.items()}
+# Fields returned with every record whatever sections are requested
+RECORD_FIELDS = {"id", "udid"}
+# Fields the filter parameter of get_computer_inventories accepts
+FILTER_FIELDS = {
+    "general.name",
+    "udid",
+    "id",
+    "general.assetTag",
+    "general.barcode1",
+    "general.barcode2",
+    "general.enrolledViaAutomatedDeviceEnrollment",
+    "general.lastIpAddress",
+    "general.itunesStoreAccountActive",
+    "general.jamfBinaryVersion",
+    "general.lastContactTime",
+    "general.lastEnrolledDate",
+    "general.lastCloudBackupDate",
+    "general.reportDate",
+    "general.lastReportedIp",
+    "general.managementId",
+    "general.remoteManagement.managed",
+    "general.mdmCapable.capable",
+    "general.mdmCertificateExpiration",
+    "general.platform",
+    "general.supervised",
+    "general.userApprovedMdm",
+    "general.declarativeDeviceManagementEnabled",
+    "hardware.bleCapable",
+    "hardware.macAddress",
+    "hardware.make",
+    "hardware.model",
+    "hardware.modelIdentifier",
+    "hardware.serialNumber",
+    "hardware.supportsIosAppInstalls",
+    "hardware.appleSilicon",
+    "operatingSystem.activeDirectoryStatus",
+    "operatingSystem.fileVault2Status",
+    "operatingSystem.build",
+    "operatingSystem.supplementalBuildVersion",
+    "operatingSystem.rapidSecurityResponse",
+    "operatingSystem.name",
+    "operatingSystem.version",
+    "security.activationLockEnabled",
+    "security.recoveryLockEnabled",
+    "security.firewallEnabled",
+    "userAndLocation.buildingId",
+    "userAndLocation.departmentId",
+    "userAndLocation.email",
+    "userAndLocation.realname",
+    "userAndLocation.phone",
+    "userAndLocation.position",
+    "userAndLocation.room",
+    "userAndLocation.username",
+    "purchasing.appleCareId",
+    "purchasing.lifeExpectancy",
+    "purchasing.purchased",
+    "purchasing.leased",
+    "purchasing.vendor",
+    "purchasing.warrantyDate",
+}
+
+
+class ComputerProjection:
+    """
+    Plans the request for the fields of computer inventory records a caller
+    needs: the fewest sections that hold them, the part of a filter the
+    server can apply and the part that has to be applied to the returned
+    records, and how to trim the records down to the fields.
+
+    Fields are dotted paths into the records, e.g. hardware.serialNumber.
+    Paths into list sections apply to each item, e.g. applications.name
+    keeps the name of every application. A filter is split at its top level
+    ; into conditions on fields the filter parameter accepts, which are sent
+    to the server, and the rest, which are evaluated locally after fetching
+    the sections they need.
+
+    :param fields: Field paths to return e.g. ["operatingSystem.version"]
+    :param filter: Optional RSQL filter on any field of the records
+
+    :raises UnknownField: A field is not in any section
+    :raises InvalidFilter: The filter is not valid RSQL
+    """
+
+    def __init__(self, fields: List[str], filter: Union[str, Node] = None):
+        self.fields = list(fields)
+        self.paths = [tuple(field.split(".")) for field in self.fields]
+        node = parse(filter) if isinstance(filter, str) else filter
+        server, local = _split_filter(node)
+        self.server_filter = str(server) if server else None
+        self.local_filter = local
+        needed = set(self.fields)
+        if local:
+            needed |= local.fields()
+        self.section = _sections(needed)
+
+    def trim(self, record: dict) -> dict:
+        """
+        Returns a copy of a record with only the id and the projected fields
+
+        :param record: Decoded computer inventory record
+        """
+        trimmed = {"id": record.get("id")}
+        for path in self.paths:
+            _copy_path(record, trimmed, path)
+        return trimmed
+
+    def matches(self, record: dict) -> bool:
+        """
+        Returns whether a record matches the part of the filter that is
+        evaluated locally
+
+        :param record: Decoded computer inventory record
+        """
+        if self.local_filter is None:
+            return True
+        return self.local_filter.evaluate(field_getter(record))
+
+    def __repr__(self):
+        return (
+            f"ComputerProjection(section={self.section!r}, "
+            f"server_filter={self.server_filter!r}, "
+            f"local_filter={str(self.local_filter) if self.local_filter else None!r})"
+        )
+
+
+def select_computers(
+    client: Pro,
+    fields: List[str],
+    filter: Union[str, Node] = None,
+    sort: List[str] = None,
+    page_size: int = 2000,
+) -> List[dict]:
+    """
+    Returns every computer inventory record matching the filter with only
+    the requested fields, requesting just the sections that hold them
+
+    Example: select_computers(pro, ["userAndLocation.email"], "id=lt=100")
+
+    :param client: Pro client
+    :param fields: Field paths to return e.g. ["userAndLocation.email"]
+    :param filter: Optional RSQL filter on any field of the records
+    :param sort: Optional sort criteria e.g. ["general.name:asc"]
+    :param page_size: Records per request
+
+    :returns: List of trimmed records
+
+    :raises UnknownField: A field is not in any section
+    :raises InvalidFilter: The filter is not valid RSQL
+    """
+    projection = ComputerProjection(fields, filter)
+    results = paginate(
+        client.get_computer_inventories,
+        section=projection.section,
+        page_size=page_size,
+        sort=sort,
+        filter=projection.server_filter,
+    )
+    return [
+        projection.trim(record)
+        for record in results["results"]
+        if projection.matches(record)
+    ]
+
+
+class SectionFanOut:
+    """
+    Fetches pages of computer inventory records with their sections split
+    into groups that are requested concurrently for the same page, then
+    merges the records by id. The JPS server joins the tables of every
+    requested section for each record, so a page of many sections is served
+    faster as several smaller requests. Pages are sorted by id after any
+    sort given so every group returns the same records.
+
+    get_computer_inventories takes the same arguments as the Pro method, so
+    it can be paginated:
+
+    paginate(SectionFanOut(pro).get_computer_inventories, section=["ALL"])
+
+    :param client: Pro client
+    :param groups: Number of requests each page is split into
+    """
+
+    def __init__(self, client: Pro, groups: int = 4):
+        self.client = client
+        self.groups = groups
+
+    @property
+    def limiter(self) -> AdaptiveLimiter:
+        """
+        Limiter of the client, used by paginate to fetch pages concurrently
+        """
+        return self.client.limiter
+
+    def get_computer_inventories(
+        self,
+        section: List[str] = None,
+        page: int = None,
+        page_size: int = None,
+        sort: List[str] = None,
+        filter: str = None,
+    ) -> dict:
+        """
+        Returns a page of computer inventory records, see
+        Pro.get_computer_inventories
+
+        :param section: Sections to return, ALL for every section
+        :param page: Page to return, default page is 0.
+        :param page_size: Page size to return, default page-size is 100.
+        :param sort: Optional sort criteria, id:asc is added if missing
+        :param filter: Optional RSQL filter
+
+        :returns: The page with the sections of every group merged
+        """
+        section = section or ["GENERAL"]
+        if "ALL" in section:
+            section = list(COMPUTER_SECTIONS)
+        section = list(dict.fromkeys(section))
+        groups = [[] for _ in range(min(self.groups, len(section)))]
+        for index, name in enumerate(section):
+            groups[index % len(groups)].append(name)
+        sort = list(sort or [])
+        if not any(criterion.split(":")[0] == "id" for criterion in sort):
+            sort.append("id:asc")
+
+        def get_group(group):
+            return self.client.get_computer_inventories(
+                section=group, page=page, page_size=page_size, sort=sort, filter=filter
+            )
+
+        pages = concurrent_map(get_group, groups, self.client.limiter)
+        records = {str(record["id"]): record for record in pages[0]["results"]}
+        for group, group_page in zip(groups[1:], pages[1:]):
+            keys = [COMPUTER_SECTIONS[name] for name in group]
+            for record in group_page["results"]:
+                merged = records.get(str(record["id"]))
+                if merged is not None:
+                    merged.update({key: record.get(key) for key in keys})
+        return {"totalCount": pages[0]["totalCount"], "results": list(records.values())}
+
+
+def _split_filter(node: Node):
+    # Returns the conditions of a filter the server accepts and the rest,
+    # split at the top level and
+    if node is None:
+        return None, None
+    children = node.children if type(node) is And else [node]
+    server = [child for child in children if child.fields() <= FILTER_FIELDS]
+    local = [child for child in children if not child.fields() <= FILTER_FIELDS]
+    return _join(server), _join(local)
+
+
+def _join(children: list) -> Node:
+    if not children:
+        return None
+    return children[0] if len(children) == 1 else And(children)
+
+
+def _sections(fields: set) -> List[str]:
+    sections = set()
+    for field in fields:
+        key = field.split(".")[0]
+        if field in RECORD_FIELDS:
+            continue
+        if key not in SECTION_OF_KEY:
+            raise UnknownField(f"{field} is not in any computer inventory section.")
+        sections.add(SECTION_OF_KEY[key])
+    # Records without a requested section come back with GENERAL
+    return sorted(sections, key=list(COMPUTER_SECTIONS).index) or ["GENERAL"]
+
+
+def _copy_path(source, target: dict, path: tuple):
+    key = path[0]
+    if not isinstance(source, dict) or key not in source:
+        return
+    value = source[key]
+    if len(path) == 1:
+        target[key] = value
+    elif isinstance(value, list):
+        items = target.setdefault(key, [{} for _ in value])
+        for item, trimmed in zip(value, items):
+            _copy_path(item, trimmed, path[1:])
+    elif isinstance(value, dict):
+        _copy_path(value, target.setdefault(key, {}), path[1:])
+    else:
+        target[key] = None
+
+
+class UnknownField(Exception):
+    """
+    The field is not in any section of the records.
+    """
@@ -0,0 +1,375 @@
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, List, Union
+
+from jps_api_wrapper.rsql import (
+    And,
+    Comparison,
+    Node,
+    Or,
+    field_getter,
+    parse,
+    parse_number,
+)
+from jps_api_wrapper.sync import InventoryMirror, MobileDeviceSync
+from jps_api_wrapper.utils import sort_records
+
+# Filter fields of /api/v2/mobile-devices/detail and the paths where they are
+# found in its records
+MOBILE_DEVICE_FIELDS = {
+    "displayName": "general.displayName",
+    "udid": "general.udid",
+    "managementId": "general.managementId",
+    "assetTag": "general.assetTag",
+    "ipAddress": "general.ipAddress",
+    "osVersion": "general.osVersion",
+    "osBuild": "general.osBuild",
+    "osSupplementalBuildVersion": "general.osSupplementalBuildVersion",
+    "osRapidSecurityResponse": "general.osRapidSecurityResponse",
+    "supervised": "general.supervised",
+    "managed": "general.managed",
+    "sharedIpad": "general.sharedIpad",
+    "timeZone": "general.timeZone",
+    "lastInventoryUpdateDate": "general.lastInventoryUpdateDate",
+    "lastEnrolledDate": "general.lastEnrolledDate",
+    "itunesStoreAccountActive": "general.itunesStoreAccountActive",
+    "declarativeDeviceManagementEnabled": (
+        "general.declarativeDeviceManagementEnabled"
+    ),
+    "serialNumber": "hardware.serialNumber",
+    "wifiMacAddress": "hardware.wifiMacAddress",
+    "bluetoothMacAddress": "hardware.bluetoothMacAddress",
+    "model": "hardware.model",
+    "modelIdentifier": "hardware.modelIdentifier",
+    "modelNumber": "hardware.modelNumber",
+    "capacityMb": "hardware.capacityMb",
+    "availableSpaceMb": "hardware.availableSpaceMb",
+    "usedSpacePercentage": "hardware.usedSpacePercentage",
+    "batteryLevel": "hardware.batteryLevel",
+    "username": "userAndLocation.username",
+    "fullName": "userAndLocation.realName",
+    "emailAddress": "userAndLocation.emailAddress",
+    "position": "userAndLocation.position",
+    "room": "userAndLocation.room",
+    "building": "userAndLocation.buildingId",
+    "department": "userAndLocation.departmentId",
+    "activationLockEnabled": "security.activationLockEnabled",
+    "passcodePresent": "security.passcodePresent",
+    "passcodeCompliant": "security.passcodeCompliant",
+    "dataProtection": "security.dataProtection",
+    "vendor": "purchasing.vendor",
+    "appleCareId": "purchasing.appleCareId",
+    "poNumber": "purchasing.poNumber",
+}
+# Operators answered from the hash index of a field
+HASH_OPERATORS = ("==", "=in=")
+# Operators answered from the sorted index of a field
+RANGE_OPERATORS = ("<", "<=", ">", ">=")
+
+
+class LocalInventory:
+    """
+    Answers RSQL filters, as accepted by the filter parameter of the Pro
+    API, over records held in memory, such as the results of paginate or
+    the records of an inventory mirror. Equality and =in= comparisons are
+    answered from hash indexes and range comparisons and prefix wildcards
+    from sorted indexes, built for each field the first time a filter uses
+    it. Every candidate is checked with the filter itself, so the results
+    are the records the server would return for the same filter.
+
+    Example:
+
+    computers = paginate(pro.get_computer_inventories, section=["ALL"])
+    inventory = LocalInventory(computers["results"])
+    inventory.query("operatingSystem.version==14.*;hardware.make==Apple")
+
+    :param records: Decoded records
+    :param id_key: Key of the identifier of the records
+    :param fields:
+        Optional dict of filter field names and the dotted paths of the
+        records they are found at, for APIs whose filter field names differ
+        from the records e.g. MOBILE_DEVICE_FIELDS
+    """
+
+    def __init__(
+        self,
+        records: Iterable[dict] = (),
+        id_key: str = "id",
+        fields: Dict[str, str] = None,
+    ):
+        self.id_key = id_key
+        self.fields = dict(fields or {})
+        self._records = []
+        self._positions = {}
+        self._hash_indexes = {}
+        self._sorted_indexes = {}
+        self.update(records)
+
+    @classmethod
+    def from_mirror(cls, mirror: InventoryMirror) -> "LocalInventory":
+        """
+        Returns a LocalInventory of the records of an inventory mirror
+
+        :param mirror: ComputerInventorySync or MobileDeviceSync
+        """
+        if isinstance(mirror, MobileDeviceSync):
+            return cls(mirror.records(), "mobileDeviceId", MOBILE_DEVICE_FIELDS)
+        return cls(mirror.records())
+
+    def __len__(self):
+        return len(self._records)
+
+    def update(self, records: Iterable[dict]):
+        """
+        Adds records, replacing records with the same id
+
+        :param records: Decoded records
+        """
+        for record in records:
+            id = str(record[self.id_key])
+            position = self._positions.get(id)
+            if position is None:
+                self._positions[id] = len(self._records)
+                self._records.append(record)
+            else:
+                self._records[position] = record
+        self._clear_indexes()
+
+    def remove(self, ids: Iterable[str]):
+        """
+        Removes records
+
+        :param ids: Ids of the records to remove
+        """
+        ids = {str(id) for id in ids}
+        self._records = [
+            record for record in self._records if str(record[self.id_key]) not in ids
+        ]
+        self._positions = {
+            str(record[self.id_key]): position
+            for position, record in enumerate(self._records)
+        }
+        self._clear_indexes()
+
+    def get(self, id: str) -> dict:
+        """
+        Returns a record, None if there is no record with the id
+
+        :param id: Record id
+        """
+        position = self._positions.get(str(id))
+        return None if position is None else self._records[position]
+
+    def query(
+        self,
+        filter: Union[str, Node] = None,
+        sort: List[str] = None,
+        page: int = None,
+        page_size: int = 100,
+    ) -> dict:
+        """
+        Returns the records matching a filter in the shape of a Pro API page
+
+        :param filter: Optional RSQL filter e.g. general.name=="Orchard"
+        :param sort:
+            Optional sort criteria e.g. ["general.reportDate:desc"], records
+            are in the order they were added otherwise
+        :param page: Page to return, every matching record if not given
+        :param page_size: Page size to return, default page-size is 100.
+
+        :returns: Dictionary of the totalCount and the results
+
+        :raises InvalidFilter: The filter is not valid RSQL
+        """
+        results = self._select(filter)
+        sort_records(results, sort, self._getter)
+        total = len(results)
+        if page is not None:
+            start = page * page_size
+            end = start + page_size
+            results = results[start:end]
+        return {"totalCount": total, "results": results}
+
+    def count(self, filter: Union[str, Node] = None) -> int:
+        """
+        Returns the number of records matching a filter
+
+        :param filter: Optional RSQL filter
+
+        :raises InvalidFilter: The filter is not valid RSQL
+        """
+        return len(self._select(filter))
+
+    def _select(self, filter: Union[str, Node]) -> list:
+        if filter is None:
+            return list(self._records)
+        node = parse(filter) if isinstance(filter, str) else filter
+        candidates = self._candidates(node)
+        positions = range(len(self._records)) if candidates is None else candidates
+        records = self._records
+        return [
+            records[position]
+            for position in sorted(positions)
+            if node.evaluate(self._getter(records[position]))
+        ]
+
+    def _candidates(self, node: Node):
+        # Returns the positions of a superset of the records matching the
+        # node, None when every record has to be checked
+        if type(node) is Or:
+            positions = set()
+            for child in node.children:
+                child_positions = self._candidates(child)
+                if child_positions is None:
+                    return None
+                positions |= child_positions
+            return positions
+        if isinstance(node, And):
+            found = [self._candidates(child) for child in node.children]
+            found = sorted(
+                (positions for positions in found if positions is not None), key=len
+            )
+            if not found:
+                return None
+            return found[0].intersection(*found[1:])
+        return self._compare(node)
+
+    def _compare(self, node: Comparison):
+        operator = node.operator
+        if operator in HASH_OPERATORS:
+            value = node.values[0]
+            if operator == "==" and "*" in value:
+                prefix = value[:-1]
+                if not value.endswith("*") or "*" in prefix:
+                    return None
+                # Matches of a prefix wildcard sort between the prefix and
+                # the prefix followed by the last character there is
+                index = self._sorted_index(node.field)
+                folded = prefix.casefold()
+                return index.between(folded, folded + "\U0010ffff")
+            index = self._hash_index(node.field)
+            positions = set()
+            for value in node.values:
+                for key in _query_keys(value):
+                    positions.update(index.get(key, ()))
+            return positions
+        if operator in RANGE_OPERATORS:
+            return self._sorted_index(node.field).compare(operator, node.values[0])
+        return None
+
+    def _hash_index(self, field: str) -> dict:
+        index = self._hash_indexes.get(field)
+        if index is None:
+            index = {}
+            path = self.fields.get(field, field)
+            for position, record in enumerate(self._records):
+                key = _key(field_getter(record)(path))
+                if key is not None:
+                    index.setdefault(key, []).append(position)
+            self._hash_indexes[field] = index
+        return index
+
+    def _sorted_index(self, field: str) -> "_SortedIndex":
+        index = self._sorted_indexes.get(field)
+        if index is None:
+            path = self.fields.get(field, field)
+            index = _SortedIndex(field_getter(record)(path) for record in self._records)
+            self._sorted_indexes[field] = index
+        return index
+
+    def _getter(self, record: dict) -> Callable[[str], object]:
+        get = field_getter(record)
+        fields = self.fields
+        if not fields:
+            return get
+        return lambda field: get(fields.get(field, field))
+
+    def _clear_indexes(self):
+        self._hash_indexes.clear()
+        self._sorted_indexes.clear()
+
+
+class _SortedIndex:
+    """
+    Positions of the values of a field sorted by value, strings case folded
+    and numbers apart from strings as comparisons treat them differently.
+    Strings of digits are kept with the numbers as they are compared as
+    numbers with numbers and as text with text.
+    """
+
+    def __init__(self, values: Iterable):
+        strings = []
+        numbers = []
+        self.digits = set()
+        self.other = set()
+        for position, value in enumerate(values):
+            if value is None:
+                continue
+            if isinstance(value, str):
+                if value.isdigit():
+                    numbers.append((int(value), position))
+                    self.digits.add(position)
+                else:
+                    strings.append((value.casefold(), position))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                numbers.append((value, position))
+            else:
+                self.other.add(position)
+        strings.sort()
+        numbers.sort()
+        self.string_keys = [key for key, _ in strings]
+        self.string_positions = [position for _, position in strings]
+        self.number_keys = [key for key, _ in numbers]
+        self.number_positions = [position for _, position in numbers]
+
+    def compare(self, operator: str, value: str) -> set:
+        positions = set(self.other)
+        positions.update(
+            _range(self.string_keys, self.string_positions, operator, value.casefold())
+        )
+        number = parse_number(value)
+        if number is None:
+            # Numbers are compared with text as text
+            positions.update(self.number_positions)
+        else:
+            positions.update(
+                _range(self.number_keys, self.number_positions, operator, number)
+            )
+        return positions
+
+    def between(self, low: str, high: str) -> set:
+        start = bisect_left(self.string_keys, low)
+        end = bisect_right(self.string_keys, high)
+        # Wildcards match numbers, digits and booleans as text
+        positions = set(self.string_positions[start:end])
+        positions.update(self.number_positions)
+        return positions | self.other
+
+
+def _range(keys: list, positions: list, operator: str, value) -> list:
+    if operator == "<":
+        end = bisect_left(keys, value)
+        return positions[:end]
+    if operator == "<=":
+        end = bisect_right(keys, value)
+        return positions[:end]
+    start = bisect_right(keys, value) if operator == ">" else bisect_left(keys, value)
+    return positions[start:]
+
+
+def _key(value):
+    # Hash index key of a value, matching how comparisons convert values
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return float(value)
+    return str(value).casefold()
+
+
+def _query_keys(value: str) -> list:
+    number = parse_number(value)
+    keys = [value.casefold()]
+    if number is not None:
+        keys.append(number)
+    return keys
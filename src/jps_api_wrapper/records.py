@@ -0,0 +1,851 @@
+import json
+import re
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import wraps
+from itertools import repeat
+from json.decoder import scanstring
+from json.scanner import make_scanner
+from typing import Dict, Iterator, Tuple, Union
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+
+# Value of the fields a record does not have
+_MISSING = _Missing()
+_WHITESPACE = re.compile(r"[ \t\n\r]*").match
+# Scans one JSON value, and one that only finds where a value ends without
+# building its objects
+_scan = make_scanner(json.JSONDecoder())
+_skip = make_scanner(json.JSONDecoder(object_pairs_hook=len))
+
+
+class Record(Mapping):
+    """
+    Base of the typed records of the Pro API. A record reads like the dict
+    it was decoded from, record["general"]["name"], and by attribute,
+    record.general.name, None for fields it does not have.
+
+    Records decoded from a page keep the JSON of the record as text until a
+    field is first read. The record is then parsed once and each object is
+    packed into a tuple of the values of its fields in the order of FIELDS.
+    Nested objects and lists of objects become records of their type when
+    they are read, so a record holds its values without a dict per object.
+    Fields missing from FIELDS are kept in a dict and still returned.
+
+    :param data: Decoded record
+    """
+
+    __slots__ = ("_values",)
+    # Fields in the order the Pro API returns them
+    FIELDS: Tuple[str, ...] = ()
+    # Record types of the fields holding an object, or a list of objects
+    # given as a list of the type
+    NESTED: Dict[str, Union[type, list]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._positions = {field: position for position, field in enumerate(cls.FIELDS)}
+        cls._nested = tuple(
+            (cls._positions[field], _record_type(nested), isinstance(nested, list))
+            for field, nested in cls.NESTED.items()
+        )
+        cls._nested_at = {
+            position: (nested, is_list) for position, nested, is_list in cls._nested
+        }
+        for position, field in enumerate(cls.FIELDS):
+            # Fields named like a Mapping method are only read as items
+            if field.isidentifier() and not hasattr(cls, field):
+                setattr(cls, field, _field(position))
+
+    def __init__(self, data: dict):
+        self._values = self._pack(data)
+
+    @classmethod
+    def from_json(cls, text: str) -> "Record":
+        """
+        Returns a record of the JSON of one record, which is parsed when a
+        field is first read
+
+        :param text: JSON of the record
+        """
+        record = cls.__new__(cls)
+        record._values = text
+        return record
+
+    def to_dict(self) -> dict:
+        """
+        Returns the record as the dict it was decoded from
+        """
+        return {key: _plain(value) for key, value in self.items()}
+
+    def to_json(self) -> str:
+        """
+        Returns the JSON of the record, the text it was decoded from if no
+        field has been read
+        """
+        if type(self._values) is str:
+            return self._values
+        return json.dumps(self.to_dict())
+
+    def __getitem__(self, key: str):
+        position = self._positions.get(key)
+        if position is None:
+            return self._extra()[key]
+        value = self._value(position)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        values = self._packed()
+        for field, value in zip(self.FIELDS, values):
+            if value is not _MISSING:
+                yield field
+        yield from self._extra()
+
+    def __len__(self):
+        values = self._packed()
+        present = len(self.FIELDS) - values.count(_MISSING)
+        return present + len(self._extra())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    @classmethod
+    def _pack(cls, data: dict) -> tuple:
+        if not cls._nested:
+            values = tuple(map(data.get, cls.FIELDS, repeat(_MISSING)))
+            if len(data) + values.count(_MISSING) == len(cls.FIELDS):
+                return values
+        values = list(map(data.get, cls.FIELDS, repeat(_MISSING)))
+        for position, nested, is_list in cls._nested:
+            value = values[position]
+            if is_list and type(value) is list:
+                values[position] = tuple(
+                    [
+                        nested._pack(item) if type(item) is dict else item
+                        for item in value
+                    ]
+                )
+            elif not is_list and type(value) is dict:
+                values[position] = nested._pack(value)
+        # Fields that are not in FIELDS follow the values in a dict
+        if len(data) > len(cls.FIELDS) - values.count(_MISSING):
+            positions = cls._positions
+            values.append({k: v for k, v in data.items() if k not in positions})
+        return tuple(values)
+
+    @classmethod
+    def _view(cls, values: tuple) -> "Record":
+        record = cls.__new__(cls)
+        record._values = values
+        return record
+
+    def _packed(self) -> tuple:
+        values = self._values
+        if type(values) is str:
+            values = self._values = self._pack(json.loads(values))
+        return values
+
+    def _value(self, position: int):
+        value = self._packed()[position]
+        if type(value) is not tuple:
+            return value
+        nested, is_list = self._nested_at[position]
+        if not is_list:
+            return nested._view(value)
+        return [nested._view(item) if type(item) is tuple else item for item in value]
+
+    def _extra(self) -> dict:
+        values = self._packed()
+        return values[-1] if len(values) > len(self.FIELDS) else {}
+
+
+def _field(position: int) -> property:
+    def get(record: Record):
+        value = record._value(position)
+        return None if value is _MISSING else value
+
+    return property(get)
+
+
+def _record_type(nested: Union[type, list]) -> type:
+    return nested[0] if isinstance(nested, list) else nested
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if type(value) is list:
+        return [_plain(item) for item in value]
+    return value
+
+
+class ExtensionAttribute(Record):
+    __slots__ = ()
+    FIELDS = (
+        "definitionId",
+        "name",
+        "description",
+        "enabled",
+        "multiValue",
+        "values",
+        "dataType",
+        "options",
+        "inputType",
+    )
+
+
+class Site(Record):
+    __slots__ = ()
+    FIELDS = ("id", "name")
+
+
+class ComputerGeneral(Record):
+    __slots__ = ()
+    FIELDS = (
+        "name",
+        "lastIpAddress",
+        "lastReportedIp",
+        "jamfBinaryVersion",
+        "platform",
+        "barcode1",
+        "barcode2",
+        "assetTag",
+        "remoteManagement",
+        "supervised",
+        "mdmCapable",
+        "reportDate",
+        "lastContactTime",
+        "lastCloudBackupDate",
+        "lastEnrolledDate",
+        "mdmProfileExpiration",
+        "initialEntryDate",
+        "distributionPoint",
+        "enrollmentMethod",
+        "site",
+        "itunesStoreAccountActive",
+        "enrolledViaAutomatedDeviceEnrollment",
+        "userApprovedMdm",
+        "declarativeDeviceManagementEnabled",
+        "extensionAttributes",
+        "managementId",
+    )
+    NESTED = {"site": Site, "extensionAttributes": [ExtensionAttribute]}
+
+
+class ComputerHardware(Record):
+    __slots__ = ()
+    FIELDS = (
+        "make",
+        "model",
+        "modelIdentifier",
+        "serialNumber",
+        "processorSpeedMhz",
+        "processorCount",
+        "coreCount",
+        "processorType",
+        "processorArchitecture",
+        "busSpeedMhz",
+        "cacheSizeKilobytes",
+        "networkAdapterType",
+        "macAddress",
+        "altNetworkAdapterType",
+        "altMacAddress",
+        "totalRamMegabytes",
+        "openRamSlots",
+        "batteryCapacityPercent",
+        "smcVersion",
+        "nicSpeed",
+        "opticalDrive",
+        "bootRom",
+        "bleCapable",
+        "supportsIosAppInstalls",
+        "appleSilicon",
+        "extensionAttributes",
+    )
+    NESTED = {"extensionAttributes": [ExtensionAttribute]}
+
+
+class ComputerOperatingSystem(Record):
+    __slots__ = ()
+    FIELDS = (
+        "name",
+        "version",
+        "build",
+        "supplementalBuildVersion",
+        "rapidSecurityResponse",
+        "activeDirectoryStatus",
+        "fileVault2Status",
+        "softwareUpdateDeviceId",
+        "extensionAttributes",
+    )
+    NESTED = {"extensionAttributes": [ExtensionAttribute]}
+
+
+class ComputerUserAndLocation(Record):
+    __slots__ = ()
+    FIELDS = (
+        "username",
+        "realname",
+        "email",
+        "position",
+        "phone",
+        "departmentId",
+        "buildingId",
+        "room",
+        "extensionAttributes",
+    )
+    NESTED = {"extensionAttributes": [ExtensionAttribute]}
+
+
+class ComputerPurchasing(Record):
+    __slots__ = ()
+    FIELDS = (
+        "leased",
+        "purchased",
+        "poNumber",
+        "poDate",
+        "vendor",
+        "warrantyDate",
+        "appleCareId",
+        "leaseDate",
+        "purchasePrice",
+        "lifeExpectancy",
+        "purchasingAccount",
+        "purchasingContact",
+        "extensionAttributes",
+    )
+    NESTED = {"extensionAttributes": [ExtensionAttribute]}
+
+
+class ComputerSecurity(Record):
+    __slots__ = ()
+    FIELDS = (
+        "sipStatus",
+        "gatekeeperStatus",
+        "xprotectVersion",
+        "autoLoginDisabled",
+        "remoteDesktopEnabled",
+        "activationLockEnabled",
+        "recoveryLockEnabled",
+        "firewallEnabled",
+        "secureBootLevel",
+        "externalBootLevel",
+        "bootstrapTokenAllowed",
+        "bootstrapTokenEscrowedStatus",
+    )
+
+
+class ComputerDiskEncryption(Record):
+    __slots__ = ()
+    FIELDS = (
+        "bootPartitionEncryptionDetails",
+        "individualRecoveryKeyValidityStatus",
+        "institutionalRecoveryKeyPresent",
+        "diskEncryptionConfigurationName",
+        "fileVault2EnabledUserNames",
+        "fileVault2EligibilityMessage",
+    )
+
+
+class ComputerApplication(Record):
+    __slots__ = ()
+    FIELDS = (
+        "name",
+        "path",
+        "version",
+        "macAppStore",
+        "sizeMegabytes",
+        "bundleId",
+        "updateAvailable",
+        "externalVersionId",
+    )
+
+
+class ComputerConfigurationProfile(Record):
+    __slots__ = ()
+    FIELDS = (
+        "id",
+        "username",
+        "lastInstalled",
+        "removable",
+        "displayName",
+        "profileIdentifier",
+    )
+
+
+class ComputerLocalUserAccount(Record):
+    __slots__ = ()
+    FIELDS = (
+        "uid",
+        "userGuid",
+        "username",
+        "fullName",
+        "admin",
+        "homeDirectory",
+        "homeDirectorySizeMb",
+        "fileVault2Enabled",
+        "userAccountType",
+        "passwordMinLength",
+        "passwordMaxAge",
+        "passwordMinComplexCharacters",
+        "passwordHistoryDepth",
+        "passwordRequireAlphanumeric",
+        "computerAzureActiveDirectoryId",
+        "userAzureActiveDirectoryId",
+        "azureActiveDirectoryId",
+    )
+
+
+class ComputerInventory(Record):
+    """
+    Record of get_computer_inventories and get_computer_inventory
+    """
+
+    __slots__ = ()
+    FIELDS = (
+        "id",
+        "udid",
+        "general",
+        "diskEncryption",
+        "purchasing",
+        "applications",
+        "storage",
+        "userAndLocation",
+        "configurationProfiles",
+        "printers",
+        "services",
+        "hardware",
+        "localUserAccounts",
+        "certificates",
+        "attachments",
+        "plugins",
+        "packageReceipts",
+        "fonts",
+        "security",
+        "operatingSystem",
+        "licensedSoftware",
+        "ibeacons",
+        "softwareUpdates",
+        "extensionAttributes",
+        "contentCaching",
+        "groupMemberships",
+    )
+    NESTED = {
+        "general": ComputerGeneral,
+        "diskEncryption": ComputerDiskEncryption,
+        "purchasing": ComputerPurchasing,
+        "applications": [ComputerApplication],
+        "userAndLocation": ComputerUserAndLocation,
+        "configurationProfiles": [ComputerConfigurationProfile],
+        "hardware": ComputerHardware,
+        "localUserAccounts": [ComputerLocalUserAccount],
+        "security": ComputerSecurity,
+        "operatingSystem": ComputerOperatingSystem,
+        "extensionAttributes": [ExtensionAttribute],
+    }
+
+
+class MobileDeviceGeneral(Record):
+    __slots__ = ()
+    FIELDS = (
+        "udid",
+        "displayName",
+        "assetTag",
+        "siteId",
+        "lastInventoryUpdateDate",
+        "osVersion",
+        "osRapidSecurityResponse",
+        "osBuild",
+        "osSupplementalBuildVersion",
+        "softwareUpdateDeviceId",
+        "ipAddress",
+        "managed",
+        "supervised",
+        "deviceOwnershipType",
+        "enrollmentMethodPrestage",
+        "enrollmentSessionTokenValid",
+        "lastEnrolledDate",
+        "mdmProfileExpirationDate",
+        "timeZone",
+        "declarativeDeviceManagementEnabled",
+        "managementId",
+        "extensionAttributes",
+        "sharedIpad",
+        "diagnosticAndUsageReportingEnabled",
+        "appAnalyticsEnabled",
+        "residentUsers",
+        "quotaSize",
+        "temporarySessionOnly",
+        "temporarySessionTimeout",
+        "userSessionTimeout",
+        "syncedToComputer",
+        "maximumSharediPadUsersStored",
+        "lastBackupDate",
+        "deviceLocatorServiceEnabled",
+        "doNotDisturbEnabled",
+        "cloudBackupEnabled",
+        "lastCloudBackupDate",
+        "locationServicesForSelfServiceMobileEnabled",
+        "itunesStoreAccountActive",
+        "exchangeDeviceId",
+    )
+    NESTED = {"extensionAttributes": [ExtensionAttribute]}
+
+
+class MobileDeviceHardware(Record):
+    __slots__ = ()
+    FIELDS = (
+        "capacityMb",
+        "availableSpaceMb",
+        "usedSpacePercentage",
+        "batteryLevel",
+        "batteryHealth",
+        "serialNumber",
+        "wifiMacAddress",
+        "bluetoothMacAddress",
+        "modemFirmwareVersion",
+        "model",
+        "modelIdentifier",
+        "modelNumber",
+        "bluetoothLowEnergyCapable",
+        "deviceId",
+        "extensionAttributes",
+    )
+    NESTED = {"extensionAttributes": [ExtensionAttribute]}
+
+
+class MobileDeviceUserAndLocation(Record):
+    __slots__ = ()
+    FIELDS = (
+        "username",
+        "realName",
+        "emailAddress",
+        "position",
+        "phoneNumber",
+        "departmentId",
+        "buildingId",
+        "room",
+        "building",
+        "department",
+        "extensionAttributes",
+    )
+    NESTED = {"extensionAttributes": [ExtensionAttribute]}
+
+
+class MobileDevicePurchasing(Record):
+    __slots__ = ()
+    FIELDS = (
+        "purchased",
+        "leased",
+        "poNumber",
+        "vendor",
+        "appleCareId",
+        "purchasePrice",
+        "purchasingAccount",
+        "poDate",
+        "warrantyExpiresDate",
+        "leaseExpiresDate",
+        "lifeExpectancy",
+        "purchasingContact",
+        "extensionAttributes",
+    )
+    NESTED = {"extensionAttributes": [ExtensionAttribute]}
+
+
+class MobileDeviceSecurity(Record):
+    __slots__ = ()
+    FIELDS = (
+        "dataProtected",
+        "blockLevelEncryptionCapable",
+        "fileLevelEncryptionCapable",
+        "passcodePresent",
+        "passcodeCompliant",
+        "passcodeCompliantWithProfile",
+        "hardwareEncryption",
+        "activationLockEnabled",
+        "jailBreakDetected",
+        "passcodeLockGracePeriodEnforcedSeconds",
+        "personalDeviceProfileCurrent",
+        "lostModeEnabled",
+        "lostModePersistent",
+        "lostModeMessage",
+        "lostModePhoneNumber",
+        "lostModeFootnote",
+        "lostModeLocation",
+    )
+
+
+class MobileDeviceApplication(Record):
+    __slots__ = ()
+    FIELDS = (
+        "identifier",
+        "name",
+        "version",
+        "shortVersion",
+        "managementStatus",
+        "validationStatus",
+        "bundleSize",
+        "dynamicSize",
+    )
+
+
+class MobileDeviceDetail(Record):
+    """
+    Record of get_mobile_devices_detail and get_mobile_device_detail
+    """
+
+    __slots__ = ()
+    FIELDS = (
+        "mobileDeviceId",
+        "deviceType",
+        "hardware",
+        "userAndLocation",
+        "purchasing",
+        "applications",
+        "certificates",
+        "profiles",
+        "userProfiles",
+        "extensionAttributes",
+        "general",
+        "security",
+        "ebooks",
+        "network",
+        "serviceSubscriptions",
+        "provisioningProfiles",
+        "sharedUsers",
+    )
+    NESTED = {
+        "hardware": MobileDeviceHardware,
+        "userAndLocation": MobileDeviceUserAndLocation,
+        "purchasing": MobileDevicePurchasing,
+        "applications": [MobileDeviceApplication],
+        "extensionAttributes": [ExtensionAttribute],
+        "general": MobileDeviceGeneral,
+        "security": MobileDeviceSecurity,
+    }
+
+
+class MdmCommandClient(Record):
+    __slots__ = ()
+    FIELDS = ("managementId", "clientType")
+
+
+class MdmCommand(Record):
+    """
+    Record of get_mdm_commands
+    """
+
+    __slots__ = ()
+    FIELDS = (
+        "uuid",
+        "client",
+        "commandState",
+        "commandType",
+        "dateSent",
+        "dateCompleted",
+        "profileId",
+    )
+    NESTED = {"client": MdmCommandClient}
+
+
+class Package(Record):
+    """
+    Record of get_packages and get_package
+    """
+
+    __slots__ = ()
+    FIELDS = (
+        "id",
+        "packageName",
+        "fileName",
+        "categoryId",
+        "info",
+        "notes",
+        "priority",
+        "osRequirements",
+        "fillUserTemplate",
+        "indexed",
+        "fillExistingUsers",
+        "swu",
+        "rebootRequired",
+        "selfHealNotify",
+        "selfHealingAction",
+        "osInstall",
+        "serialNumber",
+        "parentPackageId",
+        "basePath",
+        "suppressUpdates",
+        "cloudTransferStatus",
+        "ignoreConflicts",
+        "suppressFromDock",
+        "suppressEula",
+        "suppressRegistration",
+        "installLanguage",
+        "md5",
+        "sha256",
+        "hashType",
+        "hashValue",
+        "size",
+        "osInstallerVersion",
+        "manifest",
+        "manifestFileName",
+        "format",
+    )
+
+
+class Script(Record):
+    """
+    Record of get_scripts and get_script
+    """
+
+    __slots__ = ()
+    FIELDS = (
+        "id",
+        "name",
+        "info",
+        "notes",
+        "priority",
+        "categoryId",
+        "categoryName",
+        "parameter4",
+        "parameter5",
+        "parameter6",
+        "parameter7",
+        "parameter8",
+        "parameter9",
+        "parameter10",
+        "parameter11",
+        "osRequirements",
+        "scriptContents",
+    )
+
+
+def decode_page(text: str, record_type: type) -> Union[dict, list]:
+    """
+    Decodes a JSON response of the Pro API, returning the items of its
+    results as records of record_type that keep their JSON as text until a
+    field is read. Responses without results are decoded as usual.
+
+    :param text: JSON of the response
+    :param record_type: Record subclass of the results e.g. ComputerInventory
+
+    :raises JSONDecodeError: The text is not valid JSON
+    """
+    try:
+        return _decode_page(text, record_type)
+    except (ValueError, StopIteration, IndexError):
+        # Let the standard decoder describe what is wrong with the text
+        return json.loads(text)
+
+
+def _decode_page(text: str, record_type: type):
+    index = _WHITESPACE(text, 0).end()
+    if not text.startswith("{", index):
+        return json.loads(text)
+    page = {}
+    index = _WHITESPACE(text, index + 1).end()
+    if text.startswith("}", index):
+        return page
+    while True:
+        key, index = scanstring(text, index + 1)
+        index = _WHITESPACE(text, index).end()
+        if not text.startswith(":", index):
+            raise ValueError("Expected ':'")
+        index = _WHITESPACE(text, index + 1).end()
+        if key == "results" and text.startswith("[", index):
+            page[key], index = _records(text, index + 1, record_type)
+        else:
+            page[key], index = _scan(text, index)
+        index = _WHITESPACE(text, index).end()
+        if text.startswith("}", index):
+            rest = index + 1
+            if text[rest:].strip():
+                raise ValueError("Extra data")
+            return page
+        if not text.startswith(",", index):
+            raise ValueError("Expected ','")
+        index = _WHITESPACE(text, index + 1).end()
+
+
+def _records(text: str, index: int, record_type: type) -> Tuple[list, int]:
+    records = []
+    index = _WHITESPACE(text, index).end()
+    if text.startswith("]", index):
+        return records, index + 1
+    while True:
+        if text.startswith("{", index):
+            _, end = _skip(text, index)
+            records.append(record_type.from_json(text[index:end]))
+        else:
+            value, end = _scan(text, index)
+            records.append(value)
+        index = _WHITESPACE(text, end).end()
+        if text.startswith("]", index):
+            return records, index + 1
+        if not text.startswith(",", index):
+            raise ValueError("Expected ','")
+        index = _WHITESPACE(text, index + 1).end()
+
+
+_local = threading.local()
+
+
+def _record_types() -> list:
+    if not hasattr(_local, "record_types"):
+        _local.record_types = []
+    return _local.record_types
+
+
+def current_record_type() -> type:
+    """
+    Returns the record type responses are decoded as in the current thread,
+    None if they are decoded as dicts
+    """
+    record_types = _record_types()
+    return record_types[-1] if record_types else None
+
+
+@contextmanager
+def decode_as(record_type: type):
+    """
+    Decodes the results of the JSON responses of requests sent from the
+    current thread as records of record_type
+
+    Example:
+
+    with decode_as(ComputerInventory):
+        page = pro.get_computer_inventories(section=["ALL"])
+
+    :param record_type: Record subclass e.g. ComputerInventory
+    """
+    _record_types().append(record_type)
+    try:
+        yield
+    finally:
+        _record_types().pop()
+
+
+def carry_record_type(func):
+    """
+    Returns a callable that decodes responses as the record type of the
+    current thread, for handing requests to a thread pool
+
+    :param func: Callable to run in another thread
+    """
+    record_type = current_record_type()
+    if record_type is None:
+        return func
+
+    @wraps(func)
+    def carried(*args, **kwargs):
+        with decode_as(record_type):
+            return func(*args, **kwargs)
+
+    return carried
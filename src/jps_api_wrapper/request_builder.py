@@ -1,10 +1,59 @@
 import re
+from itertools import count
 from os.path import exists, expanduser, splitext
-from typing import Union
+from time import perf_counter
+from typing import Dict, List, Tuple, Union
 from urllib.parse import quote
 
 import requests
-from jamf_auth import JamfAuth
+from jamf_auth import JamfAuth, JamfAuthException
+
+from jps_api_wrapper.affinity import NodeAffinity
+from jps_api_wrapper.caching import ConditionalCache
+from jps_api_wrapper.circuit_breaker import CircuitBreaker
+from jps_api_wrapper.cluster import NodePool
+from jps_api_wrapper.concurrency import (
+    DEFAULT_MAX_LIMIT,
+    AdaptiveLimiter,
+    DeadlineExceeded,
+    concurrent_map,
+    current_deadline,
+)
+from jps_api_wrapper.hedging import HedgePolicy
+from jps_api_wrapper.hooks import (
+    AFTER_RESPONSE,
+    BEFORE_REQUEST,
+    ON_ERROR,
+    ON_PARSE,
+    ON_RETRY,
+    RequestEvent,
+    RequestHooks,
+    response_timings,
+    start_connection_timing,
+)
+from jps_api_wrapper.interning import StringInterner
+from jps_api_wrapper.metrics import RequestMetrics, request_size
+from jps_api_wrapper.profiling import (
+    DECODE,
+    NO_PHASE,
+    SEND,
+    WAIT,
+    ClientProfiler,
+    carry_call,
+)
+from jps_api_wrapper.records import carry_record_type, current_record_type, decode_page
+from jps_api_wrapper.rsql import MAX_FILTER_LENGTH, encoded_length, split
+from jps_api_wrapper.transport import OfflineAuth, Transport
+from jps_api_wrapper.utils import match_prefix, merge_results, normalize_endpoint
+
+# Status codes that mean the JPS server is overloaded rather than the request
+# being wrong
+OVERLOAD_STATUS_CODES = (429, 502, 503, 504)
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (10, 60)
+EXPORT_TIMEOUT = (10, 300)
+
+Timeout = Union[float, Tuple[float, float]]
 
 
 class RequestBuilder:
@@ -14,30 +63,159 @@ class RequestBuilder:
     :param base_url:
         Base URL of the JPS server
         e.g. https://example.jamfcloud.com
+
+        For a clustered on-prem JPS server a list of node base URLs or a
+        NodePool can be given instead, GET requests are then spread across
+        the nodes and everything else is sent to the first node.
     :param username:
         Username for the JPS instance
     :param password:
         Password for the JPS instance
     :param client:
         Whether or not the credentials are for an API client
+    :param limiter:
+        Adaptive concurrency limiter for requests sent by this client, a
+        default AdaptiveLimiter is used if none is given. Bulk helpers like
+        paginate send their requests concurrently within its limit.
+    :param circuit_breakers:
+        Optional dict of endpoint prefixes and the CircuitBreaker guarding
+        them, the longest matching prefix is used for each request. Use "/"
+        to guard every endpoint.
+
+        Example: {"/JSSResource": CircuitBreaker(), "/api": CircuitBreaker()}
+
+    :param timeout:
+        Seconds to wait for the server to accept a connection and to send
+        data, either one number for both or a (connect, read) tuple. Default
+        is (10, 60), exports default to (10, 300).
+    :param endpoint_timeouts:
+        Optional dict of endpoint prefixes and the timeouts to use for them
+        instead of the defaults, the longest matching prefix is used.
+
+        Example: {"/api/v1/computers-inventory": (10, 180)}
+
+    :param hedging:
+        Optional HedgePolicy, GET requests that are slower than usual for
+        their endpoint are then sent a second time and the first response is
+        used
+    :param affinity:
+        Optional NodeAffinity which pins requests to one Jamf Cloud web node
+        or spreads GET requests across nodes using the load balancer cookie
+    :param transport:
+        Optional Transport to send requests with instead of the
+        requests.Session, e.g. HttpxTransport for HTTP/2 or Urllib3Transport
+        for less overhead per request, or RecordingTransport and
+        ReplayTransport to record traffic to a cassette and replay it offline
+    :param metrics:
+        Optional RequestMetrics which records the requests, latency, bytes,
+        status codes and hedged duplicates of the client per endpoint template
+    :param hooks:
+        Optional RequestHooks whose callbacks are called before and after
+        each request, on retries and errors, and after JSON responses are
+        decoded, with timings of each step
+    :param profiler:
+        Optional ClientProfiler which attributes wall time, CPU time and
+        memory to each public method of the client and the phases of its
+        requests
+    :param cache:
+        Optional ConditionalCache which revalidates GET responses of large,
+        rarely changing resources with their ETag or Last-Modified header
+        and answers 304 Not Modified responses with the cached body
+    :param max_filter_length:
+        Longest URL encoded filter sent in one request, longer filters are
+        split into several requests whose results are merged and
+        de-duplicated by id. Default is 6000.
+    :param interner:
+        Optional StringInterner which decodes JSON responses with one copy
+        of each key and of each value of keys with few distinct values,
+        so large results such as paginated inventories take less memory.
+        Responses decoded as typed records are not interned.
 
     :raises InvalidDataType:
         data_type is not json or xml
     """
 
+    limiter = None
+    circuit_breakers = None
+    timeout = DEFAULT_TIMEOUT
+    endpoint_timeouts = None
+    hedging = None
+    affinity = None
+    nodes = None
+    transport = None
+    metrics = None
+    hooks = None
+    profiler = None
+    cache = None
+    max_filter_length = MAX_FILTER_LENGTH
+    interner = None
+    # Merged results of the last split filter whose later pages are still to
+    # be requested, as (key, page, merged)
+    _split_results = None
+
     def __init__(
-        self, base_url: str, username: str, password: str, client: bool
-    ):  # pragma: no cover
+        self,
+        base_url: Union[str, List[str], NodePool],
+        username: str,
+        password: str,
+        client: bool,
+        limiter: AdaptiveLimiter = None,
+        circuit_breakers: Dict[str, CircuitBreaker] = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        endpoint_timeouts: Dict[str, Timeout] = None,
+        hedging: HedgePolicy = None,
+        affinity: NodeAffinity = None,
+        transport: Transport = None,
+        metrics: RequestMetrics = None,
+        hooks: RequestHooks = None,
+        profiler: ClientProfiler = None,
+        cache: ConditionalCache = None,
+        max_filter_length: int = MAX_FILTER_LENGTH,
+        interner: StringInterner = None,
+    ):
+        if not isinstance(base_url, str):
+            if not isinstance(base_url, NodePool):
+                base_url = NodePool(base_url)
+            self.nodes = base_url
+            base_url = self.nodes.primary
         self.base_url = base_url
         self.session = requests.Session()
-        self.session.auth = JamfAuth(self.base_url, username, password, client)
-
-    def __enter__(self):  # pragma: no cover
+        if transport and transport.offline:
+            self.session.auth = OfflineAuth()
+        else:
+            self.session.auth = JamfAuth(self.base_url, username, password, client)
+        self.limiter = limiter or AdaptiveLimiter(
+            max_limit=DEFAULT_MAX_LIMIT * (len(self.nodes.urls) if self.nodes else 1)
+        )
+        self.circuit_breakers = circuit_breakers
+        self.timeout = timeout
+        self.endpoint_timeouts = endpoint_timeouts
+        self.hedging = hedging
+        self.affinity = affinity
+        if affinity:
+            affinity.attach(self.session)
+        self.transport = transport
+        if transport:
+            transport.bind(self.session)
+        self.metrics = metrics
+        self.hooks = hooks
+        if hooks:
+            hooks.attach(self.session)
+        self.profiler = profiler
+        if profiler:
+            profiler.attach(self)
+        self.cache = cache
+        self.max_filter_length = max_filter_length
+        self.interner = interner
+
+    def __enter__(self):
         self.session.auth.refresh_auth_if_needed()
         return self
 
-    def __exit__(self, exception_type, exception_value, traceback):  # pragma: no cover
+    def __exit__(self, exception_type, exception_value, traceback):
         self.session.auth.invalidate()
+        if self.transport:
+            self.transport.close()
 
     @classmethod
     def _raise_recognized_errors(self, r: requests.Response):
@@ -67,6 +245,285 @@ class RequestBuilder:
                 f"Response:\n{r.text}"
             )
 
+    def _request(
+        self,
+        method: str,
+        path: str,
+        timeout: Timeout = None,
+        hedge: bool = False,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Sends a request through the session, holding a slot of the concurrency
+        limiter while it is in flight and reporting how the server coped to
+        the limiter and the circuit breaker guarding the endpoint
+
+        :param method: HTTP method e.g. GET
+        :param path:
+            The url section of the api endpoint following the base_url, url
+            encoded if needed
+        :param timeout:
+            Default timeout for the endpoint, endpoint_timeouts takes
+            precedence and the client timeout is used if neither is set
+        :param hedge:
+            Whether the request is idempotent and may be hedged when the
+            client has a HedgePolicy
+        :param kwargs: Keyword arguments passed to requests.Session.request
+
+        :returns: requests.Response
+
+        :raises CircuitOpen:
+            The circuit breaker guarding the endpoint is open
+        :raises DeadlineExceeded:
+            The active deadline expired before the request finished
+        """
+        if self.endpoint_timeouts:
+            timeout = match_prefix(self.endpoint_timeouts, path) or timeout
+        timeout = timeout or self.timeout
+        deadline = current_deadline()
+        if deadline:
+            if deadline.expired():
+                raise DeadlineExceeded(f"The deadline expired before {path} was sent.")
+            timeout = cap_timeout(timeout, deadline.remaining())
+        breaker = None
+        if self.circuit_breakers:
+            breaker = match_prefix(self.circuit_breakers, path)
+            if breaker:
+                breaker.before_request(self._probe_health)
+        endpoint = None
+        if self.metrics or self.hooks or (hedge and self.hedging):
+            endpoint = normalize_endpoint(path)
+        attempts = count()
+
+        def send():
+            if self.limiter:
+                with self._phase(WAIT):
+                    acquired = self.limiter.acquire(
+                        deadline.remaining() if deadline else None
+                    )
+                if not acquired:
+                    raise DeadlineExceeded(
+                        f"The deadline expired while {path} waited to be sent."
+                    )
+            attempt = next(attempts)
+            if self.metrics and attempt:
+                self.metrics.record_hedge(method, endpoint)
+            node = self.nodes.acquire(method) if self.nodes else self.base_url
+            start = perf_counter()
+            status_code = None
+            bytes_in = bytes_out = 0
+            gave_up = False
+            try:
+                if self.hooks:
+                    if attempt:
+                        self._emit(ON_RETRY, method, node + path, endpoint, attempt)
+                    self._emit(BEFORE_REQUEST, method, node + path, endpoint, attempt)
+                    start_connection_timing()
+                    start = perf_counter()
+                cookies = self.affinity.cookies(method) if self.affinity else None
+                with self._phase(SEND):
+                    response = self._send(
+                        method, node + path, timeout=timeout, cookies=cookies, **kwargs
+                    )
+                status_code = response.status_code
+                if self.metrics:
+                    bytes_in = len(response.content)
+                    bytes_out = request_size(response)
+                if self.affinity:
+                    self.affinity.capture(response, method, cookies)
+                if self.hooks:
+                    self._emit(
+                        AFTER_RESPONSE,
+                        method,
+                        node + path,
+                        endpoint,
+                        attempt,
+                        response=response,
+                        timings=response_timings(response, perf_counter() - start),
+                    )
+                return response
+            except Exception as error:
+                if self.hooks:
+                    self._emit(
+                        ON_ERROR,
+                        method,
+                        node + path,
+                        endpoint,
+                        attempt,
+                        error=error,
+                        timings={"total": perf_counter() - start},
+                    )
+                if (
+                    isinstance(error, requests.Timeout)
+                    and deadline
+                    and deadline.expired()
+                ):
+                    gave_up = True
+                    raise DeadlineExceeded(
+                        f"The deadline expired while waiting on {path}."
+                    ) from error
+                raise
+            finally:
+                latency = perf_counter() - start
+                succeeded = status_code is not None and status_code < 500
+                # A timeout cut short by the caller's deadline says nothing
+                # about the server, so it is not counted against it
+                if gave_up:
+                    if self.limiter:
+                        self.limiter.cancel()
+                    if self.nodes:
+                        self.nodes.cancel(node)
+                else:
+                    if self.limiter:
+                        self.limiter.release(
+                            latency,
+                            status_code is None or status_code in OVERLOAD_STATUS_CODES,
+                        )
+                    if self.nodes:
+                        self.nodes.release(node, latency, succeeded)
+                    if breaker:
+                        breaker.record(succeeded)
+                if self.metrics:
+                    self.metrics.record(
+                        method,
+                        endpoint,
+                        status_code,
+                        latency,
+                        bytes_out,
+                        bytes_in,
+                    )
+
+        if hedge and self.hedging:
+            if self.profiler:
+                send = carry_call(send)
+            return self.hedging.send(endpoint, send)
+        return send()
+
+    def _send(self, method: str, url: str, **kwargs):
+        """
+        Sends a request with the client's transport, or its session if it
+        does not have one
+
+        :param method: HTTP method e.g. GET
+        :param url: Full URL of the request
+        :param kwargs: Keyword arguments passed to the transport
+
+        :returns: requests.Response or a response with the same interface
+        """
+        if self.transport:
+            return self.transport.request(method, url, **kwargs)
+        return self.session.request(method, url, **kwargs)
+
+    def _phase(self, name: str):
+        """
+        Returns a context manager that times a phase of a request for the
+        client's profiler, one that does nothing if it has none
+
+        :param name: Name of the phase e.g. send
+        """
+        if self.profiler:
+            return self.profiler.phase(name)
+        return NO_PHASE
+
+    def _emit(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        endpoint: str,
+        attempt: int = 0,
+        **kwargs,
+    ):
+        """
+        Calls the client's hooks for an event if any are registered for it
+
+        :param name: Event name e.g. after_response
+        :param method: HTTP method e.g. GET
+        :param url: Full URL of the request
+        :param endpoint: Endpoint template
+        :param attempt: 0 for the first attempt, higher for hedged duplicates
+        :param kwargs: response, error and timings of the RequestEvent
+        """
+        if self.hooks.wants(name):
+            self.hooks.emit(
+                RequestEvent(name, method, url, endpoint, attempt, **kwargs)
+            )
+
+    def _json(
+        self, response: requests.Response, method: str, path: str
+    ) -> Union[dict, list]:
+        """
+        Decodes a JSON response, timing the decode for on_parse hooks and
+        the profiler
+
+        :param response: Response to decode
+        :param method: HTTP method of the request e.g. GET
+        :param path: The url section of the api endpoint that was requested
+
+        :returns: Decoded response body
+        """
+        if not self.hooks or not self.hooks.wants(ON_PARSE):
+            with self._phase(DECODE):
+                return self._decode(response)
+        start = perf_counter()
+        with self._phase(DECODE):
+            data = self._decode(response)
+        self._emit(
+            ON_PARSE,
+            method,
+            response.url,
+            normalize_endpoint(path),
+            response=response,
+            timings={"decode": perf_counter() - start},
+        )
+        return data
+
+    def _decode(self, response: requests.Response) -> Union[dict, list]:
+        """
+        Decodes a JSON response, as records when requests of the current
+        thread are decoded as a record type and otherwise with the client's
+        interner if it has one. Records keep the JSON of each record and
+        parse it when it is first read, so the interner does not apply to
+        them.
+
+        :param response: Response to decode
+
+        :returns: Decoded response body
+        """
+        record_type = current_record_type()
+        if record_type is not None:
+            return decode_page(response.text, record_type)
+        if self.interner:
+            return self.interner.loads(response.content)
+        return response.json()
+
+    def _probe_health(self) -> bool:
+        """
+        Checks that the JPS server has finished starting up and passes its
+        health check, used by circuit breakers before closing again
+
+        :returns: Whether the JPS server is healthy
+        """
+        headers = {"Accept": "application/json"}
+        try:
+            startup = self._send(
+                "GET",
+                self.base_url + "/api/startup-status",
+                headers=headers,
+                timeout=self.timeout,
+            )
+            if startup.status_code != 200 or startup.json().get("percentage") != 100:
+                return False
+            health = self._send(
+                "GET",
+                self.base_url + "/api/v1/health-check",
+                headers=headers,
+                timeout=self.timeout,
+            )
+            return health.status_code == 200
+        except (requests.RequestException, JamfAuthException, ValueError):
+            return False
+
     def _get(
         self,
         endpoint: str,
@@ -74,6 +531,7 @@ class RequestBuilder:
         params: dict = None,
         success_message: str = None,
         headers=None,
+        timeout: Timeout = None,
     ) -> Union[dict, str]:
         """
         Sends get requests given an endpoint and data type
@@ -88,6 +546,8 @@ class RequestBuilder:
         :param headers:
             Optional headers for content that is not JSON or XML which are
             handled by the method
+        :param timeout:
+            Optional timeout for slow endpoints, defaults to the client timeout
 
         :returns:
             - response.json - Returned if the data_type was json
@@ -95,22 +555,107 @@ class RequestBuilder:
 
         :raises InvalidDataType:
             data_type is not json or xml
+        :raises FilterTooLong:
+            The filter is too long and can not be split
         """
-        full_url = self.base_url + quote(endpoint, safe="/,")
+        if params and params.get("filter") is not None:
+            # Filters may be given as nodes built with the rsql module
+            params = dict(params, filter=str(params["filter"]))
+            if encoded_length(params["filter"]) > self.max_filter_length:
+                return self._get_split(endpoint, params, timeout)
+        path = quote(endpoint, safe="/,")
         if not headers:
             headers = {"Accept": f"application/{data_type}"}
-        response = self.session.get(full_url, headers=headers, params=params)
+        key = cached = None
+        if self.cache:
+            key = self.cache.key(path, params, headers)
+            cached = self.cache.lookup(key) if key else None
+        request_headers = {**headers, **cached.validators()} if cached else headers
+        response = self._request(
+            "GET",
+            path,
+            headers=request_headers,
+            params=params,
+            timeout=timeout,
+            hedge=True,
+        )
+        if cached and response.status_code == 304:
+            response = self.cache.hit(cached)
+            if self.metrics:
+                self.metrics.record_cache_hit("GET", normalize_endpoint(path))
+        elif key:
+            self.cache.store(key, response)
         self._raise_recognized_errors(response)
         response.raise_for_status()
         if success_message:
             return success_message
         elif data_type == "json":
-            return response.json()
+            return self._json(response, "GET", path)
         elif data_type in ["xml", None]:
             return response.text
         else:
             raise InvalidDataType("data_type needs to be either json or xml")
 
+    def _get_split(self, endpoint: str, params: dict, timeout: Timeout = None):
+        """
+        Sends a GET request whose filter is too long for one request as a
+        request per part of the split filter, paging through each part, and
+        returns the requested page of the merged results
+
+        Every part is paged through to merge and sort the results, so one
+        page costs as many requests as the whole result set. The merged
+        results are kept until their last page is requested, and a request
+        for a later page with the same params is served from them, so paging
+        through a split filter page by page fetches the results once. paginate
+        splits the filter before paging and never pages through one twice.
+
+        :param endpoint: The url section of the api endpoint
+        :param params: Params of the request with the filter as a string
+        :param timeout: Optional timeout for slow endpoints
+
+        :returns: The page of the merged results in JSON
+
+        :raises FilterTooLong: The filter can not be split
+        """
+        page = int(params.get("page") or 0)
+        page_size = int(params.get("page-size") or 100)
+        shared = {k: v for k, v in params.items() if k not in ("page", "page-size")}
+        key = (endpoint, repr(sorted(shared.items())), current_record_type())
+        split_results, self._split_results = self._split_results, None
+        if split_results and split_results[0] == key and page > split_results[1]:
+            merged = split_results[2]
+        else:
+
+            @carry_record_type
+            def get_part(part):
+                part_params = dict(params, filter=str(part))
+                if "page" in part_params:
+                    part_params["page"] = 0
+                response = self._get(endpoint, params=part_params, timeout=timeout)
+                if not isinstance(response, dict) or "totalCount" not in response:
+                    return response
+                while len(response["results"]) < response["totalCount"]:
+                    part_params["page"] = part_params.get("page", 0) + 1
+                    results = self._get(endpoint, params=part_params, timeout=timeout)
+                    if not results["results"]:
+                        break
+                    response["results"].extend(results["results"])
+                return response
+
+            parts = split(params["filter"], self.max_filter_length)
+            responses = concurrent_map(get_part, parts, self.limiter)
+            if not all("totalCount" in response for response in responses):
+                return [record for response in responses for record in response]
+            merged = merge_results(responses, params.get("sort"))
+        start = page * page_size
+        end = start + page_size
+        if end < merged["totalCount"]:
+            self._split_results = (key, page, merged)
+        return {
+            "totalCount": merged["totalCount"],
+            "results": merged["results"][start:end],
+        }
+
     def _download(self, endpoint: str, params: dict = None):  # pragma: no cover
         """
         Sends get request with special cases that require file downloads
@@ -121,9 +666,9 @@ class RequestBuilder:
         :param params:
             Optional params for the request
         """
-        full_url = self.base_url + quote(endpoint, safe="/,")
+        path = quote(endpoint, safe="/,")
         headers = {"Accept": "application/json"}
-        response = self.session.get(full_url, headers=headers, params=params)
+        response = self._request("GET", path, headers=headers, params=params)
         self._raise_recognized_errors(response)
         response.raise_for_status()
         try:
@@ -167,6 +712,7 @@ class RequestBuilder:
         headers: dict = None,
         success_message: str = None,
         data_type: str = "json",
+        timeout: Timeout = None,
     ) -> Union[dict, str]:
         """
         Sends post requests given an endpoint, data, and data_type
@@ -187,31 +733,44 @@ class RequestBuilder:
             Optional string to return instead of request data
         :param data_type:
             json or xml
+        :param timeout:
+            Optional timeout for slow endpoints, defaults to the client timeout
 
         :raises InvalidDataType:
             data_type is not json or xml
         """
-        full_url = self.base_url + quote(endpoint, safe="/,")
-        full_url = self.base_url + endpoint
+        path = endpoint
         if not file:
             if not headers:
                 headers = {"Content-type": f"application/{data_type}"}
             if data_type == "xml":
-                response = self.session.post(
-                    full_url, headers=headers, data=data, params=params
+                response = self._request(
+                    "POST",
+                    path,
+                    headers=headers,
+                    data=data,
+                    params=params,
+                    timeout=timeout,
                 )
             else:
-                response = self.session.post(
-                    full_url, headers=headers, json=data, params=params
+                response = self._request(
+                    "POST",
+                    path,
+                    headers=headers,
+                    json=data,
+                    params=params,
+                    timeout=timeout,
                 )
         if file:
-            response = self.session.post(full_url, data=data, params=params, files=file)
+            response = self._request(
+                "POST", path, data=data, params=params, files=file, timeout=timeout
+            )
         self._raise_recognized_errors(response)
         response.raise_for_status()
         if success_message:
             return success_message
         elif data_type == "json":
-            return response.json()
+            return self._json(response, "POST", path)
         elif data_type in ["xml", None]:
             return response.text
         else:  # pragma: no cover
@@ -244,20 +803,20 @@ class RequestBuilder:
         :raises InvalidDataType:
             data_type is not json or xml
         """
-        full_url = self.base_url + quote(endpoint, safe="/,")
+        path = quote(endpoint, safe="/,")
         headers = {"Content-type": f"application/{data_type}"}
         if data_type == "xml":
-            response = self.session.put(
-                full_url, headers=headers, data=data, params=params
+            response = self._request(
+                "PUT", path, headers=headers, data=data, params=params
             )
         else:
-            response = self.session.put(
-                full_url, headers=headers, json=data, params=params
+            response = self._request(
+                "PUT", path, headers=headers, json=data, params=params
             )
         self._raise_recognized_errors(response)
         response.raise_for_status()
         if data_type == "json":
-            return response.json()
+            return self._json(response, "PUT", path)
         elif data_type == "xml":
             return response.text
         else:  # pragma: no cover
@@ -294,21 +853,21 @@ class RequestBuilder:
         :raises InvalidDataType:
             data_type is not json or xml
         """
-        full_url = self.base_url + quote(endpoint, safe="/,")
+        path = quote(endpoint, safe="/,")
         if not headers:
             headers = {"Content-type": f"application/{data_type}"}
         if data_type == "xml":  # pragma: no cover
-            response = self.session.patch(
-                full_url, headers=headers, data=data, params=params
+            response = self._request(
+                "PATCH", path, headers=headers, data=data, params=params
             )
         else:
-            response = self.session.patch(
-                full_url, headers=headers, json=data, params=params
+            response = self._request(
+                "PATCH", path, headers=headers, json=data, params=params
             )
         self._raise_recognized_errors(response)
         response.raise_for_status()
         if data_type == "json":
-            return response.json()
+            return self._json(response, "PATCH", path)
         elif data_type == "xml":  # pragma: no cover
             return response.text
         else:  # pragma: no cover
@@ -344,23 +903,39 @@ class RequestBuilder:
         """
         # + was added as a safe character to make
         # Classic.log_flush_interval work, need to find a better workaround
-        full_url = self.base_url + quote(endpoint, safe="/+,")
+        path = quote(endpoint, safe="/+,")
         headers = {"Content-type": f"application/{data_type}"}
-        response = self.session.delete(
-            full_url, headers=headers, data=data, params=params
+        response = self._request(
+            "DELETE", path, headers=headers, data=data, params=params
         )
         self._raise_recognized_errors(response)
         response.raise_for_status()
         if success_message:
             return success_message
         elif data_type == "json":  # pragma: no cover
-            return response.json()
+            return self._json(response, "DELETE", path)
         elif data_type == "xml":
             return response.text
         else:  # pragma: no cover
             raise InvalidDataType("data_type needs to be either json or xml")
 
 
+def cap_timeout(timeout: Timeout, seconds: float) -> Timeout:
+    """
+    Caps a requests timeout to a number of seconds
+
+    :param timeout: Timeout as one number or a (connect, read) tuple
+    :param seconds: Maximum seconds for each part of the timeout
+
+    :returns: Capped timeout in the same format it was given
+    """
+    if timeout is None:
+        return seconds
+    if isinstance(timeout, tuple):
+        return tuple(cap_timeout(part, seconds) for part in timeout)
+    return min(timeout, seconds)
+
+
 class InvalidDataType(Exception):
     """Raised when the data_type parameter is not json or xml"""
 
@@ -0,0 +1,448 @@
+import re
+from collections.abc import Mapping
+from typing import Any, Callable, List, Union
+from urllib.parse import quote
+
+# Comparison operators and their FIQL aliases
+OPERATORS = {
+    "==": "==",
+    "!=": "!=",
+    "<": "<",
+    "=lt=": "<",
+    "<=": "<=",
+    "=le=": "<=",
+    ">": ">",
+    "=gt=": ">",
+    ">=": ">=",
+    "=ge=": ">=",
+    "=in=": "=in=",
+    "=out=": "=out=",
+}
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    |(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    |(?P<open>\()
+    |(?P<close>\))
+    |(?P<and>;)
+    |(?P<or>,)
+    |(?P<operator>==|!=|<=|>=|<|>|=[a-z]+=)
+    |(?P<word>[^\s()"';,=!<>]+)
+    """,
+    re.VERBOSE,
+)
+# Operators written in their FIQL form when a filter is rendered, so the
+# filter does not need < and > escaped in a URL
+RENDERED = {"<": "=lt=", "<=": "=le=", ">": "=gt=", ">=": "=ge="}
+# Characters that need a value to be quoted when a filter is rendered
+RESERVED = re.compile(r"""[\s()"';,=!<>]""")
+# Longest URL encoded filter sent in one request, which keeps the request
+# line well under the 8 KB most servers and proxies accept
+MAX_FILTER_LENGTH = 6000
+# URL encoded length of the , ; ( and ) between the parts of a filter
+SEPARATOR_LENGTH = 3
+
+
+class Comparison:
+    """
+    Compares the value of a field, e.g. general.name=="Orchard"
+
+    Strings are compared case insensitively and == and != treat * as a
+    wildcard. Values are converted to the type of the field they are
+    compared with, numbers as numbers and booleans from true or false.
+    Strings of digits such as ids are ordered as numbers. A field without a
+    value only matches != and =out=.
+
+    :param field: Field name e.g. general.name
+    :param operator: One of OPERATORS e.g. =in=
+    :param values: Values to compare with, one unless the operator is =in=
+        or =out=
+
+    :raises InvalidFilter: The operator is not known
+    """
+
+    def __init__(self, field: str, operator: str, values: List[str]):
+        if operator not in OPERATORS:
+            raise InvalidFilter(f"Unknown operator {operator} for {field}.")
+        self.field = field
+        self.operator = OPERATORS[operator]
+        self.values = tuple(values)
+        self._folded = tuple(value.casefold() for value in self.values)
+        self._numbers = tuple(parse_number(value) for value in self.values)
+        self._pattern = None
+        if self.operator in ("==", "!=") and "*" in self.values[0]:
+            pattern = re.escape(self.values[0]).replace(r"\*", ".*")
+            self._pattern = re.compile(pattern + r"\Z", re.IGNORECASE | re.DOTALL)
+
+    def fields(self) -> set:
+        return {self.field}
+
+    def __and__(self, other) -> "And":
+        return _combine(And, self, other)
+
+    def __or__(self, other) -> "Or":
+        return _combine(Or, self, other)
+
+    def evaluate(self, get: Callable[[str], Any]) -> bool:
+        actual = get(self.field)
+        operator = self.operator
+        if actual is None:
+            return operator in ("!=", "=out=")
+        if operator in ("=in=", "=out="):
+            found = any(
+                self._equals(actual, index) for index in range(len(self.values))
+            )
+            return found if operator == "=in=" else not found
+        if operator == "==":
+            return self._equals(actual, 0)
+        if operator == "!=":
+            return not self._equals(actual, 0)
+        if isinstance(actual, bool):
+            actual, expected = actual, self._folded[0] == "true"
+        elif isinstance(actual, (int, float)) and self._numbers[0] is not None:
+            expected = self._numbers[0]
+        elif (
+            isinstance(actual, str)
+            and actual.isdigit()
+            and self._numbers[0] is not None
+        ):
+            # Ids are returned as strings but compared as numbers
+            actual, expected = int(actual), self._numbers[0]
+        else:
+            actual, expected = str(actual).casefold(), self._folded[0]
+        if operator == "<":
+            return actual < expected
+        if operator == "<=":
+            return actual <= expected
+        if operator == ">":
+            return actual > expected
+        return actual >= expected
+
+    def _equals(self, actual, index: int) -> bool:
+        if isinstance(actual, bool):
+            return actual == (self._folded[index] == "true")
+        if isinstance(actual, (int, float)) and self._numbers[index] is not None:
+            return actual == self._numbers[index]
+        if self._pattern is not None:
+            return self._pattern.match(str(actual)) is not None
+        return str(actual).casefold() == self._folded[index]
+
+    def __str__(self):
+        if self.operator in ("=in=", "=out="):
+            values = ",".join(_quote(value) for value in self.values)
+            return f"{self.field}{self.operator}({values})"
+        operator = RENDERED.get(self.operator, self.operator)
+        return f"{self.field}{operator}{_quote(self.values[0])}"
+
+    def __repr__(self):
+        return f"Comparison({self.field!r}, {self.operator!r}, {list(self.values)!r})"
+
+
+class And:
+    """
+    Matches when all of its children match, ; or and in RSQL
+
+    :param children: Comparison, And or Or nodes
+    """
+
+    separator = ";"
+
+    def __init__(self, children: list):
+        self.children = list(children)
+
+    def fields(self) -> set:
+        return set().union(*(child.fields() for child in self.children))
+
+    def __and__(self, other) -> "And":
+        return _combine(And, self, other)
+
+    def __or__(self, other) -> "Or":
+        return _combine(Or, self, other)
+
+    def evaluate(self, get: Callable[[str], Any]) -> bool:
+        return all(child.evaluate(get) for child in self.children)
+
+    def __str__(self):
+        return self.separator.join(
+            f"({child})" if isinstance(child, (And, Or)) else str(child)
+            for child in self.children
+        )
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.children!r})"
+
+
+class Or(And):
+    """
+    Matches when any of its children match, , or or in RSQL
+
+    :param children: Comparison, And or Or nodes
+    """
+
+    separator = ","
+
+    def evaluate(self, get: Callable[[str], Any]) -> bool:
+        return any(child.evaluate(get) for child in self.children)
+
+
+Node = Union[Comparison, And, Or]
+
+
+def parse(query: str) -> Node:
+    """
+    Parses an RSQL filter as accepted by the filter parameter of the Pro API
+
+    :param query: RSQL filter e.g. general.name=="Orchard";id=gt=100
+
+    :returns: Comparison, And or Or node that evaluates the filter
+
+    :raises InvalidFilter: The filter is not valid RSQL
+    """
+    parser = _Parser(_tokenize(query), query)
+    node = parser.expression()
+    if parser.peek() is not None:
+        raise InvalidFilter(f"Unexpected {parser.peek()[1]!r} in filter {query!r}.")
+    return node
+
+
+def field_getter(record: dict) -> Callable[[str], Any]:
+    """
+    Returns a function that looks up dotted field names, e.g.
+    general.name, in a record returned by the Pro API
+
+    :param record: Decoded record e.g. a computer inventory
+    """
+
+    def get(field: str):
+        value = record
+        for key in field.split("."):
+            if not isinstance(value, (dict, Mapping)):
+                return None
+            value = value.get(key)
+        return value
+
+    return get
+
+
+def matches(query: Union[str, Node], record: dict) -> bool:
+    """
+    Returns whether a record returned by the Pro API matches an RSQL filter
+
+    :param query: RSQL filter or a node returned by parse
+    :param record: Decoded record e.g. a computer inventory
+    """
+    if isinstance(query, str):
+        query = parse(query)
+    return query.evaluate(field_getter(record))
+
+
+def parse_number(value: str) -> Union[float, None]:
+    """
+    Returns a filter value as the float it is compared with numeric fields
+    as, None if the value is not a number
+
+    :param value: Filter value e.g. 10.5
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def encoded_length(query: Union[str, Node]) -> int:
+    """
+    Returns the length of a filter once URL encoded as a query parameter
+
+    :param query: RSQL filter or a node
+    """
+    return len(quote(str(query), safe=""))
+
+
+def split(query: Union[str, Node], max_length: int = MAX_FILTER_LENGTH) -> List[Node]:
+    """
+    Splits a filter into filters that are each at most max_length long once
+    URL encoded and together match the same records. Filters are split
+    between the children of a , and between the values of an =in=. A ; is
+    split by splitting its longest child and repeating the other children
+    with each part.
+
+    Example: split("id=in=(1,2,3,...)", 100) returns id=in=(1,2) and so on
+
+    :param query: RSQL filter or a node
+    :param max_length: Longest URL encoded filter of each part
+
+    :returns: Nodes whose results together are the results of the filter
+
+    :raises FilterTooLong: The filter can not be split into short enough parts
+    :raises InvalidFilter: The filter is not valid RSQL
+    """
+    node = parse(query) if isinstance(query, str) else query
+    if encoded_length(node) <= max_length:
+        return [node]
+    if isinstance(node, Comparison):
+        if node.operator != "=in=" or len(node.values) == 1:
+            raise FilterTooLong(f"{node.field} can not be split into shorter filters.")
+        overhead = encoded_length(f"{node.field}=in=()")
+        lengths = [encoded_length(_quote(value)) for value in node.values]
+        return [
+            Comparison(node.field, "=in=", values)
+            for values in _pack(node.values, lengths, overhead, max_length)
+        ]
+    if type(node) is Or:
+        parts = [part for child in node.children for part in split(child, max_length)]
+        lengths = [encoded_length(_render(part)) for part in parts]
+        return [
+            group[0] if len(group) == 1 else Or(group)
+            for group in _pack(parts, lengths, 0, max_length)
+        ]
+    lengths = [encoded_length(_render(child)) for child in node.children]
+    rest = sum(lengths) + SEPARATOR_LENGTH * (len(lengths) - 1)
+    for index in sorted(range(len(lengths)), key=lengths.__getitem__, reverse=True):
+        child = node.children[index]
+        if isinstance(child, Comparison) and child.operator != "=in=":
+            continue
+        # The part may need parentheses where the child did not
+        budget = max_length - (rest - lengths[index]) - 2 * SEPARATOR_LENGTH
+        if budget <= 0:
+            break
+        try:
+            parts = split(child, budget)
+        except FilterTooLong:
+            continue
+        return [
+            And(
+                [part if i == index else other for i, other in enumerate(node.children)]
+            )
+            for part in parts
+        ]
+    raise FilterTooLong(f"{node} can not be split into shorter filters.")
+
+
+def _pack(items: list, lengths: List[int], overhead: int, max_length: int):
+    # Groups items in order, each group no longer than max_length with the
+    # overhead and a separator between its items
+    groups = [[]]
+    length = overhead
+    for item, item_length in zip(items, lengths):
+        separator = SEPARATOR_LENGTH if groups[-1] else 0
+        if groups[-1] and length + separator + item_length > max_length:
+            groups.append([])
+            length = overhead
+            separator = 0
+        if overhead + item_length > max_length:
+            raise FilterTooLong(f"{item} can not be split into shorter filters.")
+        groups[-1].append(item)
+        length += separator + item_length
+    return groups
+
+
+def _render(node: Node) -> str:
+    # Renders a child of an And or Or as its parent does
+    return f"({node})" if isinstance(node, (And, Or)) else str(node)
+
+
+def _combine(kind: type, left: Node, right: Node) -> Node:
+    children = []
+    for node in (left, right):
+        children.extend(node.children if type(node) is kind else [node])
+    return kind(children)
+
+
+def _tokenize(query: str) -> list:
+    tokens = []
+    position = 0
+    while position < len(query):
+        match = TOKEN_PATTERN.match(query, position)
+        if not match:
+            raise InvalidFilter(f"Unexpected {query[position]!r} in filter {query!r}.")
+        kind = match.lastgroup
+        text = match.group()
+        position = match.end()
+        if kind == "space":
+            continue
+        if kind == "string":
+            text = re.sub(r"\\(.)", r"\1", text[1:-1])
+        tokens.append((kind, text))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: list, query: str):
+        self.tokens = tokens
+        self.query = query
+        self.position = 0
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def take(self, *kinds):
+        token = self.peek()
+        if token is None or token[0] not in kinds:
+            found = "the end" if token is None else repr(token[1])
+            raise InvalidFilter(f"Unexpected {found} in filter {self.query!r}.")
+        self.position += 1
+        return token
+
+    def logical(self, kind: str) -> bool:
+        token = self.peek()
+        if token is None:
+            return False
+        if token[0] == kind or (token[0] == "word" and token[1].lower() == kind):
+            self.position += 1
+            return True
+        return False
+
+    def expression(self) -> Node:
+        children = [self.conjunction()]
+        while self.logical("or"):
+            children.append(self.conjunction())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def conjunction(self) -> Node:
+        children = [self.term()]
+        while self.logical("and"):
+            children.append(self.term())
+        return children[0] if len(children) == 1 else And(children)
+
+    def term(self) -> Node:
+        if self.peek() and self.peek()[0] == "open":
+            self.take("open")
+            node = self.expression()
+            self.take("close")
+            return node
+        field = self.take("word")[1]
+        operator = self.take("operator")[1]
+        if self.peek() and self.peek()[0] == "open":
+            self.take("open")
+            values = [self.take("word", "string")[1]]
+            while self.peek() and self.peek()[0] == "or":
+                self.take("or")
+                values.append(self.take("word", "string")[1])
+            self.take("close")
+        else:
+            values = [self.take("word", "string")[1]]
+        if len(values) > 1 and OPERATORS.get(operator) not in ("=in=", "=out="):
+            raise InvalidFilter(f"{operator} takes one value in {self.query!r}.")
+        return Comparison(field, operator, values)
+
+
+def _quote(value: str) -> str:
+    if value and not RESERVED.search(value):
+        return value
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+class FilterTooLong(Exception):
+    """
+    The filter is longer than the limit and can not be split into shorter
+    filters that match the same records.
+    """
+
+
+class InvalidFilter(Exception):
+    """
+    The filter is not valid RSQL.
+    """
@@ -0,0 +1,541 @@
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from math import ceil
+from typing import Iterator, List
+
+from jps_api_wrapper.concurrency import concurrent_map
+from jps_api_wrapper.pro import Pro
+from jps_api_wrapper.rsql import Comparison, Or, field_getter
+from jps_api_wrapper.utils import iter_pages
+
+# Fields whose newest values are kept as high-water marks, records with a
+# later value are fetched by the next sync
+COMPUTER_WATERMARKS = ("general.reportDate", "general.lastContactTime")
+MOBILE_DEVICE_WATERMARK = "lastInventoryUpdateDate"
+# Section that holds little more than the id of each record, requested when
+# scanning for deleted computers
+ID_SECTION = "IBEACONS"
+# Rows written to SQLite per transaction
+DEFAULT_BATCH_SIZE = 500
+# Ids per =in= filter when fetching the sections of changed devices
+DEFAULT_CHUNK_SIZE = 100
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+COMPUTER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS computers (
+    id TEXT PRIMARY KEY,
+    udid TEXT,
+    name TEXT,
+    serial_number TEXT,
+    report_date TEXT,
+    last_contact_time TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS computers_serial_number ON computers (serial_number);
+CREATE INDEX IF NOT EXISTS computers_udid ON computers (udid);
+"""
+MOBILE_DEVICE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mobile_devices (
+    id TEXT PRIMARY KEY,
+    udid TEXT,
+    name TEXT,
+    serial_number TEXT,
+    management_id TEXT,
+    last_inventory_update TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mobile_devices_serial_number
+    ON mobile_devices (serial_number);
+CREATE INDEX IF NOT EXISTS mobile_devices_udid ON mobile_devices (udid);
+CREATE INDEX IF NOT EXISTS mobile_devices_management_id
+    ON mobile_devices (management_id);
+"""
+
+
+class InventoryMirror(ABC):
+    """
+    SQLite table of records mirrored from the JPS server, with the sync
+    state and the scan for deleted records shared by the mirrors.
+    Subclasses set table and schema and implement _scan_ids.
+    """
+
+    table = None
+    schema = None
+
+    def __init__(
+        self,
+        client: Pro,
+        path: str,
+        page_size: int,
+        batch_size: int,
+        reconcile_interval: float,
+        concurrency: int,
+    ):
+        self.client = client
+        self.path = path
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.reconcile_interval = reconcile_interval
+        self.concurrency = concurrency
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(self.schema + STATE_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    def reconcile(self) -> int:
+        """
+        Removes records from the mirror that no longer exist on the JPS
+        server by scanning the ids of every record
+
+        :returns: Number of records removed
+        """
+        return self._delete_missing(self._scan_ids())
+
+    def get(self, id: str) -> dict:
+        """
+        Returns a mirrored record, None if it is not mirrored
+
+        :param id: Record id
+        """
+        row = self.connection.execute(
+            f"SELECT record FROM {self.table} WHERE id = ?", (str(id),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def records(
+        self, where: str = None, parameters: tuple = (), record_type: type = None
+    ) -> Iterator[dict]:
+        """
+        Yields the mirrored records ordered by id, optionally filtered by an
+        SQL condition on the columns of the table
+
+        :param where: SQL condition e.g. serial_number = ?
+        :param parameters: Parameters of the condition
+        :param record_type:
+            Optional Record subclass from the records module to yield the
+            records as instead of dicts, e.g. ComputerInventory. Each record
+            is parsed when one of its fields is first read.
+        """
+        query = f"SELECT record FROM {self.table}"
+        if where:
+            query += f" WHERE {where}"
+        query += " ORDER BY CAST(id AS INTEGER)"
+        for (record,) in self.connection.execute(query, parameters):
+            if record_type is None:
+                yield json.loads(record)
+            else:
+                yield record_type.from_json(record)
+
+    def count(self) -> int:
+        """
+        Returns the number of mirrored records
+        """
+        query = f"SELECT COUNT(*) FROM {self.table}"
+        return self.connection.execute(query).fetchone()[0]
+
+    def close(self):
+        """
+        Closes the SQLite database
+        """
+        self.connection.close()
+
+    @abstractmethod
+    def _scan_ids(self) -> set:
+        """
+        Returns the ids of every record on the JPS server
+        """
+
+    def _finish(self, stats: dict, ids: set):
+        # A full sync has seen the id of every record, so it doubles as a
+        # scan for deleted ones
+        if stats["full"]:
+            stats["deleted"] = self._delete_missing(ids)
+        elif self._reconcile_due():
+            stats["deleted"] = self.reconcile()
+
+    def _delete_missing(self, ids: set) -> int:
+        mirrored = {
+            row[0] for row in self.connection.execute(f"SELECT id FROM {self.table}")
+        }
+        deleted = [(id,) for id in mirrored - ids]
+        with self.connection:
+            self.connection.executemany(
+                f"DELETE FROM {self.table} WHERE id = ?", deleted
+            )
+        self._set_state({"reconciled": str(time.time())})
+        return len(deleted)
+
+    def _upsert(self, rows: list):
+        if not rows:
+            return
+        placeholders = ", ".join("?" * len(rows[0]))
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO {self.table} VALUES ({placeholders})", rows
+            )
+
+    def _reconcile_due(self) -> bool:
+        if self.reconcile_interval is None:
+            return False
+        reconciled = float(self._state().get("reconciled", 0))
+        return time.time() - reconciled >= self.reconcile_interval
+
+    def _state(self) -> dict:
+        # State keys are prefixed with the table so mirrors can share a
+        # database
+        state = {}
+        for key, value in self.connection.execute("SELECT key, value FROM sync_state"):
+            table, _, name = key.partition(":")
+            if table == self.table:
+                state[name] = value
+        return state
+
+    def _set_state(self, values: dict):
+        rows = [(f"{self.table}:{key}", value) for key, value in values.items()]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?)", rows
+            )
+
+
+class ComputerInventorySync(InventoryMirror):
+    """
+    Keeps a local SQLite mirror of the computer inventory up to date. The
+    first sync fetches every computer, later syncs only fetch computers
+    whose general.reportDate or general.lastContactTime is at or after the
+    newest value seen so far, so an hourly refresh costs a few pages rather
+    than the whole fleet. Computers deleted from the JPS server are removed
+    by a scan of every computer id, which runs every reconcile_interval
+    seconds.
+
+    The high-water marks are dates returned by the server, so the clocks of
+    the server and the machine syncing do not need to agree. Records are
+    stored as JSON with their id, udid, name, serial number and dates in
+    columns, serial number and udid are indexed.
+
+    Example:
+
+    with Pro(url, username, password) as pro:
+        with ComputerInventorySync(pro, "inventory.db") as mirror:
+            mirror.sync()
+            computer = mirror.get("12")
+
+    :param client: Pro client to fetch the inventory with
+    :param path: Path of the SQLite database, created if it does not exist
+    :param section:
+        Sections of the inventory to mirror, GENERAL is always included as
+        the high-water marks are read from it
+    :param page_size: Records per request
+    :param batch_size: Records written to SQLite per transaction
+    :param reconcile_interval:
+        Seconds between scans for deleted computers, 0 scans on every sync
+        and None never scans
+    :param concurrency: Pages requested at once while syncing
+    """
+
+    table = "computers"
+    schema = COMPUTER_SCHEMA
+
+    def __init__(
+        self,
+        client: Pro,
+        path: str,
+        section: List[str] = ("GENERAL",),
+        page_size: int = 2000,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        reconcile_interval: float = 86400,
+        concurrency: int = 8,
+    ):
+        super().__init__(
+            client, path, page_size, batch_size, reconcile_interval, concurrency
+        )
+        self.section = ["GENERAL"] + [name for name in section if name != "GENERAL"]
+
+    def sync(self, full: bool = False) -> dict:
+        """
+        Fetches the computers that changed since the last sync into the
+        mirror and removes deleted computers when a scan is due
+
+        :param full: Fetch every computer even if the mirror has been synced
+
+        :returns:
+            Dict with the pages requested, records fetched and deleted and
+            whether the sync was full
+        """
+        watermarks = {} if full else self._watermarks()
+        filter = str(
+            Or(
+                [
+                    Comparison(field, ">=", [value])
+                    for field, value in watermarks.items()
+                ]
+            )
+        )
+        stats = {"full": not filter, "pages": 0, "fetched": 0, "deleted": 0}
+        newest = dict(watermarks)
+        ids = set()
+        batch = []
+        for records in self._pages(self.section, filter or None):
+            stats["pages"] += 1
+            stats["fetched"] += len(records)
+            for record in records:
+                ids.add(str(record["id"]))
+                get = field_getter(record)
+                for field in COMPUTER_WATERMARKS:
+                    value = get(field)
+                    if value and value > newest.get(field, ""):
+                        newest[field] = value
+                batch.append(_computer_row(record))
+            if len(batch) >= self.batch_size:
+                self._upsert(batch)
+                batch = []
+        self._upsert(batch)
+        self._set_state({f"watermark:{key}": value for key, value in newest.items()})
+        self._finish(stats, ids)
+        return stats
+
+    def _scan_ids(self) -> set:
+        ids = set()
+        for records in self._pages([ID_SECTION], None):
+            ids.update(str(record["id"]) for record in records)
+        return ids
+
+    def _pages(self, section: List[str], filter: str) -> Iterator[list]:
+        yield from iter_pages(
+            self.client.get_computer_inventories,
+            self.page_size,
+            self.concurrency,
+            section=list(section),
+            sort=["id:asc"],
+            filter=filter,
+        )
+
+    def _watermarks(self) -> dict:
+        state = self._state()
+        return {
+            field: state[f"watermark:{field}"]
+            for field in COMPUTER_WATERMARKS
+            if f"watermark:{field}" in state
+        }
+
+
+class MobileDeviceSync(InventoryMirror):
+    """
+    Keeps a local SQLite mirror of mobile device details up to date. The
+    first sync fetches the sections of every device. Later syncs fetch the
+    GENERAL section of devices whose lastInventoryUpdateDate is at or after
+    the newest one seen, compare it with the date stored for each device,
+    and fetch the other sections only for the devices whose inventory
+    actually changed, with =in= filters on their ids. Devices deleted from
+    the JPS server are removed by a scan of every device id, which runs
+    every reconcile_interval seconds.
+
+    Records are stored as JSON with their id, udid, name, serial number,
+    management id and last inventory update in columns, serial number, udid
+    and management id are indexed.
+
+    Example:
+
+    with Pro(url, username, password) as pro:
+        with MobileDeviceSync(pro, "devices.db") as mirror:
+            mirror.sync()
+            [ipad] = mirror.records("serial_number = ?", ("DMQX1234ABCD",))
+
+    :param client: Pro client to fetch the devices with
+    :param path: Path of the SQLite database, created if it does not exist
+    :param section:
+        Sections of the device details to mirror, GENERAL is always included
+        as the last inventory update is read from it and the serial number
+        column is only filled when HARDWARE is mirrored
+    :param page_size: Records per request
+    :param batch_size: Records written to SQLite per transaction
+    :param reconcile_interval:
+        Seconds between scans for deleted devices, 0 scans on every sync and
+        None never scans
+    :param concurrency: Pages requested at once while syncing
+    :param chunk_size: Changed devices whose sections are fetched per request
+    """
+
+    table = "mobile_devices"
+    schema = MOBILE_DEVICE_SCHEMA
+
+    def __init__(
+        self,
+        client: Pro,
+        path: str,
+        section: List[str] = ("GENERAL", "HARDWARE"),
+        page_size: int = 2000,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        reconcile_interval: float = 86400,
+        concurrency: int = 8,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        super().__init__(
+            client, path, page_size, batch_size, reconcile_interval, concurrency
+        )
+        self.section = ["GENERAL"] + [name for name in section if name != "GENERAL"]
+        self.chunk_size = chunk_size
+
+    def sync(self, full: bool = False) -> dict:
+        """
+        Fetches the devices whose inventory changed since the last sync into
+        the mirror and removes deleted devices when a scan is due
+
+        :param full: Fetch every device even if the mirror has been synced
+
+        :returns:
+            Dict with the pages requested, devices fetched, changed and
+            deleted and whether the sync was full
+        """
+        watermark = None if full else self._state().get("watermark")
+        full = full or watermark is None
+        filter = None
+        if not full:
+            filter = str(Comparison(MOBILE_DEVICE_WATERMARK, ">=", [watermark]))
+        section = self.section if full else ["GENERAL"]
+        stats = {"full": full, "pages": 0, "fetched": 0, "changed": 0, "deleted": 0}
+        newest = watermark or ""
+        ids = set()
+        for records in self._pages(section, filter):
+            stats["pages"] += 1
+            stats["fetched"] += len(records)
+            ids.update(str(record["mobileDeviceId"]) for record in records)
+            for record in records:
+                updated = _inventory_update(record)
+                if updated and updated > newest:
+                    newest = updated
+            if not full:
+                records = self._changed(records)
+                if len(self.section) > 1:
+                    stats["pages"] += ceil(len(records) / self.chunk_size)
+                    records = self._with_sections(records)
+            stats["changed"] += len(records)
+            rows = [_mobile_device_row(record) for record in records]
+            for batch in _chunks(rows, self.batch_size):
+                self._upsert(batch)
+        if newest:
+            self._set_state({"watermark": newest})
+        self._finish(stats, ids)
+        return stats
+
+    def _changed(self, records: list) -> list:
+        # Compares the last inventory update of each device with the one
+        # stored for it, unchanged devices are left alone
+        ids = [str(record["mobileDeviceId"]) for record in records]
+        stored = {}
+        # Older SQLite versions allow 999 parameters per statement
+        for chunk in _chunks(ids, 900):
+            placeholders = ", ".join("?" * len(chunk))
+            stored.update(
+                self.connection.execute(
+                    "SELECT id, last_inventory_update FROM mobile_devices "
+                    f"WHERE id IN ({placeholders})",
+                    chunk,
+                )
+            )
+        return [
+            record
+            for id, record in zip(ids, records)
+            if id not in stored or stored[id] != _inventory_update(record)
+        ]
+
+    def _with_sections(self, records: list) -> list:
+        # Fetches the sections other than GENERAL for the changed devices and
+        # merges them into their records
+        section = self.section[1:]
+        keys = [_section_key(name) for name in section]
+        ids = [str(record["mobileDeviceId"]) for record in records]
+        chunks = list(_chunks(ids, self.chunk_size))
+
+        def get_chunk(chunk):
+            return self.client.get_mobile_devices_detail(
+                section=section,
+                page=0,
+                page_size=len(chunk),
+                sort=["mobileDeviceId:asc"],
+                filter=str(Comparison("mobileDeviceId", "=in=", chunk)),
+            )["results"]
+
+        limiter = getattr(self.client, "limiter", None)
+        details = {}
+        for results in concurrent_map(get_chunk, chunks, limiter):
+            for detail in results:
+                details[str(detail["mobileDeviceId"])] = detail
+        for id, record in zip(ids, records):
+            detail = details.get(id, {})
+            record.update({key: detail.get(key) for key in keys})
+        return records
+
+    def _scan_ids(self) -> set:
+        ids = set()
+        for records in iter_pages(
+            self.client.get_mobile_devices,
+            self.page_size,
+            self.concurrency,
+            sort=["id:asc"],
+        ):
+            ids.update(str(record["id"]) for record in records)
+        return ids
+
+    def _pages(self, section: List[str], filter: str) -> Iterator[list]:
+        yield from iter_pages(
+            self.client.get_mobile_devices_detail,
+            self.page_size,
+            self.concurrency,
+            section=list(section),
+            sort=["mobileDeviceId:asc"],
+            filter=filter,
+        )
+
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        end = start + size
+        yield items[start:end]
+
+
+def _section_key(section: str) -> str:
+    # USER_AND_LOCATION is found under userAndLocation in the records
+    first, *rest = section.lower().split("_")
+    return first + "".join(word.capitalize() for word in rest)
+
+
+def _inventory_update(record: dict) -> str:
+    return (record.get("general") or {}).get(MOBILE_DEVICE_WATERMARK)
+
+
+def _computer_row(record: dict) -> tuple:
+    get = field_getter(record)
+    return (
+        str(record["id"]),
+        record.get("udid"),
+        get("general.name"),
+        get("hardware.serialNumber"),
+        get("general.reportDate"),
+        get("general.lastContactTime"),
+        json.dumps(record, separators=(",", ":")),
+    )
+
+
+def _mobile_device_row(record: dict) -> tuple:
+    get = field_getter(record)
+    return (
+        str(record["mobileDeviceId"]),
+        get("general.udid"),
+        get("general.displayName"),
+        get("hardware.serialNumber"),
+        get("general.managementId"),
+        _inventory_update(record),
+        json.dumps(record, separators=(",", ":")),
+    )
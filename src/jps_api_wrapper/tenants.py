@@ -0,0 +1,196 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, List
+
+from jps_api_wrapper.concurrency import AdaptiveLimiter
+from jps_api_wrapper.pro import Pro
+
+
+class Tenant:
+    """
+    Credentials for one JPS instance managed through a TenantPool
+
+    :param name: Name used to identify the tenant in results
+    :param base_url:
+        Base URL of the JPS server
+        e.g. https://example.jamfcloud.com
+    :param username: Username for the JPS instance
+    :param password: Password for the JPS instance
+    :param client: Whether or not the credentials are for an API client
+    :param options:
+        Keyword arguments passed to the client for this tenant, e.g. timeout
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        username: str,
+        password: str,
+        client: bool = False,
+        **options,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.client = client
+        self.options = options
+
+    def __repr__(self):
+        return f"Tenant({self.name!r}, {self.base_url!r})"
+
+
+class TenantResult:
+    """
+    Outcome of an operation run against one tenant of a TenantPool
+
+    :param tenant: Tenant the operation ran against
+    :param result: Value returned by the operation
+    :param error: Exception raised by the operation or while authenticating
+    """
+
+    def __init__(self, tenant: Tenant, result=None, error: Exception = None):
+        self.tenant = tenant
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether the operation completed without raising
+        """
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return f"TenantResult({self.tenant.name!r}, result={self.result!r})"
+        return f"TenantResult({self.tenant.name!r}, error={self.error!r})"
+
+
+class TenantPool:
+    """
+    Holds the credentials and clients for many JPS instances and runs the
+    same operation against all of them in parallel, so one slow server does
+    not hold up the rest. Clients are created and authenticated the first
+    time an operation needs them and reused after that.
+
+    :param tenants: Tenants to manage
+    :param client_class: Client to create for each tenant, Pro or Classic
+    :param per_tenant_limit:
+        Highest number of concurrent requests sent to a single tenant, used
+        as the max_limit of each client's AdaptiveLimiter
+    :param global_limit:
+        Highest number of operations running at the same time across all
+        tenants, shared by every call to run
+
+    :raises ValueError: Two tenants share the same name
+    """
+
+    def __init__(
+        self,
+        tenants: List[Tenant],
+        client_class=Pro,
+        per_tenant_limit: int = 4,
+        global_limit: int = 32,
+    ):
+        self.tenants = {}
+        for tenant in tenants:
+            if tenant.name in self.tenants:
+                raise ValueError(f"Tenant names must be unique: {tenant.name}")
+            self.tenants[tenant.name] = tenant
+        self.client_class = client_class
+        self.per_tenant_limit = per_tenant_limit
+        self.global_limit = global_limit
+        self._clients = {}
+        self._semaphores = {
+            name: threading.BoundedSemaphore(per_tenant_limit) for name in self.tenants
+        }
+        self._locks = {name: threading.Lock() for name in self.tenants}
+        self._running = threading.BoundedSemaphore(global_limit)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    def client(self, name: str):
+        """
+        Returns the authenticated client for a tenant, creating it if needed
+
+        :param name: Tenant name
+        """
+        with self._locks[name]:
+            if name not in self._clients:
+                tenant = self.tenants[name]
+                options = dict(tenant.options)
+                options.setdefault(
+                    "limiter",
+                    AdaptiveLimiter(
+                        initial_limit=min(4, self.per_tenant_limit),
+                        max_limit=self.per_tenant_limit,
+                    ),
+                )
+                self._clients[name] = self.client_class(
+                    tenant.base_url,
+                    tenant.username,
+                    tenant.password,
+                    tenant.client,
+                    **options,
+                )
+            return self._clients[name]
+
+    def run(
+        self, operation: Callable, tenants: List[str] = None
+    ) -> Iterator[TenantResult]:
+        """
+        Runs an operation against every tenant in parallel and yields the
+        results as each tenant finishes. Failures are yielded as results with
+        an error instead of being raised, so one broken tenant does not stop
+        the others.
+
+        Example: pool.run(lambda pro: pro.get_jamf_pro_version())
+
+        :param operation: Callable that takes the tenant's client
+        :param tenants: Optional names of the tenants to run against
+
+        :returns: Iterator of TenantResult in the order they complete
+        """
+        names = list(self.tenants) if tenants is None else tenants
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.global_limit, len(names)))
+        )
+        futures = {
+            executor.submit(self._run_one, name, operation): name for name in names
+        }
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def close(self):
+        """
+        Invalidates the authentication tokens of every client that was created
+        and closes their transports. A tenant whose token cannot be
+        invalidated does not stop the others from being closed.
+        """
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            try:
+                client.session.auth.invalidate()
+            except Exception:
+                pass
+            if client.transport:
+                client.transport.close()
+
+    def _run_one(self, name: str, operation: Callable) -> TenantResult:
+        tenant = self.tenants[name]
+        with self._running, self._semaphores[name]:
+            try:
+                return TenantResult(tenant, result=operation(self.client(name)))
+            except Exception as error:
+                return TenantResult(tenant, error=error)
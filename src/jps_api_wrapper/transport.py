@@ -0,0 +1,302 @@
+import json as jsonlib
+from abc import ABC, abstractmethod
+from http.cookies import SimpleCookie
+from typing import Union
+from urllib.parse import urlencode
+
+import requests
+import urllib3
+from requests.auth import AuthBase
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class Transport(ABC):
+    """
+    Sends the HTTP requests of a client. RequestBuilder calls request with
+    the same arguments it would give requests.Session.request and works with
+    any response that has the requests.Response attributes it uses:
+    status_code, headers, cookies, content, text, json(), raise_for_status()
+    and close().
+
+    Transports raise requests.Timeout and requests.ConnectionError for
+    timeouts and connection failures so the rest of the client can handle
+    them the same way regardless of the transport.
+
+    Transports that answer requests without a server, e.g. ReplayTransport,
+    set offline so the client does not request a token.
+    """
+
+    auth = None
+    offline = False
+
+    def bind(self, session: requests.Session):
+        """
+        Called by the client with its session so the transport can use its
+        authentication
+
+        :param session: Session of the client
+        """
+        self.auth = session.auth
+
+    @abstractmethod
+    def request(self, method: str, url: str, **kwargs):
+        """
+        Sends a request
+
+        :param method: HTTP method e.g. GET
+        :param url: Full URL of the request
+        :param kwargs:
+            headers, params, data, json, files, timeout and cookies as
+            accepted by requests.Session.request
+        """
+
+    def close(self):
+        """
+        Closes the connections held by the transport
+        """
+
+    def _auth_headers(self, headers: dict) -> dict:
+        headers = dict(headers or {})
+        if self.auth:
+            self.auth(_HeaderCarrier(headers))
+        return headers
+
+
+class OfflineAuth(AuthBase):
+    """
+    Stands in for JamfAuth on clients with an offline transport, requests
+    are sent without credentials and no token is requested
+    """
+
+    def __call__(self, r):
+        return r
+
+    def refresh_auth_if_needed(self) -> bool:
+        return False
+
+    def invalidate(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Sends requests with the requests.Session of the client, the same as a
+    client without a transport
+    """
+
+    session = None
+
+    def bind(self, session: requests.Session):
+        self.session = session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class HttpxTransport(Transport):
+    """
+    Sends requests with httpx, which can multiplex concurrent requests over a
+    single HTTP/2 connection. Requires the httpx package, install it with
+    pip install jps-api-wrapper[http2]
+
+    :param http2: Whether to negotiate HTTP/2 with the server
+    :param max_connections: Highest number of connections kept open
+
+    :raises ImportError: httpx is not installed
+    """
+
+    def __init__(self, http2: bool = True, max_connections: int = 100):
+        if httpx is None:  # pragma: no cover
+            raise ImportError(
+                "HttpxTransport requires httpx, install it with "
+                "pip install jps-api-wrapper[http2]"
+            )
+        self.client = httpx.Client(
+            http2=http2, limits=httpx.Limits(max_connections=max_connections)
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict = None,
+        params: dict = None,
+        data=None,
+        json=None,
+        files: dict = None,
+        timeout=None,
+        cookies: dict = None,
+    ) -> "TransportResponse":
+        headers = _cookie_headers(self._auth_headers(headers), cookies)
+        content = None
+        if isinstance(data, (str, bytes)):
+            content, data = data, None
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        try:
+            response = self.client.request(
+                method,
+                url,
+                headers=headers,
+                params=params,
+                content=content,
+                data=data,
+                json=json,
+                files=files,
+                timeout=timeout,
+            )
+        except httpx.TimeoutException as error:
+            raise requests.Timeout(str(error)) from error
+        except httpx.TransportError as error:
+            raise requests.ConnectionError(str(error)) from error
+        # Cookies are chosen per request by the client, not kept by httpx
+        self.client.cookies.clear()
+        return TransportResponse(
+            response.status_code,
+            response.headers,
+            response.content,
+            str(response.url),
+            response.headers.get_list("set-cookie"),
+            int(response.request.headers.get("content-length") or 0),
+        )
+
+    def close(self):
+        self.client.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    Sends requests with a urllib3 PoolManager directly, skipping the work
+    requests does to prepare each request and build its response
+
+    :param max_connections: Highest number of connections kept per host
+    """
+
+    def __init__(self, max_connections: int = 100):
+        self.pool = urllib3.PoolManager(maxsize=max_connections)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict = None,
+        params: dict = None,
+        data=None,
+        json=None,
+        files: dict = None,
+        timeout=None,
+        cookies: dict = None,
+    ) -> "TransportResponse":
+        headers = _cookie_headers(self._auth_headers(headers), cookies)
+        if params:
+            url = f"{url}?{urlencode(params, doseq=True)}"
+        body = data
+        if json is not None:
+            body = jsonlib.dumps(json)
+            headers.setdefault("Content-Type", "application/json")
+        if files:
+            fields = dict(data or {})
+            for name, (filename, file, content_type) in files.items():
+                fields[name] = (filename, file.read(), content_type)
+            body, headers["Content-Type"] = urllib3.encode_multipart_formdata(fields)
+        if isinstance(timeout, tuple):
+            timeout = urllib3.Timeout(connect=timeout[0], read=timeout[1])
+        try:
+            response = self.pool.request(
+                method,
+                url,
+                headers=headers,
+                body=body,
+                timeout=timeout,
+                retries=False,
+            )
+        except urllib3.exceptions.NewConnectionError as error:
+            # Subclasses ConnectTimeoutError but is a refused connection
+            raise requests.ConnectionError(str(error)) from error
+        except urllib3.exceptions.TimeoutError as error:
+            raise requests.Timeout(str(error)) from error
+        except urllib3.exceptions.HTTPError as error:
+            raise requests.ConnectionError(str(error)) from error
+        return TransportResponse(
+            response.status,
+            response.headers,
+            response.data,
+            url,
+            response.headers.getlist("Set-Cookie"),
+            len(body.encode() if isinstance(body, str) else body or b""),
+        )
+
+    def close(self):
+        self.pool.clear()
+
+
+class TransportResponse:
+    """
+    Response of the httpx and urllib3 transports with the parts of the
+    requests.Response interface that RequestBuilder uses
+
+    :param status_code: HTTP status code
+    :param headers: Case insensitive mapping of response headers
+    :param content: Response body
+    :param url: URL the request was sent to
+    :param set_cookies: Values of the Set-Cookie headers
+    :param request_size: Size in bytes of the request body that was sent
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        headers,
+        content: bytes,
+        url: str,
+        set_cookies: list = (),
+        request_size: int = 0,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.request_size = request_size
+        self.cookies = {}
+        for header in set_cookies:
+            cookie = SimpleCookie()
+            cookie.load(header)
+            self.cookies.update({name: morsel.value for name, morsel in cookie.items()})
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Union[dict, list]:
+        return jsonlib.loads(self.content)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(
+                f"{self.status_code} Error for url: {self.url}", response=self
+            )
+
+    def close(self):
+        pass
+
+
+class _HeaderCarrier:
+    # Stands in for a requests.PreparedRequest so requests auth classes like
+    # JamfAuth can add their headers
+    def __init__(self, headers: dict):
+        self.headers = headers
+
+
+def _cookie_headers(headers: dict, cookies: dict) -> dict:
+    if cookies:
+        headers["Cookie"] = "; ".join(
+            f"{name}={value}" for name, value in cookies.items()
+        )
+    return headers
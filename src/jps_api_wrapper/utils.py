@@ -1,6 +1,43 @@
 import inspect
+import re
 from datetime import datetime
-from typing import Union
+from math import ceil
+from typing import Callable, Iterator, Union
+
+from jps_api_wrapper.concurrency import Deadline, concurrent_map
+from jps_api_wrapper.records import Record, carry_record_type, decode_as
+from jps_api_wrapper.rsql import MAX_FILTER_LENGTH, encoded_length, field_getter, split
+
+# Keys that hold the identifier of records returned by the Pro API, used to
+# de-duplicate the results of split filters
+RECORD_ID_KEYS = ("id", "mobileDeviceId", "uuid")
+# Classic API path segments that are followed by a record identifier
+IDENTIFIER_SEGMENTS = {
+    "application",
+    "bundleid",
+    "category",
+    "command",
+    "createdBy",
+    "groupid",
+    "id",
+    "interval",
+    "macaddress",
+    "match",
+    "name",
+    "patchsoftwaretitleid",
+    "serialnumber",
+    "sourceid",
+    "status",
+    "subset",
+    "udid",
+    "userid",
+    "username",
+    "uuid",
+    "version",
+}
+UUID_PATTERN = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
 
 
 def identification_type(identifications: dict):
@@ -179,21 +216,108 @@ def enforce_type(value, types: tuple) -> bool:
         raise TypeError(f"{value} must be of type(s): {', '.join(types)}")
 
 
-def paginate(endpoint_method, *args, **kwargs):
+def normalize_endpoint(endpoint: str) -> str:
     """
-    Paginates the results of an endpoint
+    Replaces the record identifiers in an endpoint with placeholders so that
+    requests for different records of the same endpoint can be grouped
+
+    e.g. /api/v1/computers-inventory/12 becomes
+    /api/v1/computers-inventory/{id} and /JSSResource/computers/name/Mac
+    becomes /JSSResource/computers/name/{name}
+
+    :param endpoint: Endpoint without the base_url or query string
+
+    :returns: Endpoint template
+    """
+    classic = endpoint.startswith("/JSSResource/")
+    segments = endpoint.split("/")
+    for i, segment in enumerate(segments):
+        if classic and i > 2 and segments[i - 1] in IDENTIFIER_SEGMENTS:
+            segments[i] = "{" + segments[i - 1] + "}"
+        elif segment.isdigit():
+            segments[i] = "{id}"
+        elif UUID_PATTERN.match(segment):
+            segments[i] = "{uuid}"
+    return "/".join(segments)
+
+
+def match_prefix(options: dict, endpoint: str):
+    """
+    Returns the value of the longest key in options that endpoint starts
+    with, used for settings that are configured per endpoint prefix
+
+    :param options: Dictionary of endpoint prefixes and their values
+    :param endpoint: Endpoint to match e.g. /api/v1/buildings
+
+    :returns: Value of the longest matching prefix, None if nothing matches
+    """
+    matches = [prefix for prefix in options if endpoint.startswith(prefix)]
+    if not matches:
+        return None
+    return options[max(matches, key=len)]
+
+
+def paginate(
+    endpoint_method,
+    *args,
+    deadline: float = None,
+    record_type: type = None,
+    **kwargs,
+):
+    """
+    Paginates the results of an endpoint. When the client has a concurrency
+    limiter the remaining pages are requested concurrently after the first
+    page, within the limit the limiter currently allows.
 
     :param endpoint: Authenticated endpoint method
     :param args: Arguments to pass to the endpoint method
+    :param deadline:
+        Optional seconds that fetching all of the pages may take, no further
+        requests are sent once it expires
+    :param record_type:
+        Optional Record subclass from the records module to return the
+        results as instead of dicts, e.g. ComputerInventory. Each record
+        keeps its JSON as text until one of its fields is read.
     :param kwargs: Keyword arguments to pass to the endpoint method
 
     :return: All pages of results from endpoint method
-    """
+
+    :raises DeadlineExceeded: The deadline expired before all pages returned
+    :raises FilterTooLong: The filter is too long and can not be split
+    """
+    if record_type is not None:
+        with decode_as(record_type):
+            response = paginate(endpoint_method, *args, deadline=deadline, **kwargs)
+        # Clients that decode responses in their own threads return dicts
+        response["results"] = [
+            record if isinstance(record, Record) else record_type(record)
+            for record in response["results"]
+        ]
+        return response
+    if deadline is not None:
+        with Deadline(deadline):
+            return paginate(endpoint_method, *args, **kwargs)
     endpoint_signature = inspect.signature(endpoint_method)
     if "page" not in endpoint_signature.parameters:
         raise ValueError("Endpoint does not support pagination.")
     bound_args = endpoint_signature.bind(*args, **kwargs)
     bound_args.apply_defaults()
+    client = getattr(endpoint_method, "__self__", None)
+    limiter = getattr(client, "limiter", None)
+
+    # Filters too long for one request are split and each part is paginated
+    filter = bound_args.arguments.get("filter")
+    max_length = getattr(client, "max_filter_length", MAX_FILTER_LENGTH)
+    if filter is not None and encoded_length(filter) > max_length:
+
+        @carry_record_type
+        def paginate_part(part):
+            arguments = dict(bound_args.arguments, filter=str(part))
+            return paginate(endpoint_method, **arguments)
+
+        parts = concurrent_map(paginate_part, split(filter, max_length), limiter)
+        return merge_results(parts, bound_args.arguments.get("sort"))
+
     if not bound_args.arguments["page"]:
         bound_args.arguments["page"] = 0
     if not bound_args.arguments["page_size"]:
@@ -207,6 +331,20 @@ def paginate(endpoint_method, *args, **kwargs):
     if results["totalCount"] == 0:
         return results
 
+    if limiter:
+        page_size = bound_args.arguments["page_size"]
+        last_page = ceil(results["totalCount"] / page_size) - 1
+
+        @carry_record_type
+        def get_page(page):
+            arguments = dict(bound_args.arguments, page=page)
+            return endpoint_method(**arguments)["results"]
+
+        pages = range(original_page + 1, last_page + 1)
+        for page_results in concurrent_map(get_page, pages, limiter):
+            results["results"].extend(page_results)
+        return results
+
     # Paginate through the remaining pages
     while len(results["results"]) < (
         results["totalCount"] - (original_page * bound_args.arguments["page_size"])
@@ -218,6 +356,94 @@ def paginate(endpoint_method, *args, **kwargs):
     return results
 
 
+def iter_pages(
+    endpoint_method: Callable, page_size: int = 100, concurrency: int = 8, **kwargs
+) -> Iterator[list]:
+    """
+    Yields the results of each page of a paginated endpoint as it arrives,
+    requesting up to concurrency pages at once within the client's
+    concurrency limit, so the whole result set is never held at once
+
+    :param endpoint_method:
+        Authenticated endpoint method e.g. pro.get_computer_inventories
+    :param page_size: Records per request
+    :param concurrency: Pages requested at once
+    :param kwargs: Keyword arguments to pass to the endpoint method
+
+    :returns: Iterator of the results of each page in order
+    """
+    first = endpoint_method(page=0, page_size=page_size, **kwargs)
+    yield first["results"]
+    last_page = ceil(first["totalCount"] / page_size) - 1
+    limiter = getattr(getattr(endpoint_method, "__self__", None), "limiter", None)
+
+    def get_page(page):
+        return endpoint_method(page=page, page_size=page_size, **kwargs)["results"]
+
+    for start in range(1, last_page + 1, concurrency):
+        pages = range(start, min(start + concurrency, last_page + 1))
+        yield from concurrent_map(get_page, pages, limiter)
+
+
+def merge_results(responses: list, sort: Union[str, list] = None) -> dict:
+    """
+    Merges the results of requests for the parts of a split filter into one
+    response, dropping records that more than one part returned and sorting
+    them again when sort criteria are given
+
+    :param responses: Responses with totalCount and results
+    :param sort: Sort criteria the parts were requested with e.g. ["id:asc"]
+
+    :returns: Response with the merged results and their count
+    """
+    results = []
+    seen = set()
+    for response in responses:
+        for record in response["results"]:
+            key = next((record[key] for key in RECORD_ID_KEYS if key in record), None)
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            results.append(record)
+    sort_records(results, sort)
+    return {"totalCount": len(results), "results": results}
+
+
+def sort_records(records: list, sort: Union[str, list] = None, getter=field_getter):
+    """
+    Sorts records in place by sort criteria in the format of the Pro API.
+    Missing values sort last, strings case insensitively and numeric ids by
+    number.
+
+    :param records: Decoded records
+    :param sort: Sort criteria e.g. ["general.name:asc", "id:desc"]
+    :param getter:
+        Function that returns a function looking up fields in a record,
+        default is rsql.field_getter
+    """
+    if isinstance(sort, str):
+        sort = sort.split(",")
+    for criterion in reversed(sort or []):
+        field, _, direction = criterion.partition(":")
+        records.sort(
+            key=lambda record: _sort_key(getter(record)(field)),
+            reverse=direction.lower() == "desc",
+        )
+
+
+def _sort_key(value) -> tuple:
+    # Sorts missing values last, strings case insensitively and numeric
+    # identifiers by number
+    if value is None:
+        return (2, "")
+    if isinstance(value, str):
+        if value.isdigit():
+            return (0, int(value))
+        return (1, value.casefold())
+    return (0, value)
+
+
 class NoIdentification(Exception):
     """
     Used if an endpoint is used without at least one form of identification
@@ -0,0 +1,52 @@
+import pytest
+from requests.auth import AuthBase
+
+from jps_api_wrapper import request_builder
+from jps_api_wrapper.pro import Pro
+
+MOCK_AUTH_STRING = "This is a MockAuth"
+EXAMPLE_JSS = "https://jss.example.com"
+
+
+class MockAuth(AuthBase):
+    """
+    Stands in for JamfAuth so clients can be built without requesting a
+    token from the JPS server
+    """
+
+    def __init__(
+        self, base_url=EXAMPLE_JSS, username=None, password=None, client=False
+    ):
+        self.base_url = base_url
+        self.refreshed = False
+        self.invalidated = False
+
+    def __call__(self, r):
+        r.headers["Authorization"] = MOCK_AUTH_STRING
+        return r
+
+    def refresh_auth_if_needed(self):
+        self.refreshed = True
+        return True
+
+    def invalidate(self):
+        self.invalidated = True
+
+
+def jps_url(endpoint):
+    return EXAMPLE_JSS + endpoint
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    """
+    Returns a factory that builds clients through their real __init__ with
+    MockAuth in place of JamfAuth. Keyword arguments are passed to the client
+    e.g. make_client(limiter=AdaptiveLimiter(max_limit=4)).
+    """
+    monkeypatch.setattr(request_builder, "JamfAuth", MockAuth)
+
+    def make(client_class=Pro, base_url=EXAMPLE_JSS, **options):
+        return client_class(base_url, "username", "password", **options)
+
+    return make
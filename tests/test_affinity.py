@@ -0,0 +1,117 @@
+import pytest
+import responses
+
+from jps_api_wrapper.affinity import SPREAD, NodeAffinity
+
+from conftest import jps_url
+
+
+def add_node_responses(method: str, endpoint: str, nodes: list):
+    for node in nodes:
+        responses.add(
+            method,
+            jps_url(endpoint),
+            json={},
+            headers={"Set-Cookie": f"APBALANCEID={node}; Path=/"},
+        )
+
+
+def sent_cookies() -> list:
+    return [call.request.headers.get("Cookie") for call in responses.calls]
+
+
+def test_affinity_invalid_mode():
+    """
+    Ensures that NodeAffinity raises ValueError for an unknown mode
+    """
+    with pytest.raises(ValueError):
+        NodeAffinity(mode="random")
+
+
+@responses.activate
+def test_sticky_pins_first_node(make_client):
+    """
+    Ensures that sticky mode sends every request to the node of the first
+    response
+    """
+    pro = make_client(affinity=NodeAffinity())
+    add_node_responses("GET", "/api/v1/buildings/1", ["node1", "node1", "node1"])
+    for _ in range(3):
+        pro.get_building(1)
+    assert sent_cookies() == [None, "APBALANCEID=node1", "APBALANCEID=node1"]
+    assert pro.affinity.nodes == ["node1"]
+    assert "APBALANCEID" not in pro.session.cookies
+
+
+@responses.activate
+def test_sticky_repins_replaced_node(make_client):
+    """
+    Ensures that sticky mode pins to the new node when the load balancer
+    answers a pinned request from another node
+    """
+    pro = make_client(affinity=NodeAffinity())
+    add_node_responses(
+        "GET", "/api/v1/buildings/1", ["node1", "node1", "node2", "node2"]
+    )
+    for _ in range(4):
+        pro.get_building(1)
+    assert sent_cookies() == [
+        None,
+        "APBALANCEID=node1",
+        "APBALANCEID=node1",
+        "APBALANCEID=node2",
+    ]
+    assert pro.affinity.nodes == ["node2"]
+
+
+@responses.activate
+def test_spread_rotates_gets(make_client):
+    """
+    Ensures that spread mode discovers nodes and then rotates GET requests
+    across them
+    """
+    affinity = NodeAffinity(mode=SPREAD, discovery_requests=2, write_settle=0)
+    pro = make_client(affinity=affinity)
+    add_node_responses("GET", "/api/v1/buildings/1", ["node1", "node2"] * 3)
+    for _ in range(5):
+        pro.get_building(1)
+    assert sent_cookies() == [
+        None,
+        None,
+        "APBALANCEID=node1",
+        "APBALANCEID=node2",
+        "APBALANCEID=node1",
+    ]
+
+
+@responses.activate
+def test_spread_pins_reads_after_write(make_client):
+    """
+    Ensures that spread mode sends writes and the reads that follow them to
+    the first node
+    """
+    affinity = NodeAffinity(mode=SPREAD, discovery_requests=2, write_settle=60)
+    pro = make_client(affinity=affinity)
+    add_node_responses("GET", "/api/v1/buildings/1", ["node1", "node2"] * 2)
+    add_node_responses("PUT", "/api/v1/buildings/1", ["node1"])
+    pro.get_building(1)
+    pro.get_building(1)
+    pro.update_building({}, 1)
+    pro.get_building(1)
+    pro.get_building(1)
+    assert sent_cookies()[2:] == ["APBALANCEID=node1"] * 3
+
+
+@responses.activate
+def test_spread_drops_replaced_node(make_client):
+    """
+    Ensures that spread mode stops rotating to a node once the load balancer
+    answers its cookie from another node
+    """
+    affinity = NodeAffinity(mode=SPREAD, discovery_requests=2, write_settle=0)
+    pro = make_client(affinity=affinity)
+    add_node_responses("GET", "/api/v1/buildings/1", ["node1", "node2", "node2"])
+    for _ in range(3):
+        pro.get_building(1)
+    assert sent_cookies()[2] == "APBALANCEID=node1"
+    assert affinity.nodes == ["node2"]
@@ -0,0 +1,131 @@
+import responses
+from responses import matchers
+
+from jps_api_wrapper.caching import ConditionalCache
+from jps_api_wrapper.classic import Classic
+from jps_api_wrapper.metrics import RequestMetrics
+
+from conftest import jps_url
+
+SCRIPTS = {"totalCount": 1, "results": [{"id": "1", "name": "Install"}]}
+POLICIES = "<policies><size>1</size></policies>"
+LAST_MODIFIED = "Sat, 01 Jun 2024 00:00:00 GMT"
+
+
+@responses.activate
+def test_conditional_cache_etag(make_client):
+    """
+    Ensures that cached responses are revalidated with If-None-Match and
+    that a 304 response is answered with the cached body and counted
+    """
+    responses.add(
+        responses.GET, jps_url("/api/v1/scripts"), json=SCRIPTS, headers={"ETag": '"1"'}
+    )
+    responses.add(
+        responses.GET,
+        jps_url("/api/v1/scripts"),
+        status=304,
+        match=[matchers.header_matcher({"If-None-Match": '"1"'})],
+    )
+    cache = ConditionalCache()
+    metrics = RequestMetrics()
+    pro = make_client(cache=cache, metrics=metrics)
+    assert pro.get_scripts() == SCRIPTS
+    assert pro.get_scripts() == SCRIPTS
+    stats = cache.stats()
+    assert stats["requests"] == 2
+    assert stats["hits"] == 1
+    assert stats["bytes_saved"] == len(responses.calls[0].response.content)
+    assert stats["entries"] == 1
+    scripts = metrics.stats()["GET /api/v1/scripts"]
+    assert scripts["cache_hits"] == 1
+    assert scripts["status_codes"] == {200: 1, 304: 1}
+
+
+@responses.activate
+def test_conditional_cache_last_modified(make_client):
+    """
+    Ensures that XML responses are revalidated with If-Modified-Since and
+    that a changed resource replaces the cached one
+    """
+    url = jps_url("/JSSResource/policies")
+    responses.add(
+        responses.GET,
+        url,
+        body=POLICIES,
+        content_type="application/xml",
+        headers={"Last-Modified": LAST_MODIFIED},
+    )
+    responses.add(
+        responses.GET,
+        url,
+        body="<policies><size>2</size></policies>",
+        content_type="application/xml",
+        headers={"ETag": '"2"'},
+        match=[matchers.header_matcher({"If-Modified-Since": LAST_MODIFIED})],
+    )
+    responses.add(
+        responses.GET,
+        url,
+        status=304,
+        match=[matchers.header_matcher({"If-None-Match": '"2"'})],
+    )
+    cache = ConditionalCache()
+    classic = make_client(Classic, cache=cache)
+    assert classic.get_policies(data_type="xml") == POLICIES
+    assert (
+        classic.get_policies(data_type="xml") == "<policies><size>2</size></policies>"
+    )
+    assert (
+        classic.get_policies(data_type="xml") == "<policies><size>2</size></policies>"
+    )
+    assert cache.stats()["hits"] == 1
+
+
+@responses.activate
+def test_conditional_cache_skips(make_client):
+    """
+    Ensures that responses without validators and endpoints outside the
+    cached prefixes are not cached or revalidated
+    """
+    responses.add(responses.GET, jps_url("/api/v1/packages"), json={"totalCount": 0})
+    responses.add(
+        responses.GET, jps_url("/api/v1/buildings"), json={}, headers={"ETag": '"1"'}
+    )
+    cache = ConditionalCache()
+    pro = make_client(cache=cache)
+    for _ in range(2):
+        pro.get_packages()
+        pro.get_buildings()
+    for call in responses.calls:
+        assert "If-None-Match" not in call.request.headers
+    assert cache.stats() == {"requests": 2, "hits": 0, "bytes_saved": 0, "entries": 0}
+
+
+@responses.activate
+def test_conditional_cache_keys_and_eviction(make_client):
+    """
+    Ensures that requests with different parameters are cached separately
+    and that the least recently used response is dropped
+    """
+    for page in range(3):
+        responses.add(
+            responses.GET,
+            jps_url("/api/v1/scripts"),
+            json={"page": page},
+            headers={"ETag": f'"{page}"'},
+            match=[
+                matchers.query_param_matcher({"page": str(page)}, strict_match=False)
+            ],
+        )
+    cache = ConditionalCache(max_entries=2)
+    pro = make_client(cache=cache)
+    for page in range(3):
+        assert pro.get_scripts(page=page) == {"page": page}
+    assert cache.stats()["entries"] == 2
+    pro.get_scripts(page=0)
+    assert "If-None-Match" not in responses.calls[-1].request.headers
+    pro.get_scripts(page=2)
+    assert responses.calls[-1].request.headers["If-None-Match"] == '"2"'
+    cache.clear()
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,179 @@
+import gzip
+import time
+
+import pytest
+import requests
+import responses
+
+from jps_api_wrapper.cassette import (
+    SCRUBBED,
+    CassetteMiss,
+    RecordingTransport,
+    ReplayTransport,
+)
+from jps_api_wrapper.classic import Classic
+from jps_api_wrapper.pro import Pro
+
+from conftest import MOCK_AUTH_STRING, jps_url
+
+REPLAY_JSS = "https://replay.example.com"
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    return str(tmp_path / "job.jsonl.gz")
+
+
+@responses.activate
+def test_cassette_record_and_replay(cassette, make_client):
+    """
+    Ensures that recorded responses are replayed offline for the same
+    requests on any host without requesting a token
+    """
+    responses.add(
+        responses.GET, jps_url("/api/v1/buildings/1"), json={"id": "1", "name": "A"}
+    )
+    responses.add(
+        responses.POST, jps_url("/api/v1/buildings"), json={"id": "2"}, status=201
+    )
+    with make_client(transport=RecordingTransport(cassette)) as pro:
+        assert pro.get_building(1) == {"id": "1", "name": "A"}
+        assert pro.create_building({"name": "B"}) == {"id": "2"}
+
+    with Pro(
+        REPLAY_JSS, "username", "password", transport=ReplayTransport(cassette, 0)
+    ) as pro:
+        assert pro.get_building(1) == {"id": "1", "name": "A"}
+        assert pro.create_building({"name": "B"}) == {"id": "2"}
+        with pytest.raises(CassetteMiss):
+            pro.create_building({"name": "C"})
+        with pytest.raises(CassetteMiss):
+            pro.get_building(2)
+
+
+@responses.activate
+def test_cassette_scrubs_secrets(cassette, make_client):
+    """
+    Ensures that credentials, cookies and secret values in JSON and XML
+    bodies are not written to the cassette
+    """
+    responses.add(
+        responses.GET,
+        jps_url("/api/v1/api-integrations/1"),
+        json={"id": "1", "clientSecret": "hunter2", "settings": [{"password": "pw"}]},
+        headers={"Set-Cookie": "APBALANCEID=aws.node1"},
+    )
+    responses.add(
+        responses.GET,
+        jps_url("/JSSResource/ldapservers/id/1"),
+        body="<ldap_server><id>1</id><password_sha>abc</password_sha></ldap_server>",
+        content_type="application/xml",
+    )
+    with make_client(transport=RecordingTransport(cassette)) as pro:
+        pro._get("/api/v1/api-integrations/1")
+    with make_client(Classic, transport=RecordingTransport(cassette + "2")) as classic:
+        classic._get("/JSSResource/ldapservers/id/1", data_type="xml")
+
+    recorded = gzip.open(cassette, "rt").read() + gzip.open(cassette + "2", "rt").read()
+    for secret in ("hunter2", '"pw"', "abc", "APBALANCEID", MOCK_AUTH_STRING):
+        assert secret not in recorded
+    replay = ReplayTransport(cassette, 0)
+    response = replay.request("GET", REPLAY_JSS + "/api/v1/api-integrations/1")
+    assert response.json() == {
+        "id": "1",
+        "clientSecret": SCRUBBED,
+        "settings": [{"password": SCRUBBED}],
+    }
+
+
+@responses.activate
+def test_cassette_replays_in_order(cassette):
+    """
+    Ensures that repeated requests get the recorded responses in order and
+    start over once they run out
+    """
+    for count in range(3):
+        responses.add(
+            responses.GET, jps_url("/api/v1/jamf-pro-version"), json={"count": count}
+        )
+    recorder = RecordingTransport(cassette)
+    recorder.bind(requests.Session())
+    for _ in range(3):
+        recorder.request("GET", jps_url("/api/v1/jamf-pro-version"))
+    recorder.close()
+
+    replay = ReplayTransport(cassette, 0)
+    counts = [
+        replay.request("GET", jps_url("/api/v1/jamf-pro-version")).json()["count"]
+        for _ in range(4)
+    ]
+    assert counts == [0, 1, 2, 0]
+
+
+@responses.activate
+def test_cassette_latency_scale(cassette):
+    """
+    Ensures that replays take the recorded latency times latency_scale
+    """
+
+    def slow(request):
+        time.sleep(0.05)
+        return 200, {}, b"{}"
+
+    responses.add_callback(responses.GET, jps_url("/api/v1/buildings"), slow)
+    recorder = RecordingTransport(cassette)
+    recorder.bind(requests.Session())
+    recorder.request("GET", jps_url("/api/v1/buildings"), params={"page": 0})
+    recorder.close()
+
+    for scale, low, high in ((1, 0.05, 1), (0.5, 0.025, 1), (0, 0, 0.025)):
+        replay = ReplayTransport(cassette, scale)
+        start = time.perf_counter()
+        replay.request("GET", REPLAY_JSS + "/api/v1/buildings", params={"page": 0})
+        assert low <= time.perf_counter() - start < high
+
+
+@responses.activate
+def test_cassette_errors_and_binary_bodies(cassette):
+    """
+    Ensures that timeouts, connection errors and binary bodies are recorded
+    and replayed
+    """
+    responses.add(
+        responses.GET, jps_url("/api/v1/buildings/1"), body=requests.ReadTimeout()
+    )
+    responses.add(
+        responses.GET, jps_url("/api/v1/buildings/2"), body=requests.ConnectionError()
+    )
+    responses.add(
+        responses.GET,
+        jps_url("/api/v1/branding-images/download/1"),
+        body=b"\x89PNG\xff\x00",
+        content_type="image/png",
+    )
+    recorder = RecordingTransport(cassette)
+    recorder.bind(requests.Session())
+    for number in (1, 2):
+        with pytest.raises(requests.RequestException):
+            recorder.request("GET", jps_url(f"/api/v1/buildings/{number}"))
+    recorder.request("GET", jps_url("/api/v1/branding-images/download/1"))
+    recorder.close()
+
+    replay = ReplayTransport(cassette, 0)
+    with pytest.raises(requests.Timeout):
+        replay.request("GET", jps_url("/api/v1/buildings/1"))
+    with pytest.raises(requests.ConnectionError):
+        replay.request("GET", jps_url("/api/v1/buildings/2"))
+    response = replay.request("GET", jps_url("/api/v1/branding-images/download/1"))
+    assert response.content == b"\x89PNG\xff\x00"
+    assert response.headers["content-type"] == "image/png"
+
+
+def test_cassette_version(cassette):
+    """
+    Ensures that files that are not cassettes of this version are refused
+    """
+    with gzip.open(cassette, "wt") as f:
+        f.write('{"version": 0}\n')
+    with pytest.raises(ValueError):
+        ReplayTransport(cassette)
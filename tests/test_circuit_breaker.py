@@ -0,0 +1,127 @@
+from unittest import mock
+
+import pytest
+import requests
+import responses
+
+from jps_api_wrapper.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpen,
+)
+
+from conftest import jps_url
+
+STARTUP_COMPLETE = {"step": "SERVER_INIT_COMPLETE", "percentage": 100}
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+
+
+@pytest.fixture
+def pro(breaker, make_client):
+    return make_client(circuit_breakers={"/api": breaker})
+
+
+def test_circuit_breaker_invalid_threshold():
+    """
+    Ensures that CircuitBreaker raises ValueError when failure_threshold is
+    less than 1
+    """
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_threshold=0)
+
+
+def test_circuit_breaker_opens_after_threshold(breaker):
+    """
+    Ensures that the breaker only opens after failure_threshold consecutive
+    failures
+    """
+    breaker.record(False)
+    breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == CLOSED
+    breaker.record(False)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_request(lambda: True)
+
+
+def test_circuit_breaker_half_open_probe_closes(breaker):
+    """
+    Ensures that the breaker probes the server after recovery_timeout and
+    closes if the probe passes
+    """
+    breaker.record(False)
+    breaker.record(False)
+    with mock.patch("jps_api_wrapper.circuit_breaker.monotonic", return_value=1e9):
+        breaker.before_request(lambda: breaker.state == HALF_OPEN)
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+
+def test_circuit_breaker_half_open_probe_reopens(breaker):
+    """
+    Ensures that the breaker reopens if the probe fails
+    """
+    breaker.record(False)
+    breaker.record(False)
+    with mock.patch("jps_api_wrapper.circuit_breaker.monotonic", return_value=1e9):
+        with pytest.raises(CircuitOpen):
+            breaker.before_request(lambda: False)
+    assert breaker.state == OPEN
+
+
+@responses.activate
+def test_request_fails_fast_when_open(pro, breaker):
+    """
+    Ensures that requests under a guarded prefix are not sent while the
+    breaker is open and that other prefixes are unaffected
+    """
+    responses.add(responses.GET, jps_url("/api/v1/buildings"), status=503)
+    responses.add(responses.GET, jps_url("/JSSResource/buildings"), json={})
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            pro.get_buildings()
+    with pytest.raises(CircuitOpen):
+        pro.get_buildings()
+    assert len(responses.calls) == 2
+    assert pro._get("/JSSResource/buildings") == {}
+
+
+@responses.activate
+def test_request_probes_health_before_closing(pro, breaker):
+    """
+    Ensures that the startup status and health check endpoints are probed
+    before the breaker lets requests through again
+    """
+    responses.add(responses.GET, jps_url("/api/startup-status"), json=STARTUP_COMPLETE)
+    responses.add(responses.GET, jps_url("/api/v1/health-check"))
+    responses.add(responses.GET, jps_url("/api/v1/buildings"), json={})
+    breaker.record(False)
+    breaker.record(False)
+    with mock.patch("jps_api_wrapper.circuit_breaker.monotonic", return_value=1e9):
+        assert pro.get_buildings() == {}
+    assert [call.request.path_url for call in responses.calls] == [
+        "/api/startup-status",
+        "/api/v1/health-check",
+        "/api/v1/buildings?sort=id%3Aasc",
+    ]
+    assert breaker.state == CLOSED
+
+
+@responses.activate
+def test_probe_health_still_starting(pro):
+    """
+    Ensures that the health probe fails while the server is still starting up
+    """
+    responses.add(
+        responses.GET,
+        jps_url("/api/startup-status"),
+        json={"step": "SPRING_INIT", "percentage": 40},
+    )
+    assert pro._probe_health() is False
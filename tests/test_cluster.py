@@ -0,0 +1,88 @@
+from unittest import mock
+
+import pytest
+import responses
+
+from jps_api_wrapper.cluster import LATENCY, NodePool
+
+NODES = ["https://jss1.example.com", "https://jss2.example.com"]
+
+
+@pytest.fixture
+def nodes():
+    return NodePool(NODES, failure_threshold=2)
+
+
+def test_node_pool_invalid_strategy():
+    """
+    Ensures that NodePool raises ValueError for an unknown strategy
+    """
+    with pytest.raises(ValueError):
+        NodePool(NODES, strategy="round_robin")
+
+
+def test_node_pool_least_outstanding(nodes):
+    """
+    Ensures that reads go to the node with the fewest requests in flight
+    """
+    assert nodes.acquire("GET") == NODES[0]
+    assert nodes.acquire("GET") == NODES[1]
+    nodes.release(NODES[0], 0.1, True)
+    assert nodes.acquire("GET") == NODES[0]
+
+
+def test_node_pool_writes_to_primary(nodes):
+    """
+    Ensures that requests other than GET always go to the primary node
+    """
+    nodes.acquire("GET")
+    assert nodes.acquire("POST") == NODES[0]
+    assert nodes.acquire("DELETE") == NODES[0]
+
+
+def test_node_pool_ejects_failing_node(nodes):
+    """
+    Ensures that a node is left out of rotation after failure_threshold
+    consecutive failures and comes back after ejection_time
+    """
+    for _ in range(2):
+        nodes.release(nodes.acquire("GET"), 0.1, False)
+    assert nodes.healthy() == [NODES[1]]
+    assert nodes.acquire("GET") == NODES[1]
+    assert nodes.acquire("GET") == NODES[1]
+    with mock.patch("jps_api_wrapper.cluster.monotonic", return_value=1e12):
+        assert nodes.healthy() == NODES
+
+
+def test_node_pool_latency_weighted():
+    """
+    Ensures that the latency strategy weights nodes by how fast they answer
+    """
+    nodes = NodePool(NODES, strategy=LATENCY)
+    nodes.release(nodes.acquire("POST"), 1.0, True)
+    nodes.outstanding[NODES[1]] += 1
+    nodes.release(NODES[1], 0.01, True)
+    with mock.patch("jps_api_wrapper.cluster.random.choices") as choices:
+        choices.return_value = [NODES[1]]
+        assert nodes.acquire("GET") == NODES[1]
+    assert choices.call_args[1]["weights"] == [1.0, 100.0]
+
+
+@responses.activate
+def test_request_spreads_reads(nodes, make_client):
+    """
+    Ensures that the client sends reads to every node and writes to the
+    primary node
+    """
+    pro = make_client(base_url=nodes)
+    for node in NODES:
+        responses.add(responses.GET, node + "/api/v1/buildings/1", json={})
+    responses.add(responses.PUT, NODES[0] + "/api/v1/buildings/1", json={})
+    nodes.outstanding[NODES[0]] += 1
+    pro.get_building(1)
+    pro.update_building({}, 1)
+    assert [call.request.url for call in responses.calls] == [
+        NODES[1] + "/api/v1/buildings/1",
+        NODES[0] + "/api/v1/buildings/1",
+    ]
+    assert nodes.outstanding == {NODES[0]: 1, NODES[1]: 0}
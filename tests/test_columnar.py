@@ -0,0 +1,140 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from jps_api_wrapper.columnar import (
+    PLAIN_SAMPLE_ROWS,
+    FleetStore,
+    _DictionaryColumn,
+    _PlainColumn,
+)
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet
+from jps_api_wrapper.pro import Pro, paginate
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockJamfServer(generate_fleet(1200, 150, now=NOW)) as server:
+        yield server
+
+
+@pytest.fixture
+def pro(server):
+    with Pro(server.url, "username", "password") as pro:
+        yield pro
+
+
+@pytest.fixture(scope="module")
+def computers(server):
+    with Pro(server.url, "username", "password") as pro:
+        return paginate(
+            pro.get_computer_inventories,
+            section=["ALL"],
+            sort=["id:asc"],
+            page_size=2000,
+        )["results"]
+
+
+def test_store_round_trip(computers):
+    """
+    Ensures that records read back from the store equal the records that
+    were ingested, and that mostly distinct fields are kept as plain lists
+    """
+    store = FleetStore()
+    assert store.ingest({"totalCount": 1200, "results": computers}) == 1200
+    assert len(store) == 1200
+    assert list(store) == computers
+    columns = store._table.columns
+    assert len(computers) > PLAIN_SAMPLE_ROWS
+    assert isinstance(columns[("general", "lastIpAddress")], _PlainColumn)
+    assert isinstance(columns[("operatingSystem", "version")], _DictionaryColumn)
+    assert isinstance(columns[("hardware", "serialNumber")], _DictionaryColumn)
+    assert store.column("operatingSystem.version") == [
+        record["operatingSystem"]["version"] for record in computers
+    ]
+    assert store.column("general.missing") == [None] * 1200
+
+
+def test_store_find(computers):
+    """
+    Ensures that records are found by indexed and unindexed fields and that
+    numbers match ids stored as strings
+    """
+    store = FleetStore()
+    store.ingest(computers)
+    record = computers[42]
+    serial = record["hardware"]["serialNumber"]
+    assert store.find("hardware.serialNumber", serial) == [record]
+    assert store.find("udid", record["udid"]) == [record]
+    assert store.get(43) == record
+    assert store.get("9999") is None
+    assert store.find("hardware.serialNumber", "C02UNKNOWN00") == []
+    assert store.find("general.nothing", "value") == []
+    version = record["operatingSystem"]["version"]
+    assert store.find("operatingSystem.version", version) == [
+        computer
+        for computer in computers
+        if computer["operatingSystem"]["version"] == version
+    ]
+
+
+def test_store_replace(computers):
+    """
+    Ensures that ingesting a record with a stored id replaces it and moves
+    it in the indexes, and that fields the new record lacks are dropped
+    """
+    store = FleetStore()
+    store.ingest(computers[:10])
+    renamed = dict(computers[3], general={"name": "renamed"})
+    del renamed["applications"]
+    store.ingest([renamed, computers[10]])
+    assert len(store) == 11
+    assert store.get("4") == renamed
+    assert store.find("general.name", "renamed") == [renamed]
+    assert store.find("general.name", computers[3]["general"]["name"]) == []
+    assert list(store)[4:] == computers[4:11]
+
+
+def test_store_mixed_records():
+    """
+    Ensures that records with differing fields, empty objects and lists of
+    values are stored and read back unchanged
+    """
+    records = [
+        {"id": "1", "general": {"name": "a"}, "groups": [{"id": 1}, {"id": 2}]},
+        {"id": "2", "general": {}, "tags": ["x", 1, None], "groups": []},
+        {"id": "3", "extra": [[1, 2], {"a": 1}], "groups": [{"name": "g"}]},
+        {"id": "4", "general": {"name": 5, "flag": True}, "tags": []},
+    ]
+    store = FleetStore()
+    store.ingest(records)
+    assert list(store) == records
+    assert store.find("general.name", 5) == [records[3]]
+    assert store.find("general.flag", True) == [records[3]]
+
+
+def test_store_load_mobile_devices(pro):
+    """
+    Ensures that every page of an endpoint is ingested and mobile devices
+    are indexed by their detail fields
+    """
+    expected = paginate(
+        pro.get_mobile_devices_detail,
+        section=["GENERAL", "HARDWARE"],
+        sort=["mobileDeviceId:asc"],
+        page_size=2000,
+    )["results"]
+    store = FleetStore.for_mobile_devices()
+    count = store.load(
+        pro.get_mobile_devices_detail,
+        page_size=40,
+        section=["GENERAL", "HARDWARE"],
+        sort=["mobileDeviceId:asc"],
+    )
+    assert count == 150
+    assert sorted(store, key=lambda record: int(record["mobileDeviceId"])) == expected
+    device = expected[7]
+    assert store.find("general.udid", device["general"]["udid"]) == [device]
+    assert store.get(device["mobileDeviceId"]) == device
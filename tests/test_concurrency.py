@@ -0,0 +1,209 @@
+import threading
+import time
+
+import pytest
+import responses
+from responses import matchers
+
+from jps_api_wrapper.concurrency import (
+    AdaptiveLimiter,
+    Deadline,
+    DeadlineExceeded,
+    concurrent_map,
+    current_deadline,
+)
+from jps_api_wrapper.pro import paginate
+from jps_api_wrapper.request_builder import RequestTimedOut
+
+from conftest import jps_url
+
+
+@pytest.fixture
+def pro(make_client):
+    return make_client(limiter=AdaptiveLimiter(max_limit=4))
+
+
+def test_limiter_invalid_limits():
+    """
+    Ensures that AdaptiveLimiter raises ValueError when initial_limit is
+    outside of min_limit and max_limit
+    """
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(initial_limit=8, max_limit=4)
+
+
+def test_limiter_additive_increase():
+    """
+    Ensures that the limit grows by one after a full limit's worth of
+    successful requests
+    """
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=3)
+    for _ in range(6):
+        limiter.acquire()
+        limiter.release(0.01)
+    assert limiter.limit == 3
+
+
+def test_limiter_multiplicative_decrease():
+    """
+    Ensures that an overloaded response halves the limit but never drops it
+    below min_limit
+    """
+    limiter = AdaptiveLimiter(initial_limit=8, min_limit=3)
+    limiter.acquire()
+    limiter.release(0.01, overloaded=True)
+    assert limiter.limit == 4
+    limiter.acquire()
+    limiter.release(0.0, overloaded=True)
+    assert limiter.limit == 3
+
+
+def test_limiter_ignores_requests_started_before_cut():
+    """
+    Ensures that overloaded requests that were sent before the limit was cut
+    do not cut it again
+    """
+    limiter = AdaptiveLimiter(initial_limit=8)
+    limiter.acquire()
+    limiter.acquire()
+    limiter.release(0.0, overloaded=True)
+    limiter.release(10.0, overloaded=True)
+    assert limiter.limit == 4
+
+
+def test_limiter_latency_decrease():
+    """
+    Ensures that the limit is cut when the p95 latency rises past the
+    tolerated ratio of the baseline
+    """
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(0.01)
+    assert limiter.baseline == 0.01
+    limiter.acquire()
+    limiter.release(1.0)
+    assert limiter.limit == 8
+    limiter.acquire()
+    limiter.release(1.0)
+    assert limiter.limit == 4
+
+
+def test_limiter_acquire_blocks_at_limit():
+    """
+    Ensures that acquire waits for a slot to be released once the limit is
+    reached
+    """
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def acquire():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release(0.01)
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_concurrent_map_keeps_order():
+    """
+    Ensures that concurrent_map returns results in the order of the items
+    """
+    assert concurrent_map(lambda x: x * 2, range(10), AdaptiveLimiter()) == list(
+        range(0, 20, 2)
+    )
+
+
+@responses.activate
+def test_request_reports_overload(pro):
+    """
+    Ensures that a 502 response cuts the client's concurrency limit
+    """
+    responses.add(responses.GET, jps_url("/api/v1/buildings"), status=502)
+    with pytest.raises(RequestTimedOut):
+        pro.get_buildings()
+    assert pro.limiter.limit == 2
+    assert pro.limiter.in_flight == 0
+
+
+@responses.activate
+def test_paginate_concurrent(pro):
+    """
+    Ensures that paginate requests the remaining pages concurrently and
+    returns the results in page order
+    """
+    for page in range(4):
+        responses.add(
+            responses.GET,
+            jps_url("/api/v1/buildings"),
+            json={"totalCount": 7, "results": [page * 2, page * 2 + 1][: 7 - page * 2]},
+            match=[
+                matchers.query_param_matcher(
+                    {"page": str(page), "page-size": "2", "sort": "id:asc"}
+                )
+            ],
+        )
+    result = paginate(pro.get_buildings, page_size=2)
+    assert result == {"totalCount": 7, "results": list(range(7))}
+
+
+def test_deadline_nesting():
+    """
+    Ensures that the innermost deadline is active and the previous one is
+    restored on exit
+    """
+    outer = Deadline(10)
+    inner = Deadline(5)
+    with outer:
+        with inner:
+            assert current_deadline() is inner
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_concurrent_map_deadline_exceeded():
+    """
+    Ensures that concurrent_map raises DeadlineExceeded and cancels the calls
+    that have not started once the deadline expires
+    """
+    started = []
+
+    def slow(item):
+        started.append(item)
+        time.sleep(0.2)
+        return item
+
+    with pytest.raises(DeadlineExceeded):
+        concurrent_map(
+            slow,
+            range(10),
+            AdaptiveLimiter(initial_limit=2, max_limit=2),
+            Deadline(0.1),
+        )
+    assert len(started) == 2
+
+
+def test_concurrent_map_deadline_in_workers():
+    """
+    Ensures that the deadline is active in the worker threads
+    """
+    deadline = Deadline(10)
+    assert concurrent_map(lambda _: current_deadline(), [1], None, deadline) == [
+        deadline
+    ]
+
+
+@responses.activate
+def test_paginate_deadline(pro):
+    """
+    Ensures that paginate raises DeadlineExceeded without sending requests
+    once its deadline has expired
+    """
+    with pytest.raises(DeadlineExceeded):
+        paginate(pro.get_buildings, deadline=0)
+    assert len(responses.calls) == 0
@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+import requests
+import responses
+
+from jps_api_wrapper.hedging import HedgePolicy
+
+from conftest import jps_url
+
+ENDPOINT = "/api/v1/buildings/{id}"
+
+
+def fake_response(status_code: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
+def warm_policy(**kwargs) -> HedgePolicy:
+    policy = HedgePolicy(min_samples=5, **kwargs)
+    for _ in range(5):
+        policy.record(ENDPOINT, 0.01)
+    return policy
+
+
+def slow_first_send(first_status: int = 200):
+    calls = []
+    lock = threading.Lock()
+
+    def send():
+        with lock:
+            calls.append(len(calls))
+            call = calls[-1]
+        if call == 0:
+            time.sleep(0.3)
+            return fake_response(first_status)
+        return fake_response(201)
+
+    return send, calls
+
+
+def test_hedge_policy_invalid_percentile():
+    """
+    Ensures that HedgePolicy raises ValueError when percentile is not between
+    0 and 1
+    """
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=95)
+
+
+def test_hedge_delay_needs_samples():
+    """
+    Ensures that an endpoint is not hedged until it has min_samples latency
+    samples and then waits for the configured percentile
+    """
+    policy = HedgePolicy(percentile=0.5, min_samples=3)
+    policy.record(ENDPOINT, 0.1)
+    policy.record(ENDPOINT, 0.3)
+    assert policy.hedge_delay(ENDPOINT) is None
+    policy.record(ENDPOINT, 0.2)
+    assert policy.hedge_delay(ENDPOINT) == 0.2
+    assert policy.hedge_delay("/api/v1/departments") is None
+
+
+def test_hedge_send_uses_first_response():
+    """
+    Ensures that a slow request is hedged and the faster duplicate's response
+    is returned
+    """
+    policy = warm_policy(max_extra_load=1)
+    send, calls = slow_first_send()
+    assert policy.send(ENDPOINT, send).status_code == 201
+    assert len(calls) == 2
+    assert policy.hedges == 1
+
+
+def test_hedge_send_respects_load_budget():
+    """
+    Ensures that no duplicate is sent once hedging would add more than
+    max_extra_load of the requests
+    """
+    policy = warm_policy(max_extra_load=0.5)
+    send, calls = slow_first_send()
+    assert policy.send(ENDPOINT, send).status_code == 200
+    assert len(calls) == 1
+    assert policy.hedges == 0
+
+
+def test_hedge_send_skips_server_errors():
+    """
+    Ensures that a 5xx response is not used while the other attempt is still
+    pending
+    """
+    policy = warm_policy(max_extra_load=1)
+    calls = []
+
+    def send():
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.05)
+            return fake_response(502)
+        time.sleep(0.2)
+        return fake_response(200)
+
+    assert policy.send(ENDPOINT, send).status_code == 200
+
+
+@responses.activate
+def test_get_hedged(make_client):
+    """
+    Ensures that _get hedges GET requests and returns the first response
+    """
+    pro = make_client(hedging=warm_policy(max_extra_load=1))
+    calls = []
+
+    def callback(request):
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.3)
+        return (200, {}, f'{{"call": {len(calls)}}}')
+
+    responses.add_callback(responses.GET, jps_url("/api/v1/buildings/1"), callback)
+    assert pro.get_building(1) == {"call": 2}
+
+
+@responses.activate
+def test_post_not_hedged(make_client):
+    """
+    Ensures that requests other than GET are never hedged
+    """
+    policy = warm_policy(max_extra_load=1)
+    pro = make_client(hedging=policy)
+    responses.add(responses.POST, jps_url("/api/v1/buildings"), json={})
+    pro.create_building({})
+    assert policy.requests == 0
@@ -0,0 +1,170 @@
+import threading
+from http.server import BaseHTTPRequestHandler
+from unittest import mock
+
+import pytest
+import requests
+import responses
+
+from jps_api_wrapper.concurrency import AdaptiveLimiter
+from jps_api_wrapper.hooks import RequestEvent, RequestHooks
+from jps_api_wrapper.mock_server import ThreadingHTTPServer
+
+from conftest import EXAMPLE_JSS, jps_url
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+def recording_hooks():
+    hooks = RequestHooks()
+    events = []
+    for name in ("before_request", "after_response", "on_error", "on_parse"):
+        hooks.register(name, events.append)
+    return hooks, events
+
+
+def test_hooks_unknown_event():
+    """
+    Ensures that registering a callback for an unknown event raises
+    ValueError
+    """
+    with pytest.raises(ValueError):
+        RequestHooks().register("on_everything", print)
+
+
+def test_hooks_unregister():
+    """
+    Ensures that unregistered callbacks are no longer called
+    """
+    hooks = RequestHooks()
+    events = []
+    hooks.register("before_request", events.append)
+    hooks.unregister("before_request", events.append)
+    assert not hooks.wants("before_request")
+    hooks.emit(RequestEvent("before_request", "GET", EXAMPLE_JSS))
+    assert events == []
+
+
+def test_hooks_callback_error_warns():
+    """
+    Ensures that a callback that raises is reported with a warning and the
+    remaining callbacks are still called
+    """
+    hooks = RequestHooks()
+    events = []
+    hooks.register("before_request", lambda event: 1 / 0)
+    hooks.register("before_request", events.append)
+    with pytest.warns(RuntimeWarning):
+        hooks.emit(RequestEvent("before_request", "GET", EXAMPLE_JSS))
+    assert len(events) == 1
+
+
+@responses.activate
+def test_request_hooks_events(make_client):
+    """
+    Ensures that a request calls before_request, after_response and on_parse
+    with the endpoint template and the timings of each step
+    """
+    responses.add(
+        responses.GET, jps_url("/api/v1/buildings/1"), json={"id": "1"}, status=200
+    )
+    hooks, events = recording_hooks()
+    pro = make_client(hooks=hooks)
+    assert pro._get("/api/v1/buildings/1") == {"id": "1"}
+    assert [event.name for event in events] == [
+        "before_request",
+        "after_response",
+        "on_parse",
+    ]
+    assert all(event.endpoint == "/api/v1/buildings/{id}" for event in events)
+    assert all(event.method == "GET" for event in events)
+    assert events[1].response.status_code == 200
+    assert set(events[1].timings) == {"total", "connect", "tls", "ttfb", "body_read"}
+    assert events[2].timings["decode"] >= 0
+
+
+@responses.activate
+def test_request_hooks_on_error(make_client):
+    """
+    Ensures that on_error receives the exception of a request that failed
+    without a response
+    """
+    responses.add(
+        responses.GET,
+        jps_url("/api/v1/buildings"),
+        body=requests.ConnectionError("refused"),
+    )
+    hooks, events = recording_hooks()
+    pro = make_client(hooks=hooks)
+    with pytest.raises(requests.ConnectionError):
+        pro._get("/api/v1/buildings")
+    assert events[-1].name == "on_error"
+    assert isinstance(events[-1].error, requests.ConnectionError)
+
+
+@responses.activate
+def test_request_hooks_raising_callbacks(make_client):
+    """
+    Ensures that raising callbacks do not fail the request, are not reported
+    as request errors and do not leak the limiter slot
+    """
+    responses.add(responses.GET, jps_url("/api/v1/buildings"), json={}, status=200)
+    hooks = RequestHooks()
+    errors = []
+    hooks.register("before_request", lambda event: 1 / 0)
+    hooks.register("after_response", lambda event: 1 / 0)
+    hooks.register("on_error", errors.append)
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+    pro = make_client(hooks=hooks, limiter=limiter)
+    with pytest.warns(RuntimeWarning):
+        assert pro._get("/api/v1/buildings") == {}
+    assert errors == []
+    assert limiter.in_flight == 0
+
+
+def test_request_hooks_not_built_without_callbacks(make_client):
+    """
+    Ensures that no events are built when no callbacks are registered
+    """
+    hooks = RequestHooks()
+    with mock.patch("jps_api_wrapper.request_builder.RequestEvent") as event:
+        with responses.RequestsMock() as mocked:
+            mocked.add(responses.GET, jps_url("/api/v1/buildings"), json={})
+            make_client(hooks=hooks)._get("/api/v1/buildings")
+    event.assert_not_called()
+
+
+def test_request_hooks_connection_timings(make_client):
+    """
+    Ensures that connect and tls are measured for new connections and are
+    None when a connection is reused
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    hooks = RequestHooks()
+    events = []
+    hooks.register("after_response", events.append)
+    pro = make_client(base_url=f"http://127.0.0.1:{server.server_port}", hooks=hooks)
+    try:
+        pro._get("/api/v1/buildings")
+        pro._get("/api/v1/buildings")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert events[0].timings["connect"] >= 0
+    assert events[0].timings["tls"] == 0.0
+    assert events[0].timings["ttfb"] >= events[0].timings["connect"]
+    assert events[1].timings["connect"] is None
+    assert events[1].timings["tls"] is None
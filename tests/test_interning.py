@@ -0,0 +1,54 @@
+import json
+from datetime import datetime, timezone
+
+from jps_api_wrapper.interning import StringInterner
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet
+from jps_api_wrapper.pro import Pro, paginate
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def test_interner_loads():
+    """
+    Ensures that decoded documents equal the standard decoder's and share
+    their keys and low cardinality values across documents
+    """
+    interner = StringInterner(max_distinct=3, max_length=10)
+    documents = [
+        {"osVersion": "14.4.1", "serial": f"C02{index}", "tags": ["a", 1]}
+        for index in range(5)
+    ]
+    documents.append({"osVersion": "14.4.1", "notes": "x" * 11, "serial": "C020"})
+    decoded = [interner.loads(json.dumps(document)) for document in documents]
+    assert decoded == documents
+    first, last = decoded[0], decoded[-1]
+    assert next(iter(first)) is next(iter(last))
+    assert first["osVersion"] is last["osVersion"]
+    assert first["tags"][0] is decoded[1]["tags"][0]
+    # Values past max_distinct are not interned, values already seen still are
+    assert decoded[4]["serial"] is not interner.loads('{"serial": "C024"}')["serial"]
+    assert last["serial"] is first["serial"]
+    assert len(interner.values["serial"]) == 3
+    assert last["notes"] is not interner.loads(json.dumps(last))["notes"]
+    assert interner.loads(b"[1, 2]") == [1, 2]
+
+
+def test_client_interner():
+    """
+    Ensures that a client with an interner returns the same results and
+    shares repeated strings between records of different pages
+    """
+    with MockJamfServer(generate_fleet(300, now=NOW)) as server:
+        with Pro(server.url, "username", "password") as pro:
+            expected = paginate(
+                pro.get_computer_inventories, section=["ALL"], page_size=100
+            )
+        with Pro(server.url, "username", "password", interner=StringInterner()) as pro:
+            interned = paginate(
+                pro.get_computer_inventories, section=["ALL"], page_size=100
+            )
+    assert interned == expected
+    first, last = interned["results"][0], interned["results"][-1]
+    assert first["hardware"]["make"] is last["hardware"]["make"]
+    assert first["operatingSystem"]["name"] is last["operatingSystem"]["name"]
+    assert [*first["general"]][0] is [*last["general"]][0]
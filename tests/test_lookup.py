@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+import pytest
+
+from jps_api_wrapper.lookup import (
+    UnknownIdentifier,
+    _chunks,
+    lookup_computers,
+    lookup_mobile_devices,
+)
+from jps_api_wrapper.mock_server import (
+    COMPUTER,
+    MOBILE_DEVICE,
+    MockJamfServer,
+    generate_fleet,
+)
+from jps_api_wrapper.pro import Pro
+from jps_api_wrapper.rsql import Comparison
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def server():
+    with MockJamfServer(generate_fleet(500, 200, now=NOW)) as server:
+        yield server
+
+
+@pytest.fixture
+def pro(server):
+    with Pro(server.url, "username", "password") as pro:
+        yield pro
+
+
+def test_lookup_computers(server, pro):
+    """
+    Ensures that many serial numbers are resolved with a few requests and
+    each is mapped to its record, or to nothing when it is unknown
+    """
+    rows = server.fleet.computers[::2]
+    serials = [row[COMPUTER["hardware.serialNumber"]] for row in rows]
+    found = lookup_computers(pro, serials + ["C02UNKNOWN00"], max_filter_length=2000)
+    assert server.requests["GET /api/v1/computers-inventory"] == 2
+    assert found["C02UNKNOWN00"] == []
+    for row, serial in zip(rows, serials):
+        assert [record["id"] for record in found[serial]] == [str(row[0])]
+    assert found[serials[0]][0]["general"]["name"] == rows[0][COMPUTER["general.name"]]
+
+
+def test_lookup_client_filter_length(server):
+    """
+    Ensures that identifiers are packed under the max_filter_length of the
+    client when none is given
+    """
+    serials = [row[COMPUTER["hardware.serialNumber"]] for row in server.fleet.computers]
+    with Pro(server.url, "username", "password", max_filter_length=2000) as pro:
+        found = lookup_computers(pro, serials)
+    assert server.requests["GET /api/v1/computers-inventory"] == 4
+    assert all(len(found[serial]) == 1 for serial in serials)
+
+
+def test_lookup_computers_by_mac(server, pro):
+    """
+    Ensures that identifiers are matched case insensitively, duplicates are
+    sent once and the requested sections are returned
+    """
+    row = server.fleet.computers[10]
+    mac = row[COMPUTER["hardware.macAddress"]]
+    found = lookup_computers(pro, [mac.upper(), mac], by="mac", section=["SECURITY"])
+    assert server.requests["GET /api/v1/computers-inventory"] == 1
+    assert list(found) == [mac.upper(), mac]
+    assert found[mac][0]["id"] == str(row[0])
+    assert found[mac][0]["security"] is not None
+    assert found[mac][0]["hardware"]["macAddress"] == mac
+    with pytest.raises(UnknownIdentifier):
+        lookup_computers(pro, [mac], by="macAddress")
+
+
+def test_lookup_mobile_devices(server, pro):
+    """
+    Ensures that mobile devices are looked up by the detail filter fields
+    and names matching more than one device return all of them
+    """
+    rows = server.fleet.mobile_devices[:3]
+    ids = [str(row[0]) for row in rows]
+    found = lookup_mobile_devices(pro, ids, by="id")
+    assert [found[id][0]["mobileDeviceId"] for id in ids] == ids
+    name = rows[0][MOBILE_DEVICE["displayName"]]
+    duplicate = list(server.fleet.mobile_devices[5])
+    duplicate[MOBILE_DEVICE["displayName"]] = name
+    server.fleet.mobile_devices[5] = tuple(duplicate)
+    server.fleet_changed()
+    found = lookup_mobile_devices(pro, [name], by="name")
+    assert [record["mobileDeviceId"] for record in found[name]] == [ids[0], "6"]
+
+
+def test_lookup_chunks():
+    """
+    Ensures that identifiers are packed into filters that stay under the
+    length limit once URL encoded
+    """
+    values = [f"C02{index:09d}" for index in range(1000)] + ['name with "quotes"']
+    chunks = list(_chunks(values, "hardware.serialNumber", 500))
+    assert [value for chunk in chunks for value in chunk] == values
+    for chunk in chunks:
+        filter = str(Comparison("hardware.serialNumber", "=in=", chunk))
+        assert len(quote(filter, safe="")) <= 500
+    assert len(chunks[0]) == 31
@@ -0,0 +1,135 @@
+import pytest
+import requests
+import responses
+
+from jps_api_wrapper.metrics import RequestMetrics, request_size
+from jps_api_wrapper.transport import TransportResponse
+
+from conftest import EXAMPLE_JSS, jps_url
+
+
+@pytest.fixture
+def metrics():
+    return RequestMetrics(buckets=[0.1, 1.0])
+
+
+def test_metrics_record(metrics):
+    """
+    Ensures that record counts requests, bytes, status codes, errors and
+    latency buckets per method and endpoint
+    """
+    metrics.record("GET", "/api/v1/buildings/{id}", 200, 0.05, 0, 100)
+    metrics.record("GET", "/api/v1/buildings/{id}", 404, 0.5, 0, 20)
+    metrics.record("GET", "/api/v1/buildings/{id}", None, 5.0)
+    metrics.record("POST", "/api/v1/buildings", 201, 0.2, 30, 40)
+    stats = metrics.stats()
+    assert stats["GET /api/v1/buildings/{id}"] == {
+        "requests": 3,
+        "errors": 1,
+        "hedges": 0,
+        "cache_hits": 0,
+        "bytes_out": 0,
+        "bytes_in": 120,
+        "latency_sum": 5.55,
+        "latency_buckets": {0.1: 1, 1.0: 1, float("inf"): 1},
+        "status_codes": {200: 1, 404: 1},
+    }
+    assert stats["POST /api/v1/buildings"]["bytes_out"] == 30
+
+
+def test_metrics_hedges_and_cache_hits(metrics):
+    """
+    Ensures that hedges and cache hits are counted per endpoint
+    """
+    metrics.record_hedge("GET", "/api/v1/scripts")
+    metrics.record_cache_hit("GET", "/api/v1/scripts")
+    metrics.record_cache_hit("GET", "/api/v1/scripts")
+    stats = metrics.stats()["GET /api/v1/scripts"]
+    assert stats["hedges"] == 1
+    assert stats["cache_hits"] == 2
+    assert stats["requests"] == 0
+
+
+def test_metrics_reset(metrics):
+    """
+    Ensures that reset clears the recorded metrics
+    """
+    metrics.record("GET", "/api/v1/scripts", 200, 0.1)
+    metrics.reset()
+    assert metrics.stats() == {}
+
+
+def test_metrics_to_prometheus(metrics):
+    """
+    Ensures that to_prometheus renders counters and a cumulative latency
+    histogram in the Prometheus text format with escaped labels
+    """
+    metrics.record("GET", "/api/v1/buildings/{id}", 200, 0.05, 0, 100)
+    metrics.record("GET", "/api/v1/buildings/{id}", 200, 0.5, 0, 100)
+    metrics.record("GET", '/JSSResource/"odd"', 500, 0.05)
+    text = metrics.to_prometheus()
+    labels = 'method="GET",endpoint="/api/v1/buildings/{id}"'
+    assert "# TYPE jps_api_requests_total counter" in text
+    assert f'jps_api_requests_total{{{labels},status="200"}} 2' in text
+    assert "# TYPE jps_api_request_duration_seconds histogram" in text
+    assert f'jps_api_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'jps_api_request_duration_seconds_bucket{{{labels},le="1.0"}} 2' in text
+    assert f'jps_api_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"jps_api_request_duration_seconds_count{{{labels}}} 2" in text
+    assert f"jps_api_response_bytes_total{{{labels}}} 200" in text
+    assert 'endpoint="/JSSResource/\\"odd\\""' in text
+    assert text.endswith("\n")
+
+
+def test_request_size():
+    """
+    Ensures that request_size reads the size of the body that was sent from
+    the response instead of encoding it again
+    """
+    sent = requests.Request("POST", EXAMPLE_JSS, json={"name": "HQ"}).prepare()
+    response = requests.Response()
+    response.request = sent
+    assert request_size(response) == len('{"name": "HQ"}')
+    response.request = requests.Request("GET", EXAMPLE_JSS).prepare()
+    assert request_size(response) == 0
+    assert request_size(TransportResponse(200, {}, b"", EXAMPLE_JSS, (), 7)) == 7
+
+
+@responses.activate
+def test_client_records_metrics(metrics, make_client):
+    """
+    Ensures that requests sent by a client with metrics are recorded under
+    their endpoint template
+    """
+    responses.add(
+        responses.GET, jps_url("/api/v1/buildings/1"), json={"id": "1"}, status=200
+    )
+    responses.add(
+        responses.GET, jps_url("/api/v1/buildings/2"), json={"id": "2"}, status=200
+    )
+    responses.add(responses.POST, jps_url("/api/v1/buildings"), json={}, status=201)
+    pro = make_client(metrics=metrics)
+    pro._get("/api/v1/buildings/1")
+    pro._get("/api/v1/buildings/2")
+    pro._post("/api/v1/buildings", {"name": "HQ"})
+    stats = metrics.stats()
+    assert stats["GET /api/v1/buildings/{id}"]["requests"] == 2
+    assert stats["GET /api/v1/buildings/{id}"]["status_codes"] == {200: 2}
+    assert stats["GET /api/v1/buildings/{id}"]["bytes_in"] == len('{"id": "1"}') * 2
+    assert stats["POST /api/v1/buildings"]["bytes_out"] == len('{"name": "HQ"}')
+
+
+@responses.activate
+def test_client_records_connection_errors(metrics, make_client):
+    """
+    Ensures that requests that fail without a response are counted as errors
+    """
+    responses.add(
+        responses.GET,
+        jps_url("/api/v1/buildings"),
+        body=requests.ConnectionError("refused"),
+    )
+    pro = make_client(metrics=metrics)
+    with pytest.raises(requests.ConnectionError):
+        pro._get("/api/v1/buildings")
+    assert metrics.stats()["GET /api/v1/buildings"]["errors"] == 1
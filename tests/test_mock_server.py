@@ -0,0 +1,193 @@
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from jps_api_wrapper.classic import Classic
+from jps_api_wrapper.mock_server import COMPUTER, MockJamfServer, generate_fleet
+from jps_api_wrapper.pro import Pro, paginate
+from jps_api_wrapper.request_builder import ClientError, NotFound
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    return generate_fleet(250, 120, now=NOW)
+
+
+@pytest.fixture(scope="module")
+def server(fleet):
+    with MockJamfServer(fleet) as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def pro(server):
+    with Pro(server.url, "username", "password") as pro:
+        yield pro
+
+
+def test_generate_fleet_deterministic():
+    """
+    Ensures that the same seed and time generate the same fleet and that
+    identifiers are unique
+    """
+    fleet = generate_fleet(50, 20, seed=1, now=NOW)
+    assert fleet.computers == generate_fleet(50, 20, seed=1, now=NOW).computers
+    assert fleet.computers != generate_fleet(50, 20, seed=2, now=NOW).computers
+    assert len({row[1] for row in fleet.computers}) == 50
+    assert len(fleet.mobile_devices) == 20
+
+
+def test_mock_server_requires_token(server):
+    """
+    Ensures that requests without a token issued by the server are refused
+    """
+    response = requests.get(server.url + "/api/v1/computers-inventory")
+    assert response.status_code == 401
+
+
+def test_mock_server_computers_inventory(pro, fleet):
+    """
+    Ensures that computers-inventory pages, sorts and returns only the
+    requested sections
+    """
+    page = pro.get_computer_inventories(
+        section=["HARDWARE"], page=1, page_size=10, sort=["id:desc"]
+    )
+    assert page["totalCount"] == 250
+    assert [record["id"] for record in page["results"]] == [
+        str(id) for id in range(240, 230, -1)
+    ]
+    record = page["results"][0]
+    assert record["general"] is None
+    assert (
+        record["hardware"]["serialNumber"]
+        == fleet.computers[239][COMPUTER["hardware.serialNumber"]]
+    )
+    names = paginate(pro.get_computer_inventories, page_size=100)["results"]
+    assert len(names) == 250
+    assert [r["general"]["name"] for r in names] == sorted(
+        r["general"]["name"] for r in names
+    )
+
+
+def test_mock_server_filter(pro):
+    """
+    Ensures that filters are evaluated with RSQL semantics and invalid
+    filters are rejected
+    """
+    page = pro.get_computer_inventories(
+        section=["HARDWARE", "OPERATING_SYSTEM"],
+        page_size=2000,
+        filter='hardware.appleSilicon==false;operatingSystem.version=="14*"',
+    )
+    assert page["totalCount"] == len(page["results"]) > 0
+    for record in page["results"]:
+        assert record["hardware"]["appleSilicon"] is False
+        assert record["operatingSystem"]["version"].startswith("14")
+    with pytest.raises(ClientError):
+        pro.get_computer_inventories(filter="hardware.nothing==1")
+
+
+def test_mock_server_computer_detail(pro):
+    """
+    Ensures that a single computer is returned with all sections and that
+    unknown computers are not found
+    """
+    record = pro.get_computer_inventory_detail(7)
+    assert record["id"] == "7"
+    assert record["applications"]
+    assert record["security"]["firewallEnabled"] in (True, False)
+    with pytest.raises(NotFound):
+        pro.get_computer_inventory(9999)
+
+
+def test_mock_server_mobile_devices(pro):
+    """
+    Ensures that the mobile device list and detail endpoints page, filter
+    and return the requested sections
+    """
+    devices = pro.get_mobile_devices(page_size=5)
+    assert devices["totalCount"] == 120
+    assert [device["id"] for device in devices["results"]] == ["1", "2", "3", "4", "5"]
+    detail = pro.get_mobile_devices_detail(
+        section=["GENERAL", "HARDWARE"], page_size=200, filter="batteryLevel>50"
+    )
+    assert all(r["hardware"]["batteryLevel"] > 50 for r in detail["results"])
+    assert "security" not in detail["results"][0]
+    assert pro.get_mobile_device_detail(3)["mobileDeviceId"] == "3"
+
+
+def test_mock_server_classic(server, fleet):
+    """
+    Ensures that the Classic computer endpoints answer in JSON and XML
+    """
+    with Classic(server.url, "username", "password") as classic:
+        computers = classic.get_computers()["computers"]
+        assert len(computers) == 250
+        serial = fleet.computers[4][COMPUTER["hardware.serialNumber"]]
+        computer = classic.get_computer(serialnumber=serial)["computer"]
+        assert computer["general"]["id"] == 5
+        assert classic.get_computers(data_type="xml").startswith("<?xml")
+        name = fleet.computers[0][COMPUTER["general.name"]]
+        matched = classic.get_computers(match=name[:4] + "*")["computers"]
+        assert all(match["name"].startswith(name[:4]) for match in matched)
+        devices = classic.get_mobile_devices()["mobile_devices"]
+        assert len(devices) == 120
+
+
+def test_mock_server_latency_errors_and_throttle(fleet):
+    """
+    Ensures that latency, injected errors and throttling are applied per
+    endpoint prefix and requests are counted per endpoint template
+    """
+    server = MockJamfServer(
+        fleet,
+        latency={"/api/v1/computers-inventory": 0.05},
+        error_rates={"/api/v2": 1.0},
+        throttle={"/api/v1/computers-inventory": 0},
+    )
+    with server:
+        with Pro(server.url, "username", "password") as pro:
+            with pytest.raises(requests.HTTPError) as error:
+                pro.get_mobile_devices()
+            assert error.value.response.status_code == 500
+            with pytest.raises(requests.HTTPError) as error:
+                pro.get_computer_inventory(1)
+            assert error.value.response.status_code == 429
+            server.throttle = {}
+            response = pro._request("GET", "/api/v1/computers-inventory/1")
+            assert response.elapsed.total_seconds() >= 0.05
+    assert server.requests["GET /api/v1/computers-inventory/{id}"] == 2
+
+
+def test_mock_server_section_costs(fleet):
+    """
+    Ensures that computers-inventory requests take the cost of each
+    requested section per returned record
+    """
+    with MockJamfServer(fleet, section_costs={"HARDWARE": 0.002}) as server:
+        with Pro(server.url, "username", "password") as pro:
+            params = {"section": "HARDWARE", "page-size": 25}
+            response = pro._request("GET", "/api/v1/computers-inventory", params=params)
+            assert response.elapsed.total_seconds() >= 0.05
+            response = pro._request("GET", "/api/v1/computers-inventory")
+            assert response.elapsed.total_seconds() < 0.05
+
+
+def test_mock_server_file_transfers(fleet, tmp_path, monkeypatch):
+    """
+    Ensures that branding images are downloaded with the configured size and
+    multipart uploads are accepted
+    """
+    monkeypatch.setenv("HOME", str(tmp_path))
+    (tmp_path / "Downloads").mkdir()
+    upload = tmp_path / "image.png"
+    upload.write_bytes(b"\x89PNG" * 100)
+    with MockJamfServer(fleet, download_size=4096) as server:
+        with Pro(server.url, "username", "password") as pro:
+            pro.get_branding_image(1)
+            assert pro.create_enrollment_customization_image(str(upload))["url"]
+    assert (tmp_path / "Downloads" / "branding-1.png").stat().st_size == 4096
@@ -0,0 +1,158 @@
+import time
+import tracemalloc
+
+import pytest
+import responses
+
+from jps_api_wrapper.concurrency import concurrent_map
+from jps_api_wrapper.pro import Pro
+from jps_api_wrapper.profiling import ClientProfiler, current_call
+from jps_api_wrapper.request_builder import NotFound
+
+from conftest import jps_url
+
+
+@pytest.fixture
+def profiler():
+    profiler = ClientProfiler(report_at_exit=False)
+    yield profiler
+    profiler.close()
+
+
+@responses.activate
+def test_profiler_methods_and_phases(profiler, make_client):
+    """
+    Ensures that calls of public client methods are recorded with their
+    wall and CPU time, memory and the phases of their requests
+    """
+    responses.add(
+        responses.GET, jps_url("/api/v1/buildings/1"), json={"id": "1"}, status=200
+    )
+    pro = make_client(profiler=profiler)
+    assert pro.get_building(1) == {"id": "1"}
+    assert pro.get_building(1) == {"id": "1"}
+    stats = profiler.stats()
+    assert list(stats) == ["Pro.get_building"]
+    building = stats["Pro.get_building"]
+    assert building["calls"] == 2
+    assert building["wall"] >= building["phases"]["send"]["wall"] > 0
+    assert building["cpu"] > 0
+    assert building["phases"]["wait"]["wall"] >= 0
+    assert building["phases"]["decode"]["cpu"] > 0
+    assert building["peak"] > 0
+
+
+def test_profiler_leaves_class_untouched(profiler, make_client):
+    """
+    Ensures that only the profiled client's methods are wrapped
+    """
+    profiled = make_client(profiler=profiler)
+    assert profiled.get_building.__name__ == "get_building"
+    assert "get_building" in vars(profiled)
+    assert "get_building" not in vars(make_client())
+    assert Pro.get_building is not profiled.get_building
+
+
+@responses.activate
+def test_profiler_outermost_method(profiler, make_client):
+    """
+    Ensures that a client method called by another client method is counted
+    in the outer method only
+    """
+    responses.add(responses.GET, jps_url("/api/v1/buildings/1"), json={})
+    pro = make_client(profiler=profiler)
+
+    def get_building_twice():
+        pro.get_building(1)
+        pro.get_building(1)
+
+    profiler._wrap("Pro.get_building_twice", get_building_twice)()
+    assert list(profiler.stats()) == ["Pro.get_building_twice"]
+
+
+@responses.activate
+def test_profiler_worker_threads(profiler, make_client):
+    """
+    Ensures that requests sent from a thread pool are attributed to the
+    method that started them
+    """
+    responses.add(responses.GET, jps_url("/api/v1/buildings/1"), json={})
+    pro = make_client(profiler=profiler)
+    seen = []
+
+    def fetch(item):
+        seen.append(current_call())
+        return pro._get("/api/v1/buildings/1")
+
+    def fetch_all():
+        return concurrent_map(fetch, range(4), pro.limiter)
+
+    pro.fetch_all = profiler._wrap("Pro.fetch_all", fetch_all)
+    assert pro.fetch_all() == [{}] * 4
+    assert len(set(seen)) == 1 and seen[0] is not None
+    stats = profiler.stats()["Pro.fetch_all"]
+    assert stats["calls"] == 1
+    assert stats["phases"]["send"]["wall"] > 0
+    assert current_call() is None
+
+
+@responses.activate
+def test_profiler_records_failed_calls(profiler, make_client):
+    """
+    Ensures that a method that raises is still recorded
+    """
+    responses.add(responses.GET, jps_url("/api/v1/buildings/1"), status=404)
+    pro = make_client(profiler=profiler)
+    with pytest.raises(NotFound):
+        pro.get_building(1)
+    assert profiler.stats()["Pro.get_building"]["calls"] == 1
+
+
+def test_profiler_report(profiler, tmp_path):
+    """
+    Ensures that the report lists methods by wall time with their CPU share
+    and is written to the profiler's file
+    """
+
+    def busy():
+        end = time.process_time() + 0.02
+        while time.process_time() < end:
+            pass
+
+    profiler._wrap("Pro.fast", lambda: None)()
+    profiler._wrap("Pro.busy", busy)()
+    report = profiler.report().splitlines()
+    assert report[0].split()[:5] == ["method", "calls", "wall", "s", "cpu"]
+    assert report[1].startswith("Pro.busy")
+    assert report[2].startswith("Pro.fast")
+    profiler.file = str(tmp_path / "profile.txt")
+    profiler.dump()
+    assert (tmp_path / "profile.txt").read_text() == profiler.report()
+    profiler.reset()
+    assert profiler.stats() == {}
+
+
+def test_profiler_without_memory(make_client):
+    """
+    Ensures that memory is not traced when trace_memory is False
+    """
+    profiler = ClientProfiler(trace_memory=False, report_at_exit=False)
+    assert not tracemalloc.is_tracing()
+    profiler._wrap("Pro.nothing", lambda: [0] * 1000)()
+    assert profiler.stats()["Pro.nothing"]["allocated"] == 0
+
+
+def test_profiler_close():
+    """
+    Ensures that close stops tracemalloc only if the profiler started it
+    """
+    profiler = ClientProfiler(report_at_exit=False)
+    assert tracemalloc.is_tracing()
+    profiler.close()
+    assert not tracemalloc.is_tracing()
+    tracemalloc.start()
+    try:
+        ClientProfiler(report_at_exit=False).close()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
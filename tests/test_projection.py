@@ -0,0 +1,145 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from jps_api_wrapper.mock_server import COMPUTER, MockJamfServer, generate_fleet
+from jps_api_wrapper.pro import Pro, paginate
+from jps_api_wrapper.projection import (
+    ComputerProjection,
+    SectionFanOut,
+    UnknownField,
+    select_computers,
+)
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def test_projection_sections():
+    """
+    Ensures that the fewest sections holding the fields are requested, in
+    the order of the API
+    """
+    projection = ComputerProjection(
+        ["userAndLocation.email", "hardware.serialNumber", "operatingSystem.version"]
+    )
+    assert projection.section == ["USER_AND_LOCATION", "HARDWARE", "OPERATING_SYSTEM"]
+    assert ComputerProjection(["id", "udid"]).section == ["GENERAL"]
+    assert ComputerProjection(["applications.name"]).section == ["APPLICATIONS"]
+    with pytest.raises(UnknownField):
+        ComputerProjection(["hardwares.serialNumber"])
+
+
+def test_projection_filter_split():
+    """
+    Ensures that conditions on fields the server filters by are sent to it
+    and the others are evaluated locally with the sections they need
+    """
+    projection = ComputerProjection(
+        ["general.name"],
+        "operatingSystem.version==14.*;storage.bootDriveAvailableSpaceMegabytes=lt=1000"
+        ";(hardware.model==MacBook*,general.name==lab*)",
+    )
+    assert projection.server_filter == (
+        "operatingSystem.version==14.*;(hardware.model==MacBook*,general.name==lab*)"
+    )
+    local = str(projection.local_filter)
+    assert local == "storage.bootDriveAvailableSpaceMegabytes=lt=1000"
+    assert projection.section == ["GENERAL", "STORAGE"]
+    assert projection.matches({"storage": {"bootDriveAvailableSpaceMegabytes": 500}})
+    assert not projection.matches(
+        {"storage": {"bootDriveAvailableSpaceMegabytes": 5e3}}
+    )
+    assert ComputerProjection(["id"], "id=gt=5").local_filter is None
+    either = ComputerProjection(["id"], "id==1,storage.bootDriveFileVault2State==x")
+    assert either.server_filter is None
+    assert either.section == ["STORAGE"]
+
+
+def test_projection_trim():
+    """
+    Ensures that records are trimmed to the id and the projected fields,
+    including fields of the items of list sections
+    """
+    projection = ComputerProjection(
+        ["general.name", "general.remoteManagement.managed", "applications.name"]
+    )
+    record = {
+        "id": "1",
+        "udid": "ABC",
+        "general": {
+            "name": "Orchard",
+            "platform": "Mac",
+            "remoteManagement": {"managed": True, "managementUsername": "jamf"},
+        },
+        "applications": [
+            {"name": "Safari.app", "version": "17.4"},
+            {"name": "Slack.app", "version": "4.38"},
+        ],
+        "hardware": None,
+    }
+    assert projection.trim(record) == {
+        "id": "1",
+        "general": {"name": "Orchard", "remoteManagement": {"managed": True}},
+        "applications": [{"name": "Safari.app"}, {"name": "Slack.app"}],
+    }
+
+
+def test_select_computers():
+    """
+    Ensures that select_computers requests only the planned sections with
+    the server filter and returns trimmed records
+    """
+    fleet = generate_fleet(120, now=NOW)
+    with MockJamfServer(fleet) as server:
+        with Pro(server.url, "username", "password") as pro:
+            computers = select_computers(
+                pro,
+                ["hardware.serialNumber", "userAndLocation.email"],
+                'operatingSystem.version=="14.*"',
+                sort=["id:asc"],
+                page_size=50,
+            )
+    expected = [
+        row
+        for row in fleet.computers
+        if row[COMPUTER["operatingSystem.version"]][:3] == "14."
+    ]
+    assert [computer["id"] for computer in computers] == [
+        str(row[0]) for row in expected
+    ]
+    assert computers[0] == {
+        "id": str(expected[0][0]),
+        "hardware": {"serialNumber": expected[0][COMPUTER["hardware.serialNumber"]]},
+        "userAndLocation": {"email": expected[0][COMPUTER["userAndLocation.email"]]},
+    }
+
+
+def test_section_fan_out():
+    """
+    Ensures that the sections of each page are fetched by concurrent
+    requests and merged into the same records as a single request returns
+    """
+    with MockJamfServer(generate_fleet(120, now=NOW)) as server:
+        with Pro(server.url, "username", "password") as pro:
+            expected = paginate(
+                pro.get_computer_inventories,
+                section=["ALL"],
+                sort=["id:asc"],
+                page_size=50,
+            )
+            server.requests.clear()
+            fan_out = SectionFanOut(pro, groups=3)
+            merged = paginate(
+                fan_out.get_computer_inventories, section=["ALL"], page_size=50
+            )
+            assert server.requests["GET /api/v1/computers-inventory"] == 9
+            assert merged == expected
+            page = fan_out.get_computer_inventories(
+                section=["HARDWARE", "GENERAL"], page=1, page_size=10
+            )
+    assert page["totalCount"] == 120
+    assert [record["id"] for record in page["results"]] == [
+        str(id) for id in range(11, 21)
+    ]
+    assert page["results"][0]["hardware"] and page["results"][0]["general"]
+    assert page["results"][0]["security"] is None
@@ -0,0 +1,127 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet
+from jps_api_wrapper.pro import Pro, paginate
+from jps_api_wrapper.query import LocalInventory
+from jps_api_wrapper.sync import ComputerInventorySync, MobileDeviceSync
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+FILTERS = [
+    "operatingSystem.version==14.*",
+    'operatingSystem.version=="14.*";userAndLocation.buildingId==3',
+    "operatingSystem.fileVault2Status!=ALL_ENCRYPTED;hardware.appleSilicon==true",
+    "general.reportDate=ge=2024-05-20T00:00:00Z,id=in=(3,5,800)",
+    "hardware.model=in=('MacBook Pro (14-inch, 2023)','Mac mini (M2, 2023)')",
+    "id=lt=50;id=gt=20",
+    "general.name==nobody",
+]
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    return generate_fleet(400, 150, now=NOW)
+
+
+@pytest.fixture(scope="module")
+def server(fleet):
+    with MockJamfServer(fleet) as server:
+        yield server
+
+
+@pytest.fixture
+def pro(server):
+    with Pro(server.url, "username", "password") as pro:
+        yield pro
+
+
+@pytest.fixture(scope="module")
+def computers(server):
+    with Pro(server.url, "username", "password") as pro:
+        return paginate(
+            pro.get_computer_inventories,
+            section=["ALL"],
+            sort=["id:asc"],
+            page_size=2000,
+        )["results"]
+
+
+@pytest.mark.parametrize("filter", FILTERS)
+def test_query_matches_server(pro, computers, filter):
+    """
+    Ensures that local queries return the same records in the same order as
+    the server does for the same filter and sort
+    """
+    inventory = LocalInventory(computers)
+    expected = paginate(
+        pro.get_computer_inventories,
+        section=["ALL"],
+        sort=["general.reportDate:desc"],
+        page_size=2000,
+        filter=filter,
+    )
+    local = inventory.query(filter, sort=["general.reportDate:desc"])
+    assert local["totalCount"] == expected["totalCount"]
+    assert [record["id"] for record in local["results"]] == [
+        record["id"] for record in expected["results"]
+    ]
+
+
+def test_query_pages(computers):
+    """
+    Ensures that pages, counts and record lookups follow the Pro API
+    """
+    inventory = LocalInventory(computers)
+    assert len(inventory) == 400
+    page = inventory.query("id=le=250", sort=["id:desc"], page=1, page_size=100)
+    assert page["totalCount"] == 250
+    assert [record["id"] for record in page["results"]] == [
+        str(id) for id in range(150, 50, -1)
+    ]
+    assert inventory.count("id=le=250") == 250
+    assert inventory.get(12)["id"] == "12"
+    assert inventory.get("9999") is None
+
+
+def test_query_update(computers):
+    """
+    Ensures that indexes reflect records that are replaced, added and
+    removed after they were built
+    """
+    inventory = LocalInventory(computers[:10])
+    assert inventory.count("general.name==renamed") == 0
+    renamed = dict(computers[0], general={**computers[0]["general"], "name": "RENAMED"})
+    inventory.update([renamed, computers[10]])
+    assert [r["id"] for r in inventory.query("general.name==renamed")["results"]] == [
+        "1"
+    ]
+    assert len(inventory) == 11
+    inventory.remove(["1"])
+    assert inventory.count("general.name==renamed") == 0
+    assert inventory.get("11")["id"] == "11"
+
+
+def test_query_from_mirror(pro, tmp_path):
+    """
+    Ensures that mirrored mobile devices are queried by the filter fields of
+    the mobile device detail endpoint
+    """
+    with MobileDeviceSync(pro, str(tmp_path / "fleet.db")) as mirror:
+        mirror.sync()
+        inventory = LocalInventory.from_mirror(mirror)
+    expected = paginate(
+        pro.get_mobile_devices_detail,
+        section=["GENERAL", "HARDWARE"],
+        sort=["mobileDeviceId:asc"],
+        page_size=2000,
+        filter="osVersion==17.*;batteryLevel=lt=50",
+    )
+    local = inventory.query("osVersion==17.*;batteryLevel=lt=50")
+    assert len(inventory) == 150
+    assert [record["mobileDeviceId"] for record in local["results"]] == [
+        record["mobileDeviceId"] for record in expected["results"]
+    ]
+    with ComputerInventorySync(pro, str(tmp_path / "fleet.db")) as mirror:
+        mirror.sync()
+        assert LocalInventory.from_mirror(mirror).count("id=in=(1,2,999)") == 2
@@ -0,0 +1,184 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet
+from jps_api_wrapper.pro import Pro, paginate
+from jps_api_wrapper.projection import SectionFanOut
+from jps_api_wrapper.records import (
+    ComputerApplication,
+    ComputerInventory,
+    MdmCommand,
+    MobileDeviceDetail,
+    Script,
+    decode_as,
+    decode_page,
+)
+from jps_api_wrapper.rsql import field_getter
+from jps_api_wrapper.sync import ComputerInventorySync
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockJamfServer(generate_fleet(300, 100, now=NOW)) as server:
+        yield server
+
+
+@pytest.fixture
+def pro(server):
+    with Pro(server.url, "username", "password") as pro:
+        yield pro
+
+
+def test_decode_page():
+    """
+    Ensures that the results of a page become records that read like the
+    dicts they were decoded from and are parsed when first read
+    """
+    page = {
+        "totalCount": 2,
+        "results": [
+            {
+                "id": "1",
+                "general": {"name": "Orchard", "site": {"id": "-1", "name": "None"}},
+                "applications": [{"name": "Safari.app", "custom": 1}],
+                "printers": [],
+                "vendorField": {"a": [1, 2]},
+            },
+            {"id": "2", "hardware": None},
+        ],
+    }
+    decoded = decode_page(json.dumps(page), ComputerInventory)
+    computer = decoded["results"][0]
+    assert decoded["totalCount"] == 2
+    assert isinstance(computer, ComputerInventory)
+    assert computer.to_json() == json.dumps(page["results"][0])
+    assert decode_page(json.dumps(page, indent=2), ComputerInventory) == page
+    assert decoded == page
+    assert computer.general.name == "Orchard"
+    assert computer.general.site.name == "None"
+    assert computer.udid is None
+    assert computer.printers == []
+    assert isinstance(computer.applications[0], ComputerApplication)
+    assert computer.applications[0]["custom"] == 1
+    assert computer["vendorField"] == {"a": [1, 2]}
+    assert list(computer) == [
+        "id",
+        "general",
+        "applications",
+        "printers",
+        "vendorField",
+    ]
+    assert len(computer) == 5
+    assert computer.to_dict() == page["results"][0]
+    assert json.loads(computer.to_json()) == page["results"][0]
+    assert decoded["results"][1].hardware is None
+    with pytest.raises(KeyError):
+        computer["udid"]
+    assert field_getter(computer)("general.site.id") == "-1"
+    assert decode_page('{"totalCount": 0, "results": []}', Script) == {
+        "totalCount": 0,
+        "results": [],
+    }
+    assert decode_page("[1, 2]", Script) == [1, 2]
+    with pytest.raises(json.JSONDecodeError):
+        decode_page('{"results": [{"id": "1"}', Script)
+
+
+def test_records_from_dicts():
+    """
+    Ensures that records built from dicts return every field by item and
+    attribute, including fields named like Mapping methods
+    """
+    command = {
+        "uuid": "0d2f6c9e",
+        "client": {"managementId": "6c2a", "clientType": "COMPUTER"},
+        "commandState": "PENDING",
+        "commandType": "DEVICE_LOCK",
+    }
+    record = MdmCommand(command)
+    assert record.client.clientType == "COMPUTER"
+    assert record.dateSent is None
+    assert record == command
+    assert dict(record) == command
+    script = Script({"id": "3", "name": "Install", "parameter4": "--quiet"})
+    assert script.parameter4 == "--quiet"
+    assert repr(script) == (
+        "Script({'id': '3', 'name': 'Install', 'parameter4': '--quiet'})"
+    )
+    attribute = ComputerInventory(
+        {"id": "1", "extensionAttributes": [{"name": "Owner", "values": ["a"]}]}
+    ).extensionAttributes[0]
+    assert attribute["values"] == ["a"]
+    assert list(attribute.values()) == ["Owner", ["a"]]
+
+
+def test_paginate_records(pro):
+    """
+    Ensures that paginate returns records equal to the dicts it returns
+    otherwise, also when pages are merged by SectionFanOut
+    """
+    expected = paginate(
+        pro.get_computer_inventories, section=["ALL"], sort=["id:asc"], page_size=40
+    )
+    records = paginate(
+        pro.get_computer_inventories,
+        section=["ALL"],
+        sort=["id:asc"],
+        page_size=40,
+        record_type=ComputerInventory,
+    )
+    assert all(isinstance(r, ComputerInventory) for r in records["results"])
+    assert records == expected
+    merged = paginate(
+        SectionFanOut(pro).get_computer_inventories,
+        section=["ALL"],
+        page_size=100,
+        record_type=ComputerInventory,
+    )
+    assert all(isinstance(r, ComputerInventory) for r in merged["results"])
+    assert merged == expected
+    devices = paginate(
+        pro.get_mobile_devices_detail,
+        section=["GENERAL"],
+        page_size=30,
+        record_type=MobileDeviceDetail,
+    )
+    assert devices["totalCount"] == 100
+    assert devices["results"][0].general.udid
+
+
+def test_paginate_records_long_filter(server):
+    """
+    Ensures that records are returned from filters split across requests
+    """
+    ids = [str(id) for id in range(1, 301, 3)]
+    filter = f"id=in=({','.join(ids)})"
+    with Pro(server.url, "username", "password", max_filter_length=100) as pro:
+        records = paginate(
+            pro.get_computer_inventories,
+            sort=["id:asc"],
+            filter=filter,
+            record_type=ComputerInventory,
+        )
+        with decode_as(ComputerInventory):
+            page = pro.get_computer_inventories(sort=["id:asc"], filter=filter)
+    assert [record.id for record in records["results"]] == ids
+    assert all(isinstance(r, ComputerInventory) for r in records["results"])
+    assert [record.id for record in page["results"]] == ids[:100]
+    assert isinstance(page["results"][0], ComputerInventory)
+
+
+def test_mirror_records(pro, tmp_path):
+    """
+    Ensures that mirrored records are yielded as records without parsing
+    """
+    with ComputerInventorySync(pro, str(tmp_path / "fleet.db"), ["HARDWARE"]) as sync:
+        sync.sync()
+        records = list(sync.records(record_type=ComputerInventory))
+        assert all(type(record._values) is str for record in records)
+        assert records == list(sync.records())
+    assert records[0].hardware.serialNumber
@@ -0,0 +1,263 @@
+import time
+
+import pytest
+import requests
+import responses
+
+from jps_api_wrapper.circuit_breaker import CLOSED, CircuitBreaker
+from jps_api_wrapper.cluster import NodePool
+from jps_api_wrapper.concurrency import AdaptiveLimiter, Deadline, DeadlineExceeded
+from jps_api_wrapper.affinity import NodeAffinity
+from jps_api_wrapper.classic import Classic
+from jps_api_wrapper.concurrency import DEFAULT_MAX_LIMIT
+from jps_api_wrapper.mock_server import MockJamfServer, generate_fleet
+from jps_api_wrapper.pro import Pro
+from jps_api_wrapper.request_builder import (
+    DEFAULT_TIMEOUT,
+    EXPORT_TIMEOUT,
+    cap_timeout,
+)
+from jps_api_wrapper.transport import Transport
+
+from conftest import EXAMPLE_JSS, MockAuth, jps_url
+
+EXPECTED_JSON = {"test": "test_get_request"}
+
+
+@pytest.fixture
+def pro(make_client):
+    return make_client()
+
+
+def sent_timeout():
+    return responses.calls[-1].request.req_kwargs["timeout"]
+
+
+def test_cap_timeout():
+    """
+    Ensures that cap_timeout caps every part of a timeout and replaces no
+    timeout with the cap
+    """
+    assert cap_timeout((10, 60), 30) == (10, 30)
+    assert cap_timeout(5, 30) == 5
+    assert cap_timeout(None, 30) == 30
+
+
+@responses.activate
+def test_request_default_timeout(pro):
+    """
+    Ensures that requests are sent with the client timeout by default
+    """
+    responses.add(responses.GET, jps_url("/api/v1/buildings"), json=EXPECTED_JSON)
+    pro.get_buildings()
+    assert sent_timeout() == DEFAULT_TIMEOUT
+
+
+@responses.activate
+def test_request_export_timeout(pro):
+    """
+    Ensures that export endpoints are sent with the longer export timeout
+    """
+    responses.add(responses.POST, jps_url("/api/v1/buildings/export"), body="id")
+    pro.get_building_export()
+    assert sent_timeout() == EXPORT_TIMEOUT
+
+
+@responses.activate
+def test_request_endpoint_timeouts(pro):
+    """
+    Ensures that endpoint_timeouts overrides the default timeout for the
+    longest matching endpoint prefix
+    """
+    pro.endpoint_timeouts = {"/api": 20, "/api/v1/buildings/export": (5, 900)}
+    responses.add(responses.POST, jps_url("/api/v1/buildings/export"), body="id")
+    responses.add(responses.GET, jps_url("/api/v1/buildings"), json=EXPECTED_JSON)
+    pro.get_building_export()
+    assert sent_timeout() == (5, 900)
+    pro.get_buildings()
+    assert sent_timeout() == 20
+
+
+@responses.activate
+def test_request_deadline_caps_timeout(pro):
+    """
+    Ensures that an active deadline caps the timeout to the time remaining
+    """
+    responses.add(responses.GET, jps_url("/api/v1/buildings"), json=EXPECTED_JSON)
+    with Deadline(5):
+        pro.get_buildings()
+    connect, read = sent_timeout()
+    assert connect <= 5
+    assert read <= 5
+
+
+@responses.activate
+def test_request_deadline_expired(pro):
+    """
+    Ensures that no request is sent once the active deadline has expired
+    """
+    with pytest.raises(DeadlineExceeded):
+        with Deadline(0):
+            pro.get_buildings()
+    assert len(responses.calls) == 0
+
+
+@responses.activate
+def test_request_deadline_timeout_not_counted(make_client):
+    """
+    Ensures that timeouts caused by the caller's deadline are not counted as
+    failures by the limiter, circuit breaker or node pool
+    """
+
+    def slow_timeout(request):
+        time.sleep(0.06)
+        raise requests.Timeout("read timed out")
+
+    responses.add_callback(
+        responses.GET, jps_url("/api/v1/buildings"), callback=slow_timeout
+    )
+    pro = make_client(
+        base_url=NodePool([EXAMPLE_JSS], failure_threshold=2),
+        limiter=AdaptiveLimiter(initial_limit=8, max_limit=8),
+        circuit_breakers={"/": CircuitBreaker(failure_threshold=2)},
+    )
+    for _ in range(2):
+        with pytest.raises(DeadlineExceeded):
+            with Deadline(0.05):
+                pro.get_buildings()
+    assert pro.limiter.limit == 8
+    assert pro.limiter.in_flight == 0
+    assert pro.circuit_breakers["/"].state == CLOSED
+    assert pro.nodes.healthy() == [EXAMPLE_JSS]
+    assert pro.nodes.outstanding[EXAMPLE_JSS] == 0
+
+
+class RecordingTransport(Transport):
+    def __init__(self):
+        self.closed = False
+
+    def request(self, method, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"{}"
+        return response
+
+    def close(self):
+        self.closed = True
+
+
+def test_client_init_wiring(make_client):
+    """
+    Ensures that the client constructor wires its options together: node
+    URLs become a NodePool, the default limiter scales with the node count
+    and the transport is bound to the session
+    """
+    nodes = ["https://jss1.example.com", "https://jss2.example.com"]
+    affinity = NodeAffinity()
+    transport = RecordingTransport()
+    pro = make_client(
+        base_url=nodes, affinity=affinity, transport=transport, timeout=30
+    )
+    assert isinstance(pro.session.auth, MockAuth)
+    assert pro.base_url == nodes[0]
+    assert pro.nodes.urls == nodes
+    assert pro.limiter.max_limit == DEFAULT_MAX_LIMIT * 2
+    assert pro.timeout == 30
+    assert pro.transport.auth is pro.session.auth
+    assert pro.affinity is affinity
+    assert pro._get("/api/v1/buildings") == {}
+
+
+def test_client_init_limiter(make_client):
+    """
+    Ensures that a given limiter is used instead of the default one
+    """
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+    assert make_client(limiter=limiter).limiter is limiter
+    assert make_client().limiter.max_limit == DEFAULT_MAX_LIMIT
+
+
+def test_classic_init_options(make_client):
+    """
+    Ensures that Classic passes its keyword arguments to RequestBuilder
+    """
+    classic = make_client(Classic, timeout=(5, 30), endpoint_timeouts={"/": 20})
+    assert classic.timeout == (5, 30)
+    assert classic.endpoint_timeouts == {"/": 20}
+
+
+def test_client_context_manager(make_client):
+    """
+    Ensures that the client refreshes its token on enter and invalidates it
+    and closes its transport on exit
+    """
+    transport = RecordingTransport()
+    with make_client(transport=transport) as pro:
+        assert pro.session.auth.refreshed
+    assert pro.session.auth.invalidated
+    assert transport.closed
+
+
+def test_get_long_filter():
+    """
+    Ensures that a request with a filter too long for one request is sent
+    as several and returns the requested page of the merged results
+    """
+    with MockJamfServer(generate_fleet(200)) as server:
+        with Pro(server.url, "username", "password", max_filter_length=200) as pro:
+            ids = [str(id) for id in range(1, 200, 2)]
+            page = pro.get_computer_inventories(
+                page=1,
+                page_size=20,
+                sort=["id:asc"],
+                filter=f"id=in=({','.join(ids)})",
+            )
+            assert server.requests["GET /api/v1/computers-inventory"] > 1
+    assert page["totalCount"] == 100
+    assert [record["id"] for record in page["results"]] == ids[20:40]
+
+
+def test_get_long_filter_pages():
+    """
+    Ensures that paging through a split filter page by page fetches the
+    merged results once and fetches them again when paging starts over
+    """
+    with MockJamfServer(generate_fleet(200)) as server:
+        with Pro(server.url, "username", "password", max_filter_length=200) as pro:
+            filter = f"id=in=({','.join(str(id) for id in range(1, 200, 2))})"
+
+            def get_page(page):
+                return pro.get_computer_inventories(
+                    page=page, page_size=30, sort=["id:asc"], filter=filter
+                )["results"]
+
+            pages = [get_page(page) for page in range(4)]
+            requests = server.requests["GET /api/v1/computers-inventory"]
+            assert get_page(0) == pages[0]
+            assert server.requests["GET /api/v1/computers-inventory"] == 2 * requests
+    assert [len(page) for page in pages] == [30, 30, 30, 10]
+    ids = [record["id"] for page in pages for record in page]
+    assert ids == [str(id) for id in range(1, 200, 2)]
+
+
+@responses.activate
+def test_get_long_filter_mdm_commands(make_client):
+    """
+    Ensures that MDM commands returned by more than one part of a split
+    filter are de-duplicated by uuid
+    """
+    commands = [
+        {"uuid": f"0d2f6c9e-{index:04}", "commandState": "PENDING"}
+        for index in range(3)
+    ]
+    responses.add(
+        responses.GET,
+        jps_url("/api/v2/mdm/commands"),
+        json={"totalCount": 3, "results": commands},
+    )
+    pro = make_client(max_filter_length=200)
+    uuids = ",".join(f"0d2f6c9e-{index:04}" for index in range(20))
+    filter = f"status==Pending,uuid=in=({uuids})"
+    results = pro.get_mdm_commands(filter=filter)
+    assert len(responses.calls) > 1
+    assert results == {"totalCount": 3, "results": commands}
@@ -0,0 +1,153 @@
+import pytest
+
+from jps_api_wrapper.rsql import (
+    And,
+    Comparison,
+    FilterTooLong,
+    InvalidFilter,
+    Or,
+    encoded_length,
+    matches,
+    parse,
+    split,
+)
+
+RECORD = {
+    "id": "12",
+    "general": {"name": "Orchard-MBP", "supervised": True, "reportDate": None},
+    "hardware": {"serialNumber": "C02ABC", "capacityMb": 512},
+    "operatingSystem": {"version": "14.5"},
+}
+
+
+def test_parse_precedence():
+    """
+    Ensures that ; and and bind tighter than , and or, and parentheses
+    group expressions
+    """
+    node = parse("id==1,id==2;general.name==a")
+    assert isinstance(node, Or)
+    assert isinstance(node.children[1], And)
+    node = parse("(id==1 or id==2) and general.name==a")
+    assert isinstance(node, And)
+    assert isinstance(node.children[0], Or)
+
+
+def test_parse_values():
+    """
+    Ensures that quoted values keep reserved characters, =in= takes a list
+    and FIQL operators are normalized
+    """
+    node = parse("general.name==\"a;b, c\" and id=in=(1,'2')")
+    assert node.children[0].values == ("a;b, c",)
+    assert node.children[1].values == ("1", "2")
+    assert parse("id=gt=5").operator == ">"
+
+
+@pytest.mark.parametrize(
+    "query", ["", "id==", "id==1;", "(id==1", "id=like=1", "id==(1,2)", "id"]
+)
+def test_parse_invalid(query):
+    """
+    Ensures that malformed filters raise InvalidFilter
+    """
+    with pytest.raises(InvalidFilter):
+        parse(query)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ('general.name=="orchard-mbp"', True),
+        ("general.name==Orch*", True),
+        ("general.name!=*MBP", False),
+        ("general.supervised==true", True),
+        ("hardware.capacityMb>=512", True),
+        ("hardware.capacityMb=lt=100", False),
+        ("id=in=(11,12)", True),
+        ("id=out=(11,12)", False),
+        ('operatingSystem.version=ge="14.0"', True),
+        ("general.reportDate==2024-01-01", False),
+        ("general.reportDate!=2024-01-01", True),
+        ("general.missing=out=(a)", True),
+        ("id==12;hardware.serialNumber==c02*,id==1", True),
+    ],
+)
+def test_matches(query, expected):
+    """
+    Ensures that comparisons convert values to the type of the field and
+    compare strings case insensitively with * wildcards
+    """
+    assert matches(query, RECORD) is expected
+
+
+def test_render_round_trip():
+    """
+    Ensures that a parsed filter renders back to equivalent RSQL with values
+    quoted where needed
+    """
+    query = 'general.name=="a,b";(id>5,id=in=(1,2));hardware.model==Mac'
+    rendered = str(parse(query))
+    assert rendered == 'general.name=="a,b";(id=gt=5,id=in=(1,2));hardware.model==Mac'
+    assert str(parse(rendered)) == rendered
+    assert str(Comparison("general.name", "==", ['say "hi"'])) == (
+        'general.name=="say \\"hi\\""'
+    )
+
+
+def test_fields():
+    """
+    Ensures that fields returns every field a filter refers to
+    """
+    node = parse("id==1;(general.name==a,hardware.model==b)")
+    assert node.fields() == {"id", "general.name", "hardware.model"}
+
+
+def test_builder_operators():
+    """
+    Ensures that & and | combine nodes into flat And and Or nodes
+    """
+    node = (
+        Comparison("id", "=in=", ["1", "2"])
+        & Comparison("general.platform", "==", ["Mac"])
+        & Comparison("general.supervised", "==", ["true"])
+    )
+    assert type(node) is And and len(node.children) == 3
+    node = node | Comparison("id", "==", ["12"]) | Comparison("id", "==", ["13"])
+    assert isinstance(node, Or) and len(node.children) == 3
+    assert str(node) == (
+        "(id=in=(1,2);general.platform==Mac;general.supervised==true),id==12,id==13"
+    )
+
+
+def test_split():
+    """
+    Ensures that long filters are split at , and between =in= values into
+    parts under the limit that together match the same records
+    """
+    ids = ",".join(str(id) for id in range(200))
+    query = f'operatingSystem.version==14.*;(id=in=({ids}),general.name=="a b")'
+    parts = split(query, 150)
+    assert len(parts) > 1
+    assert all(encoded_length(part) <= 150 for part in parts)
+    records = [
+        {"id": str(id), "general": {"name": name}, "operatingSystem": {"version": os}}
+        for id in (5, 150, 500)
+        for name in ("a b", "c")
+        for os in ("14.5", "13.6")
+    ]
+    for record in records:
+        expected = matches(query, record)
+        assert any(matches(part, record) for part in parts) is expected
+    assert [str(part) for part in split("id==1", 150)] == ["id==1"]
+
+
+def test_split_too_long():
+    """
+    Ensures that filters without a , or =in= to split at raise FilterTooLong
+    """
+    name = "x" * 200
+    with pytest.raises(FilterTooLong):
+        split(f"general.name=={name}", 100)
+    with pytest.raises(FilterTooLong):
+        split(f"general.name=={name};id=in=(1,2,3)", 100)
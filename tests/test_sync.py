@@ -0,0 +1,160 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from jps_api_wrapper.mock_server import (
+    COMPUTER,
+    MOBILE_DEVICE,
+    MockJamfServer,
+    generate_fleet,
+)
+from jps_api_wrapper.pro import Pro
+from jps_api_wrapper.sync import (
+    ComputerInventorySync,
+    MobileDeviceSync,
+    InventoryMirror,
+)
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+LATER = "2024-06-01T01:00:00Z"
+
+
+@pytest.fixture
+def server():
+    with MockJamfServer(generate_fleet(300, now=NOW)) as server:
+        yield server
+
+
+@pytest.fixture
+def pro(server):
+    with Pro(server.url, "username", "password") as pro:
+        yield pro
+
+
+def report(server, index: int, name: str):
+    row = list(server.fleet.computers[index])
+    row[COMPUTER["general.name"]] = name
+    row[COMPUTER["general.reportDate"]] = LATER
+    server.fleet.computers[index] = tuple(row)
+
+
+def test_computer_sync_delta(server, pro, tmp_path):
+    """
+    Ensures that the first sync mirrors every computer and later syncs only
+    fetch the computers that reported since
+    """
+    path = str(tmp_path / "inventory.db")
+    with ComputerInventorySync(pro, path, ["HARDWARE"], page_size=50) as mirror:
+        stats = mirror.sync()
+        assert stats == {"full": True, "pages": 6, "fetched": 300, "deleted": 0}
+        assert mirror.count() == 300
+        first = mirror.get(1)
+        assert first["hardware"]["serialNumber"]
+        assert first["general"]["name"]
+
+    report(server, 9, "renamed-10")
+    report(server, 199, "renamed-200")
+    server.fleet_changed()
+    with ComputerInventorySync(pro, path, ["HARDWARE"], page_size=50) as mirror:
+        stats = mirror.sync()
+        assert not stats["full"]
+        assert stats["pages"] == 1
+        assert 2 <= stats["fetched"] < 10
+        assert mirror.get("10")["general"]["name"] == "renamed-10"
+        assert mirror.get("200")["general"]["reportDate"] == LATER
+        serial = mirror.get("200")["hardware"]["serialNumber"]
+        [record] = mirror.records("serial_number = ?", (serial,))
+        assert record["id"] == "200"
+        # Computers at the high-water marks are fetched again in case others
+        # reported in the same second
+        assert mirror.sync()["fetched"] == stats["fetched"]
+
+
+def test_computer_sync_reconcile(server, pro, tmp_path):
+    """
+    Ensures that deleted computers are removed by the id scan when it is due
+    and by full syncs
+    """
+    path = str(tmp_path / "inventory.db")
+    mirror = ComputerInventorySync(pro, path, page_size=100, reconcile_interval=3600)
+    mirror.sync()
+    del server.fleet.computers[:3]
+    server.fleet_changed()
+    assert mirror.sync()["deleted"] == 0
+    assert mirror.count() == 300
+    server.requests.clear()
+    assert mirror.reconcile() == 3
+    assert mirror.get(1) is None and mirror.count() == 297
+    assert server.requests["GET /api/v1/computers-inventory"] == 3
+    del server.fleet.computers[:2]
+    server.fleet_changed()
+    assert mirror.sync(full=True)["deleted"] == 2
+    mirror.reconcile_interval = 0
+    del server.fleet.computers[:1]
+    server.fleet_changed()
+    assert mirror.sync()["deleted"] == 1
+    assert [record["id"] for record in mirror.records()][:2] == ["7", "8"]
+    mirror.close()
+
+
+def test_mobile_device_sync(tmp_path):
+    """
+    Ensures that later syncs fetch the other sections only for devices whose
+    last inventory update changed, and that devices can be found by their
+    indexed identifiers
+    """
+    with MockJamfServer(generate_fleet(0, 150, now=NOW)) as server:
+        with Pro(server.url, "username", "password") as pro:
+            path = str(tmp_path / "devices.db")
+            mirror = MobileDeviceSync(
+                pro, path, ["HARDWARE", "SECURITY"], page_size=100, chunk_size=10
+            )
+            stats = mirror.sync()
+            assert stats["full"] and stats["changed"] == 150
+            assert mirror.count() == 150
+            device = mirror.get(5)
+            assert set(device) >= {"general", "hardware", "security"}
+
+            for index in (4, 120):
+                row = list(server.fleet.mobile_devices[index])
+                row[MOBILE_DEVICE["lastInventoryUpdateDate"]] = LATER
+                row[MOBILE_DEVICE["batteryLevel"]] = 1
+                server.fleet.mobile_devices[index] = tuple(row)
+            server.fleet_changed()
+            server.requests.clear()
+            stats = mirror.sync()
+            assert not stats["full"]
+            assert stats["changed"] == 2
+            assert stats["fetched"] >= 2
+            assert server.requests["GET /api/v2/mobile-devices/detail"] == 2
+            assert mirror.get(5)["hardware"]["batteryLevel"] == 1
+            assert mirror.get(5)["general"]["lastInventoryUpdateDate"] == LATER
+            assert mirror.get(5)["security"] is not None
+            assert mirror.sync()["changed"] == 0
+
+            row = server.fleet.mobile_devices[120]
+            for column, value in (
+                ("serial_number", row[MOBILE_DEVICE["serialNumber"]]),
+                ("udid", row[MOBILE_DEVICE["udid"]]),
+                ("management_id", row[MOBILE_DEVICE["managementId"]]),
+            ):
+                [record] = mirror.records(f"{column} = ?", (value,))
+                assert record["mobileDeviceId"] == "121"
+
+            del server.fleet.mobile_devices[:5]
+            server.fleet_changed()
+            assert mirror.reconcile() == 5
+            mirror.close()
+
+
+def test_mirror_without_scan(pro, tmp_path):
+    """
+    Ensures that a mirror that can not scan for deleted records fails when
+    it is created rather than during a sync
+    """
+
+    class Mirror(InventoryMirror):
+        table = "computers"
+
+    with pytest.raises(TypeError):
+        Mirror(pro, str(tmp_path / "fleet.db"), 100, 100, None, 1)
@@ -0,0 +1,153 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from jps_api_wrapper.tenants import Tenant, TenantPool
+
+
+class FakeClient:
+    created = []
+    transport = None
+
+    def __init__(self, base_url, username, password, client, **options):
+        if password == "wrong":
+            raise PermissionError("Unable to authenticate")
+        self.base_url = base_url
+        self.options = options
+        self.session = mock.Mock()
+        FakeClient.created.append(self)
+
+
+@pytest.fixture
+def tenants():
+    FakeClient.created = []
+    return [
+        Tenant("one", "https://one.jamfcloud.com", "user", "pass"),
+        Tenant("two", "https://two.jamfcloud.com", "user", "pass", timeout=5),
+        Tenant("broken", "https://broken.jamfcloud.com", "user", "wrong"),
+    ]
+
+
+def test_tenant_pool_duplicate_names(tenants):
+    """
+    Ensures that TenantPool raises ValueError when two tenants share a name
+    """
+    with pytest.raises(ValueError):
+        TenantPool(tenants + [tenants[0]], client_class=FakeClient)
+
+
+def test_tenant_pool_run(tenants):
+    """
+    Ensures that run yields a result for every tenant and reports failures
+    as errors instead of raising
+    """
+    pool = TenantPool(tenants, client_class=FakeClient)
+    results = {result.tenant.name: result for result in pool.run(lambda c: c.base_url)}
+    assert results["one"].result == "https://one.jamfcloud.com"
+    assert results["two"].ok
+    assert not results["broken"].ok
+    assert isinstance(results["broken"].error, PermissionError)
+
+
+def test_tenant_pool_reuses_clients(tenants):
+    """
+    Ensures that clients are created once per tenant with the tenant options
+    and a limiter capped to per_tenant_limit
+    """
+    pool = TenantPool(tenants[:2], client_class=FakeClient, per_tenant_limit=2)
+    list(pool.run(lambda c: None))
+    list(pool.run(lambda c: None, tenants=["two"]))
+    assert len(FakeClient.created) == 2
+    options = pool.client("two").options
+    assert options["timeout"] == 5
+    assert options["limiter"].max_limit == 2
+
+
+def test_tenant_pool_streams_results(tenants):
+    """
+    Ensures that results are yielded as tenants complete rather than in
+    tenant order
+    """
+    pool = TenantPool(tenants[:2], client_class=FakeClient)
+    release = threading.Event()
+
+    def operation(client):
+        if client.base_url.startswith("https://one"):
+            release.wait(1)
+        return client.base_url
+
+    results = pool.run(operation)
+    assert next(results).tenant.name == "two"
+    release.set()
+    assert next(results).tenant.name == "one"
+
+
+def test_tenant_pool_global_limit(tenants):
+    """
+    Ensures that no more than global_limit operations run at the same time
+    """
+    pool = TenantPool(tenants[:2], client_class=FakeClient, global_limit=1)
+    running = []
+    peak = []
+
+    def operation(client):
+        running.append(client)
+        peak.append(len(running))
+        time.sleep(0.05)
+        running.remove(client)
+
+    list(pool.run(operation))
+    assert max(peak) == 1
+
+
+def test_tenant_pool_close(tenants):
+    """
+    Ensures that close invalidates the token of every created client
+    """
+    with TenantPool(tenants[:1], client_class=FakeClient) as pool:
+        client = pool.client("one")
+    client.session.auth.invalidate.assert_called_once()
+
+
+def test_tenant_pool_global_limit_across_runs(tenants):
+    """
+    Ensures that global_limit is shared by concurrent calls to run
+    """
+    pool = TenantPool(tenants[:2], client_class=FakeClient, global_limit=1)
+    running = []
+    peak = []
+
+    def operation(client):
+        running.append(client)
+        peak.append(len(running))
+        time.sleep(0.05)
+        running.remove(client)
+
+    runs = [
+        threading.Thread(target=lambda name=name: list(pool.run(operation, [name])))
+        for name in ("one", "two")
+    ]
+    for run in runs:
+        run.start()
+    for run in runs:
+        run.join()
+    assert len(peak) == 2
+    assert max(peak) == 1
+
+
+def test_tenant_pool_close_continues_after_error(tenants):
+    """
+    Ensures that close closes every client's transport and keeps going when
+    a token cannot be invalidated
+    """
+    pool = TenantPool(tenants[:2], client_class=FakeClient)
+    first, second = pool.client("one"), pool.client("two")
+    for client in (first, second):
+        client.transport = mock.Mock()
+    first.session.auth.invalidate.side_effect = RuntimeError("offline")
+    pool.close()
+    second.session.auth.invalidate.assert_called_once()
+    first.transport.close.assert_called_once()
+    second.transport.close.assert_called_once()
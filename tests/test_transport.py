@@ -0,0 +1,192 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+from io import BytesIO
+
+import pytest
+import requests
+
+from jps_api_wrapper.metrics import request_size
+from jps_api_wrapper.mock_server import ThreadingHTTPServer
+from jps_api_wrapper.request_builder import NotFound
+from jps_api_wrapper.transport import (
+    HttpxTransport,
+    RequestsTransport,
+    Transport,
+    TransportResponse,
+    Urllib3Transport,
+)
+
+from conftest import MOCK_AUTH_STRING
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    # Answers every request with a JSON description of what it received
+    def do_GET(self):
+        self.echo()
+
+    def do_POST(self):
+        self.echo()
+
+    def echo(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode()
+        status = 404 if self.path.startswith("/missing") else 200
+        content = json.dumps(
+            {
+                "method": self.command,
+                "path": self.path,
+                "authorization": self.headers.get("Authorization"),
+                "cookie": self.headers.get("Cookie"),
+                "content_type": self.headers.get("Content-Type"),
+                "body": body,
+            }
+        ).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Set-Cookie", "APBALANCEID=aws.node1; path=/")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(params=["requests", "urllib3", "httpx"])
+def pro(request, server, make_client):
+    if request.param == "httpx":
+        pytest.importorskip("httpx")
+    transport = {
+        "requests": RequestsTransport,
+        "urllib3": Urllib3Transport,
+        "httpx": lambda: HttpxTransport(http2=False),
+    }[request.param]()
+    yield make_client(base_url=server, transport=transport)
+    transport.close()
+
+
+def test_transport_get(pro):
+    """
+    Ensures that every transport sends GET requests with the query
+    parameters and authentication of the client
+    """
+    response = pro._get("/api/v1/computers-inventory", params={"page": 1})
+    assert response["method"] == "GET"
+    assert response["path"] == "/api/v1/computers-inventory?page=1"
+    assert response["authorization"] == MOCK_AUTH_STRING
+
+
+def test_transport_post_json(pro):
+    """
+    Ensures that every transport sends JSON bodies with a JSON content type
+    """
+    response = pro._post("/api/v1/buildings", {"name": "HQ"})
+    assert response["method"] == "POST"
+    assert json.loads(response["body"]) == {"name": "HQ"}
+    assert response["content_type"] == "application/json"
+
+
+def test_transport_post_xml(pro):
+    """
+    Ensures that every transport sends string bodies unchanged
+    """
+    response = json.loads(
+        pro._post(
+            "/JSSResource/buildings/id/0",
+            data_type="xml",
+            data="<building><name>HQ</name></building>",
+        )
+    )
+    assert response["body"] == "<building><name>HQ</name></building>"
+    assert response["content_type"] == "application/xml"
+
+
+def test_transport_post_files(pro):
+    """
+    Ensures that every transport sends files as multipart form data
+    """
+    response = pro._post(
+        "/api/v1/icon",
+        file={"file": ("icon.png", BytesIO(b"icon"), "image/png")},
+    )
+    assert response["content_type"].startswith("multipart/form-data")
+    assert 'filename="icon.png"' in response["body"]
+
+
+def test_transport_cookies(pro, server):
+    """
+    Ensures that every transport sends the cookies it is given and returns
+    the cookies set by the server
+    """
+    response = pro.transport.request(
+        "GET", server + "/cookies", cookies={"APBALANCEID": "aws.node2"}
+    )
+    assert response.json()["cookie"] == "APBALANCEID=aws.node2"
+    assert response.cookies.get("APBALANCEID") == "aws.node1"
+
+
+def test_transport_http_error(pro):
+    """
+    Ensures that error statuses are raised as the recognized errors with
+    every transport
+    """
+    with pytest.raises(NotFound):
+        pro._get("/missing")
+
+
+@pytest.mark.parametrize(
+    "transport",
+    [Urllib3Transport, lambda: HttpxTransport(http2=False)],
+    ids=["urllib3", "httpx"],
+)
+def test_transport_connection_error(transport):
+    """
+    Ensures that connection failures are raised as requests.ConnectionError
+    so the client handles them the same way for every transport
+    """
+    pytest.importorskip("httpx")
+    with pytest.raises(requests.ConnectionError):
+        transport().request("GET", "http://127.0.0.1:9/", timeout=(1, 1))
+
+
+def test_transport_response_raise_for_status():
+    """
+    Ensures that TransportResponse only raises for 4xx and 5xx statuses
+    """
+    TransportResponse(204, {}, b"", "https://jss.example.com").raise_for_status()
+    with pytest.raises(requests.HTTPError):
+        TransportResponse(503, {}, b"", "https://jss.example.com").raise_for_status()
+
+
+def test_transport_request_size(pro, server):
+    """
+    Ensures that the size of the body sent can be read from the response of
+    every transport
+    """
+    response = pro.transport.request("POST", server + "/size", json={"name": "HQ"})
+    assert request_size(response) == len(response.json()["body"].encode())
+    assert request_size(response) > 0
+
+
+def test_transport_without_request():
+    """
+    Ensures that a transport that does not send requests fails when it is
+    created
+    """
+
+    class Incomplete(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
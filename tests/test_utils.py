@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+
+from jps_api_wrapper.mock_server import COMPUTER, MockJamfServer, generate_fleet
+from jps_api_wrapper.pro import Pro
+from jps_api_wrapper.rsql import Comparison
+from jps_api_wrapper.utils import (
+    iter_pages,
+    match_prefix,
+    merge_results,
+    normalize_endpoint,
+    paginate,
+)
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def test_normalize_endpoint_pro():
+    """
+    Ensures that numeric ids and UUIDs in Pro endpoints are replaced with
+    placeholders
+    """
+    assert (
+        normalize_endpoint("/api/v1/computers-inventory/12")
+        == "/api/v1/computers-inventory/{id}"
+    )
+    assert (
+        normalize_endpoint("/api/v1/ddm/1f0e4c3a-1b2c-4d5e-8f90-123456789abc/sync")
+        == "/api/v1/ddm/{uuid}/sync"
+    )
+    assert normalize_endpoint("/api/v2/mdm/commands") == "/api/v2/mdm/commands"
+
+
+def test_normalize_endpoint_classic():
+    """
+    Ensures that values following Classic identification segments are
+    replaced with placeholders named after the identification
+    """
+    assert (
+        normalize_endpoint("/JSSResource/computers/name/My%20Mac")
+        == "/JSSResource/computers/name/{name}"
+    )
+    assert (
+        normalize_endpoint("/JSSResource/computers/id/5/subset/General&Hardware")
+        == "/JSSResource/computers/id/{id}/subset/{subset}"
+    )
+
+
+def test_match_prefix():
+    """
+    Ensures that match_prefix returns the value of the longest matching
+    prefix and None when nothing matches
+    """
+    options = {"/api": 1, "/api/v1/buildings": 2}
+    assert match_prefix(options, "/api/v1/buildings/1") == 2
+    assert match_prefix(options, "/api/v1/departments") == 1
+    assert match_prefix(options, "/JSSResource/buildings") is None
+
+
+def test_merge_results():
+    """
+    Ensures that merged results drop records returned by more than one part
+    and are sorted again by the sort criteria
+    """
+    merged = merge_results(
+        [
+            {"totalCount": 2, "results": [{"id": "3", "n": "b"}, {"id": "10"}]},
+            {"totalCount": 2, "results": [{"id": "3", "n": "b"}, {"id": "2"}]},
+        ],
+        ["id:asc"],
+    )
+    assert merged == {
+        "totalCount": 3,
+        "results": [{"id": "2"}, {"id": "3", "n": "b"}, {"id": "10"}],
+    }
+
+
+def test_paginate_long_filter():
+    """
+    Ensures that paginate splits a filter too long for one request and
+    returns the same records as the filter would
+    """
+    fleet = generate_fleet(300, now=NOW)
+    serials = [row[COMPUTER["hardware.serialNumber"]] for row in fleet.computers]
+    with MockJamfServer(fleet) as server:
+        with Pro(server.url, "username", "password", max_filter_length=500) as pro:
+            filter = Comparison("hardware.serialNumber", "=in=", serials[::3]) | (
+                Comparison("id", "=in=", [str(id) for id in range(1, 60)])
+            )
+            results = paginate(
+                pro.get_computer_inventories,
+                section=["HARDWARE"],
+                sort=["id:desc"],
+                page_size=50,
+                filter=filter,
+            )
+            assert server.requests["GET /api/v1/computers-inventory"] > 1
+    expected = [
+        str(row[0])
+        for row in reversed(fleet.computers)
+        if row[0] < 60 or (row[0] - 1) % 3 == 0
+    ]
+    assert results["totalCount"] == len(expected)
+    assert [record["id"] for record in results["results"]] == expected
+
+
+def test_iter_pages():
+    """
+    Ensures that iter_pages yields the results of every page in order
+    """
+    with MockJamfServer(generate_fleet(250, now=NOW)) as server:
+        with Pro(server.url, "username", "password") as pro:
+            pages = list(
+                iter_pages(pro.get_computer_inventories, 100, 2, sort=["id:asc"])
+            )
+    assert [len(page) for page in pages] == [100, 100, 50]
+    ids = [record["id"] for page in pages for record in page]
+    assert ids == [str(id) for id in range(1, 251)]